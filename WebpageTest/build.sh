@@ -265,6 +265,6 @@ python manage.py collectstatic --noinput
 log "Checking for configuration errors" 1 "$SCRIPT_NAME"
 python manage.py check
 
-# Start Django development server
-log "Starting Django development server" 1 "$SCRIPT_NAME"
-python manage.py runserver 0.0.0.0:8000
+# Start the ASGI server (the async JSON views need its long-lived event loop)
+log "Starting Django ASGI server (uvicorn)" 1 "$SCRIPT_NAME"
+uvicorn mysite.asgi:application --host 0.0.0.0 --port 8000
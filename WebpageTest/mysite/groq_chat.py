@@ -1,6 +1,5 @@
 from dotenv import load_dotenv
 import os
-from groq import Groq
 import json
 import logging
 import time
@@ -15,11 +14,16 @@ from intellishop.models.constants import (
     CONSUMER_STATUS,
     DISCOUNT_TYPE
 )
+from intellishop.utils.fake_groq import create_groq_client
+from intellishop.utils.llm_cache import get_llm_cache, make_key, normalize_input
 import glob
+import hashlib
 import sys
 import datetime
 import argparse
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Use the imported constants and helper functions
 CATEGORIES = get_categories_string()
@@ -122,6 +126,15 @@ Fields are copied exactly, no changes except for "N/A" replacements (not present
 If you want club_name as an array, you must specify this in your demand, but your original instruction only says to set to an empty array if "N/A".
 If you want to add consumer_statuses or process price, you must explicitly state this in your requirements."""
 
+# Batch mode: several discounts share one copy of MESSAGE_TEMPLATE per request
+BATCH_MESSAGE_TEMPLATE = MESSAGE_TEMPLATE + """
+
+BATCH MODE
+The user message is a JSON object {"discounts": [...]} holding several discount objects.
+Apply all of the instructions above to EACH discount independently.
+Return ONLY a JSON object of the form {"discounts": {"<discount_id>": <edited discount object>, ...}}
+with exactly one entry per input discount, keyed by its unchanged discount_id."""
+
 # Load environment variables
 load_dotenv()
 
@@ -159,24 +172,175 @@ def sync_all_discounts_file():
     except Exception as e:
         logger.warning(f"Failed to move {src_path} to {dest_path}: {e}")
 
-current_model_index = 0
+# Models tried in rotation order
+GROQ_MODELS = ["llama3-70b-8192", "llama3-8b-8192", "llama-3.1-8b-instant",
+               "llama-3.3-70b-versatile", "gemma2-9b-it"]
 
 # Global tracking for processed discounts to avoid duplicates
 processed_discounts = set()
 failed_discounts = set()  # Track discounts that have failed all attempts
+# Input file name -> {discount_id: hash of the input object it was enhanced from}.
+# The scraper re-emits a changed discount under the same discount_id, so an id
+# alone does not mean the discount was already enhanced.
+source_hashes = {}
+# Guards processed_discounts / failed_discounts: enrichment workers add to them
+# while the main thread reads and saves them
+tracking_lock = threading.Lock()
 
 # Rate limiting configuration
 RATE_LIMIT_CONFIG = {
-    'REQUEST_DELAY': 3,  # Delay between successful requests (seconds)
-    'RETRY_DELAY': 5,    # Delay between retry attempts (seconds)
-    'MODEL_SWITCH_DELAY': 10,  # Delay when switching models (seconds)
-    '429_DELAY': 15,     # Delay when hitting 429 error (seconds)
-    'MAX_CONSECUTIVE_429': 3,  # Max consecutive 429 errors before longer delay
+    'MAX_IN_FLIGHT': 4,           # Concurrent requests kept in flight by update_discounts_file
+    'REQUESTS_PER_MINUTE': 30,    # Token bucket refill rate, per model
+    'BURST': 4,                   # Token bucket capacity, per model
+    'RETRY_DELAY': 5,             # Delay before retrying after a non rate-limit API error (seconds)
+    '429_DELAY': 15,              # Initial backoff after a 429 when no Retry-After is sent (seconds)
+    'MAX_429_DELAY': 120,         # Cap for the exponential 429 backoff (seconds)
+    'MAX_CONSECUTIVE_429': 3,     # Consecutive 429 errors on a model before rotating to the next one
+}
+
+# Batch prompting configuration (see process_discount_batch_with_groq)
+BATCH_CONFIG = {
+    'BATCH_SIZE': 4,              # Discounts packed into one request; 1 disables batch mode
+    'MAX_TOKENS_PER_ITEM': 1024,  # Completion budget per discount in a batch
+    'MAX_BATCH_ATTEMPTS': 2,      # Whole-batch failures (bad JSON, API errors) before splitting the batch
 }
 
 # Track consecutive 429 errors per model
 model_429_count = {}
 
+
+class TokenBucket:
+    """Thread-safe token bucket; a 429 backoff blocks the bucket for everyone"""
+
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a token; returns 0 on success, else the seconds to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def block_for(self, seconds: float) -> None:
+        """Refuse tokens for the given time and drain the bucket, so traffic restarts slowly"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._blocked_until
+
+
+class ModelRotation:
+    """
+    Model rotation policy shared by all enrichment workers.
+
+    Each model has its own token bucket. A 429 blocks that model's bucket with
+    exponential backoff (or the server's Retry-After), and after
+    MAX_CONSECUTIVE_429 of them the rotation moves on to the next model.
+    """
+
+    def __init__(self, models: List[str], failure_counts: Dict[str, int]):
+        self.models = list(models)
+        self.failure_counts = failure_counts  # Shared with model_429_count for tracking state
+        self._index = 0
+        self._lock = threading.Lock()
+        self._buckets = {
+            model: TokenBucket(RATE_LIMIT_CONFIG['REQUESTS_PER_MINUTE'] / 60.0, RATE_LIMIT_CONFIG['BURST'])
+            for model in self.models
+        }
+
+    @property
+    def current_model(self) -> str:
+        with self._lock:
+            return self.models[self._index]
+
+    def acquire(self) -> str:
+        """Block until the current model has capacity and return its name"""
+        while True:
+            model = self.current_model
+            wait = self._buckets[model].try_acquire()
+            if wait <= 0:
+                return model
+            # Re-check at least every second: another worker may have rotated
+            time.sleep(min(wait, 1.0))
+
+    def rotate(self, from_model: str) -> str:
+        """Move to the next model, unless another worker already rotated away from from_model"""
+        with self._lock:
+            if self.models[self._index] == from_model:
+                self._index = (self._index + 1) % len(self.models)
+                self.failure_counts[self.models[self._index]] = 0
+            return self.models[self._index]
+
+    def record_success(self, model: str) -> None:
+        with self._lock:
+            self.failure_counts[model] = 0
+
+    def record_429(self, model: str, retry_after: float = None) -> float:
+        """Back off the model after a 429; returns the backoff applied in seconds"""
+        with self._lock:
+            count = self.failure_counts.get(model, 0) + 1
+            self.failure_counts[model] = count
+        delay = retry_after or min(
+            RATE_LIMIT_CONFIG['429_DELAY'] * 2 ** (count - 1),
+            RATE_LIMIT_CONFIG['MAX_429_DELAY']
+        )
+        self._buckets[model].block_for(delay)
+        if count >= RATE_LIMIT_CONFIG['MAX_CONSECUTIVE_429']:
+            new_model = self.rotate(model)
+            logger.info(f"🔄 Too many consecutive 429 errors: Switching model from {model} to {new_model}")
+        return delay
+
+    def reset(self) -> None:
+        with self._lock:
+            self._index = 0
+            self.failure_counts.clear()
+
+    def failure_snapshot(self) -> Dict[str, int]:
+        """Copy of the consecutive 429 counts, safe to serialize while workers run"""
+        with self._lock:
+            return dict(self.failure_counts)
+
+
+model_rotation = ModelRotation(GROQ_MODELS, model_429_count)
+
+_groq_client = None
+_groq_client_lock = threading.Lock()
+
+
+def get_groq_client():
+    """Return the process-wide Groq client (its HTTP connection pool is shared by all workers)"""
+    global _groq_client
+    with _groq_client_lock:
+        if _groq_client is None:
+            _groq_client = create_groq_client()
+        return _groq_client
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    return getattr(error, 'status_code', None) == 429 or "429" in str(error)
+
+
+def _retry_after_seconds(error: Exception):
+    """Read the Retry-After header of a 429 response, if the server sent one"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -318,11 +482,21 @@ def validate_discount_data(discount: Dict[str, Any], original_discount: Dict[str
     
     return len(errors) == 0, errors
 
+def _mark_processed(discount_id):
+    with tracking_lock:
+        processed_discounts.add(discount_id)
+
+def _mark_failed(discount_id):
+    with tracking_lock:
+        failed_discounts.add(discount_id)
+
 def process_discount_with_groq(discount: Dict[str, Any], max_retries: int = 10) -> Dict[str, Any]:
     """
     Send a discount object to Groq API using JSON Mode and get back an edited version.
     Includes comprehensive validation with up to 10 retries.
     Changes model after 3 consecutive validation failures for the same object.
+    Safe to call from several worker threads: pacing, 429 backoff and model
+    rotation go through the shared ``model_rotation``.
     
     Args:
         discount: A discount object from the JSON file
@@ -331,15 +505,10 @@ def process_discount_with_groq(discount: Dict[str, Any], max_retries: int = 10)
     Returns:
         The edited discount object from Groq, or original if all retries fail
     """
-    global current_model_index, processed_discounts, failed_discounts, model_429_count
-    
     # disable Groq client's internal logging
     logging.getLogger("groq").setLevel(logging.WARNING)
     logging.getLogger("groq._base_client").setLevel(logging.WARNING)
     
-    models = ["llama3-70b-8192", "llama3-8b-8192", "llama-3.1-8b-instant", 
-              "llama-3.3-70b-versatile", "gemma2-9b-it"]
-    
     system_message = MESSAGE_TEMPLATE
     
     discount_id = discount.get('discount_id', 'unknown')
@@ -358,20 +527,24 @@ def process_discount_with_groq(discount: Dict[str, Any], max_retries: int = 10)
     
     retry_count = 0
     validation_failures_count = 0  # Track consecutive validation failures
-    consecutive_429_count = 0  # Track consecutive 429 errors
+    llm_cache = get_llm_cache()
     
     while retry_count <= max_retries:
+        # Only validated responses are stored, so a hit is returned as is
+        cache_key = make_key(system_message, model_rotation.current_model, discount)
+        cached_response = llm_cache.get(cache_key)
+        if cached_response is not None:
+            edited_discount = json.loads(cached_response)
+            is_valid, _ = validate_discount_data(edited_discount, discount)
+            if is_valid:
+                logger.info(f"✅ Discount ID {discount_id} served from the response cache")
+                _mark_processed(discount_id)
+                return edited_discount
+        
+        # Waits for a rate-limit token of the current model instead of fixed sleeps
+        current_model = model_rotation.acquire()
         try:
-            client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-            current_model = models[current_model_index]
-            
-            # Check if current model has too many consecutive 429 errors
-            if model_429_count.get(current_model, 0) >= RATE_LIMIT_CONFIG['MAX_CONSECUTIVE_429']:
-                logger.warning(f"Model {current_model} has too many consecutive 429 errors, switching...")
-                current_model_index = (current_model_index + 1) % len(models)
-                current_model = models[current_model_index]
-                model_429_count[current_model] = 0  # Reset counter for new model
-                time.sleep(RATE_LIMIT_CONFIG['MODEL_SWITCH_DELAY'])
+            client = get_groq_client()
             
             # Log when sending a new object to the API with discount ID
             logger.info(f"Sending discount ID: {discount_id} to Groq API using model: {current_model} (attempt {retry_count + 1}/{max_retries + 1})")
@@ -387,8 +560,7 @@ def process_discount_with_groq(discount: Dict[str, Any], max_retries: int = 10)
             )
             
             # Reset 429 counter for successful request
-            model_429_count[current_model] = 0
-            consecutive_429_count = 0
+            model_rotation.record_success(current_model)
             
             # With JSON Mode, we can directly parse the response content
             response_content = chat_completion.choices[0].message.content
@@ -399,7 +571,8 @@ def process_discount_with_groq(discount: Dict[str, Any], max_retries: int = 10)
             
             if is_valid:
                 logger.info(f"✅ Discount ID {discount_id} successfully processed and validated")
-                processed_discounts.add(discount_id)  # Mark as successfully processed
+                _mark_processed(discount_id)  # Mark as successfully processed
+                llm_cache.set(make_key(system_message, current_model, discount), response_content)
                 return edited_discount
             else:
                 validation_failures_count += 1
@@ -409,21 +582,17 @@ def process_discount_with_groq(discount: Dict[str, Any], max_retries: int = 10)
                 
                 # Change model after 3 consecutive validation failures
                 if validation_failures_count >= 3:
-                    prev_model = models[current_model_index]
-                    current_model_index = (current_model_index + 1) % len(models)
-                    new_model = models[current_model_index]
-                    logger.info(f"🔄 3 consecutive validation failures: Switching model from {prev_model} to {new_model} for discount ID: {discount_id}")
+                    new_model = model_rotation.rotate(current_model)
+                    logger.info(f"🔄 3 consecutive validation failures: Switching model from {current_model} to {new_model} for discount ID: {discount_id}")
                     validation_failures_count = 0  # Reset counter for new model
-                    time.sleep(RATE_LIMIT_CONFIG['MODEL_SWITCH_DELAY'])
                 
                 if retry_count < max_retries:
                     retry_count += 1
                     logger.info(f"Retrying discount ID {discount_id} (attempt {retry_count + 1}/{max_retries + 1})")
-                    time.sleep(RATE_LIMIT_CONFIG['RETRY_DELAY'])
                     continue
                 else:
                     logger.error(f"❌ All {max_retries + 1} attempts failed for discount ID {discount_id}. Using original discount.")
-                    failed_discounts.add(discount_id)  # Mark as failed
+                    _mark_failed(discount_id)  # Mark as failed
                     return discount
                 
         except json.JSONDecodeError as e:
@@ -433,37 +602,20 @@ def process_discount_with_groq(discount: Dict[str, Any], max_retries: int = 10)
             if retry_count < max_retries:
                 retry_count += 1
                 logger.info(f"Retrying discount ID {discount_id} due to JSON error (attempt {retry_count + 1}/{max_retries + 1})")
-                time.sleep(RATE_LIMIT_CONFIG['RETRY_DELAY'])
                 continue
             else:
                 logger.error(f"❌ All {max_retries + 1} attempts failed for discount ID {discount_id}. Using original discount.")
-                failed_discounts.add(discount_id)  # Mark as failed
+                _mark_failed(discount_id)  # Mark as failed
                 return discount
                 
         except Exception as e:
             error_message = f"Error processing discount with ID {discount_id}: {str(e)}"
-            error_str = str(e)
             
             # Check if it's a rate limit error (429)
-            if "429" in error_str:
-                consecutive_429_count += 1
-                model_429_count[current_model] = model_429_count.get(current_model, 0) + 1
-                
-                logger.warning(f"429 Too Many Requests for model {current_model} (consecutive: {consecutive_429_count})")
-                
-                # If too many consecutive 429 errors, switch model and wait longer
-                if consecutive_429_count >= RATE_LIMIT_CONFIG['MAX_CONSECUTIVE_429']:
-                    prev_model = models[current_model_index]
-                    current_model_index = (current_model_index + 1) % len(models)
-                    new_model = models[current_model_index]
-                    logger.info(f"🔄 Too many consecutive 429 errors: Switching model from {prev_model} to {new_model} for discount ID: {discount_id}")
-                    consecutive_429_count = 0  # Reset counter for new model
-                    time.sleep(RATE_LIMIT_CONFIG['429_DELAY'])
-                else:
-                    # Just wait and retry with same model
-                    logger.info(f"Waiting {RATE_LIMIT_CONFIG['429_DELAY']} seconds before retry...")
-                    time.sleep(RATE_LIMIT_CONFIG['429_DELAY'])
-                
+            if _is_rate_limit_error(e):
+                # Back off the model for every worker (Retry-After when given), rotating if it keeps failing
+                delay = model_rotation.record_429(current_model, _retry_after_seconds(e))
+                logger.warning(f"429 Too Many Requests for model {current_model} (consecutive: {model_429_count.get(current_model, 0)}), backing off {delay:.1f}s")
                 continue
             
             if retry_count < max_retries:
@@ -472,12 +624,127 @@ def process_discount_with_groq(discount: Dict[str, Any], max_retries: int = 10)
                 time.sleep(RATE_LIMIT_CONFIG['RETRY_DELAY'])
             else:
                 logger.error(f"{error_message}\nMax retries exceeded. Using original discount.")
-                failed_discounts.add(discount_id)  # Mark as failed
+                _mark_failed(discount_id)  # Mark as failed
                 return discount
     
-    failed_discounts.add(discount_id)  # Mark as failed if we exit the loop
+    _mark_failed(discount_id)  # Mark as failed if we exit the loop
     return discount
 
+def _parse_batch_response(response_content: str) -> Dict[str, Any]:
+    """Map discount_id -> edited discount from a batch response (keyed object or array)"""
+    parsed = json.loads(response_content)
+    items = parsed.get('discounts', parsed) if isinstance(parsed, dict) else parsed
+    if isinstance(items, dict):
+        return {str(key): value for key, value in items.items() if isinstance(value, dict)}
+    if isinstance(items, list):
+        return {str(item.get('discount_id')): item for item in items if isinstance(item, dict)}
+    raise json.JSONDecodeError("Batch response has no discounts", response_content, 0)
+
+def process_discount_batch_with_groq(discounts: List[Dict[str, Any]], max_retries: int = 10) -> List[Dict[str, Any]]:
+    """
+    Enhance several discounts with one JSON Mode request (BATCH_MESSAGE_TEMPLATE).
+    Each returned item is checked with validate_discount_data; only the items
+    that fail are split out and retried (as a smaller batch, then one by one
+    through process_discount_with_groq).
+    
+    Args:
+        discounts: Discount objects from the JSON file
+        max_retries: Retries for discounts that end up on the single-discount path
+        
+    Returns:
+        List aligned with ``discounts``: the edited discount, or the original object on failure
+    """
+    results = list(discounts)
+    pending = [
+        i for i, discount in enumerate(discounts)
+        if discount.get('discount_id', 'unknown') not in processed_discounts
+        and discount.get('discount_id', 'unknown') not in failed_discounts
+    ]
+    # Items are matched back by discount_id, so ids must be present and unique
+    ids = [str(discounts[i].get('discount_id', '')) for i in pending]
+    if len(pending) <= 1 or BATCH_CONFIG['BATCH_SIZE'] <= 1 or '' in ids or len(set(ids)) != len(ids):
+        for i in pending:
+            results[i] = process_discount_with_groq(discounts[i], max_retries=max_retries)
+        return results
+    
+    llm_cache = get_llm_cache()
+    attempts = 0
+    while pending:
+        current_model = model_rotation.current_model
+        
+        # Serve what we can from the response cache before building the request
+        uncached = []
+        for i in pending:
+            cached_response = llm_cache.get(make_key(BATCH_MESSAGE_TEMPLATE, current_model, discounts[i]))
+            edited_discount = json.loads(cached_response) if cached_response is not None else None
+            if edited_discount is not None and validate_discount_data(edited_discount, discounts[i])[0]:
+                results[i] = edited_discount
+                _mark_processed(discounts[i].get('discount_id', 'unknown'))
+            else:
+                uncached.append(i)
+        pending = uncached
+        if len(pending) <= 1:
+            break
+        
+        batch_ids = [str(discounts[i]['discount_id']) for i in pending]
+        user_message = json.dumps({'discounts': [discounts[i] for i in pending]}, indent=2, ensure_ascii=False)
+        current_model = model_rotation.acquire()
+        try:
+            logger.info(f"Sending batch of {len(pending)} discounts ({', '.join(batch_ids)}) to Groq API using model: {current_model}")
+            chat_completion = get_groq_client().chat.completions.create(
+                messages=[
+                    {"role": "system", "content": BATCH_MESSAGE_TEMPLATE},
+                    {"role": "user", "content": user_message}
+                ],
+                model=current_model,
+                max_tokens=BATCH_CONFIG['MAX_TOKENS_PER_ITEM'] * len(pending),
+                response_format={"type": "json_object"}
+            )
+            model_rotation.record_success(current_model)
+            edited_by_id = _parse_batch_response(chat_completion.choices[0].message.content)
+        except Exception as e:
+            if _is_rate_limit_error(e):
+                delay = model_rotation.record_429(current_model, _retry_after_seconds(e))
+                logger.warning(f"429 Too Many Requests for model {current_model} (batch of {len(pending)}), backing off {delay:.1f}s")
+                continue
+            attempts += 1
+            logger.warning(f"❌ Batch request failed for discount IDs {', '.join(batch_ids)}: {str(e)}")
+            if attempts < BATCH_CONFIG['MAX_BATCH_ATTEMPTS']:
+                continue
+            edited_by_id = {}  # Give up on the whole batch; it is split below
+        
+        failing = []
+        for i, discount_id in zip(pending, batch_ids):
+            edited_discount = edited_by_id.get(discount_id)
+            if edited_discount is None:
+                failing.append(i)
+                continue
+            is_valid, validation_errors = validate_discount_data(edited_discount, discounts[i])
+            if not is_valid:
+                logger.warning(f"❌ Validation failed for discount ID {discount_id} in batch: {'; '.join(validation_errors)}")
+                failing.append(i)
+                continue
+            results[i] = edited_discount
+            _mark_processed(discounts[i].get('discount_id', 'unknown'))
+            llm_cache.set(make_key(BATCH_MESSAGE_TEMPLATE, current_model, discounts[i]), json.dumps(edited_discount, ensure_ascii=False))
+        
+        if len(failing) == len(pending):
+            # No progress: halve the batch so a single bad item cannot sink the others
+            half = len(failing) // 2
+            for part in (failing[:half], failing[half:]):
+                part_results = process_discount_batch_with_groq([discounts[i] for i in part], max_retries)
+                for i, edited_discount in zip(part, part_results):
+                    results[i] = edited_discount
+            return results
+        
+        logger.info(f"✅ Batch enhanced {len(pending) - len(failing)}/{len(pending)} discounts, retrying {len(failing)}")
+        pending = failing
+        attempts = 0
+    
+    for i in pending:
+        results[i] = process_discount_with_groq(discounts[i], max_retries=max_retries)
+    return results
+
 # TODO: 
 # create a copy file of the original coupons list.
 # the copy file will contain the list of objects with a change - ID is generated.
@@ -487,16 +754,20 @@ def process_discount_with_groq(discount: Dict[str, Any], max_retries: int = 10)
 # 3 save the copy file as a new file
 #
 
+def _source_hash(discount: Dict[str, Any]) -> str:
+    """Hash of an input discount, to tell a changed discount from one already enhanced"""
+    return hashlib.sha256(normalize_input(discount).encode('utf-8')).hexdigest()
+
 def update_discounts_file(input_file_path: str, output_file_path: str) -> None:
     """
     Process each discount in the JSON file with Groq and create a new file with only successfully processed discounts.
+    Up to RATE_LIMIT_CONFIG['MAX_IN_FLIGHT'] discounts are enhanced concurrently;
+    results are collected (and saved) on the calling thread as they complete.
     
     Args:
         input_file_path: Path to the original hot_discounts.json file
         output_file_path: Path to the new Inhanced_discounts.json file
     """
-    global processed_discounts, failed_discounts
-    
     # Get output directory for tracking state
     output_dir = os.path.dirname(output_file_path)
     # Ensure the output directory exists so incremental writes don't fail
@@ -522,66 +793,109 @@ def update_discounts_file(input_file_path: str, output_file_path: str) -> None:
             logger.warning("Could not read existing enhanced file – starting fresh")
 
     # Ensure processed_discounts reflects already enhanced records
-    for d in enhanced_discounts:
+    enhanced_index = {}  # discount_id -> position in enhanced_discounts
+    for position, d in enumerate(enhanced_discounts):
         did = d.get('discount_id')
         if did:
-            processed_discounts.add(did)
+            _mark_processed(did)
+            enhanced_index[did] = position
+
+    # Re-enhance discounts whose content changed since they were enhanced
+    file_hashes = source_hashes.setdefault(os.path.basename(input_file_path), {})
+    changed_count = 0
+    for d in discounts:
+        did = d.get('discount_id')
+        recorded = file_hashes.get(did)
+        if recorded is None:
+            if did in enhanced_index:
+                # Enhanced before hashes were tracked: the id may have named a
+                # different page back then, so enhance it again
+                processed_discounts.discard(did)
+                changed_count += 1
+        elif recorded != _source_hash(d):
+            processed_discounts.discard(did)
+            failed_discounts.discard(did)
+            changed_count += 1
 
     # Track IDs of deprecated/skipped discounts in this iteration
     deprecated_discount_ids = []
     
     total_discounts = len(discounts)
     log_checkpoint(f"Processing file: {os.path.basename(input_file_path)} with {total_discounts} discounts")
-    log_checkpoint(f"Already processed: {len(processed_discounts)}, Already failed: {len(failed_discounts)}")
+    log_checkpoint(f"Already processed: {len(processed_discounts)}, Already failed: {len(failed_discounts)}, Changed since enhanced: {changed_count}")
     
-    # Process each discount one by one
-    for i, discount in enumerate(discounts):
-        discount_id = discount.get('discount_id', 'unknown')
-        
-        # Log progress every 5 discounts or at the end
-        if (i+1) % 5 == 0 or i+1 == total_discounts:
-            logger.info(f"Progress: {i+1}/{total_discounts} discounts processed (successful: {len(processed_discounts)}, failed: {len(failed_discounts)})")
-            # Save tracking state periodically
-            save_tracking_state(output_dir)
-        
-        # Process with Groq with retry mechanism (up to 10 attempts)
-        edited_discount = process_discount_with_groq(discount, max_retries=10)
-        
-        # Check if the discount is the original one (indicating failed processing after all retries)
-        if edited_discount is discount:
-            logger.warning(f"❌ Failed to enhance discount ID: {discount_id} after all retry attempts")
-            deprecated_discount_ids.append(discount_id)
-            continue
-        
-        # Validate the final result one more time before adding to enhanced list
-        is_valid, validation_errors = validate_discount_data(edited_discount, discount)
-        if not is_valid:
-            logger.error(f"❌ Final validation failed for discount ID: {discount_id}")
-            for error in validation_errors:
-                logger.error(f"  - {error}")
-            deprecated_discount_ids.append(discount_id)
-            continue
-        
-        # Successfully processed and validated, add it to our list
-        enhanced_discounts.append(edited_discount)
-        logger.info(f"✅ Successfully enhanced discount ID: {discount_id}")
-        # -----------------------------------------------------------------
-        #   Incremental persistence: write progress to disk immediately
-        # -----------------------------------------------------------------
+    # Keep MAX_IN_FLIGHT requests running; the shared rate limiter paces them.
+    # Each request carries BATCH_SIZE discounts (see process_discount_batch_with_groq).
+    batch_size = max(1, BATCH_CONFIG['BATCH_SIZE'])
+    batches = [discounts[start:start + batch_size] for start in range(0, total_discounts, batch_size)]
+    executor = ThreadPoolExecutor(max_workers=RATE_LIMIT_CONFIG['MAX_IN_FLIGHT'], thread_name_prefix='groq-enrich')
+    futures = {
+        # Process with Groq with retry mechanism (up to 10 attempts per discount)
+        executor.submit(process_discount_batch_with_groq, batch, 10): batch
+        for batch in batches
+    }
+    
+    i = 0
+    for future in as_completed(futures):
+        batch = futures[future]
         try:
-            with open(output_file_path, 'w', encoding='utf-8') as inc_f:
-                json.dump(enhanced_discounts, inc_f, ensure_ascii=False, indent=2)
-                inc_f.flush()
-                # Ensure data is physically written (durability in case of crash)
-                os.fsync(inc_f.fileno())
-            logger.debug(
-                f"💾 Incremental save – {len(enhanced_discounts)} discounts written to {output_file_path}"
-            )
+            edited_batch = future.result()
         except Exception as e:
-            logger.warning(f"Failed incremental save to {output_file_path}: {e}")
+            logger.error(f"Error processing discount batch: {str(e)}")
+            for d in batch:
+                _mark_failed(d.get('discount_id', 'unknown'))
+            edited_batch = list(batch)
         
-        # Add delay between requests to avoid rate limits
-        time.sleep(RATE_LIMIT_CONFIG['REQUEST_DELAY'])
+        for discount, edited_discount in zip(batch, edited_batch):
+            discount_id = discount.get('discount_id', 'unknown')
+            i += 1
+            
+            # Log progress every 5 discounts or at the end
+            if i % 5 == 0 or i == total_discounts:
+                logger.info(f"Progress: {i}/{total_discounts} discounts processed (successful: {len(processed_discounts)}, failed: {len(failed_discounts)})")
+                # Save tracking state periodically
+                save_tracking_state(output_dir)
+            
+            # Check if the discount is the original one (indicating failed processing after all retries)
+            if edited_discount is discount:
+                logger.warning(f"❌ Failed to enhance discount ID: {discount_id} after all retry attempts")
+                deprecated_discount_ids.append(discount_id)
+                continue
+            
+            # Validate the final result one more time before adding to enhanced list
+            is_valid, validation_errors = validate_discount_data(edited_discount, discount)
+            if not is_valid:
+                logger.error(f"❌ Final validation failed for discount ID: {discount_id}")
+                for error in validation_errors:
+                    logger.error(f"  - {error}")
+                deprecated_discount_ids.append(discount_id)
+                continue
+            
+            # Successfully processed and validated: add it, or replace the previous version
+            position = enhanced_index.get(discount_id)
+            if position is None:
+                enhanced_index[discount_id] = len(enhanced_discounts)
+                enhanced_discounts.append(edited_discount)
+            else:
+                enhanced_discounts[position] = edited_discount
+            file_hashes[discount_id] = _source_hash(discount)
+            logger.info(f"✅ Successfully enhanced discount ID: {discount_id}")
+            # -----------------------------------------------------------------
+            #   Incremental persistence: write progress to disk immediately
+            # -----------------------------------------------------------------
+            try:
+                with open(output_file_path, 'w', encoding='utf-8') as inc_f:
+                    json.dump(enhanced_discounts, inc_f, ensure_ascii=False, indent=2)
+                    inc_f.flush()
+                    # Ensure data is physically written (durability in case of crash)
+                    os.fsync(inc_f.fileno())
+                logger.debug(
+                    f"💾 Incremental save – {len(enhanced_discounts)} discounts written to {output_file_path}"
+                )
+            except Exception as e:
+                logger.warning(f"Failed incremental save to {output_file_path}: {e}")
+    
+    executor.shutdown(wait=True)
     
     # Save final tracking state
     save_tracking_state(output_dir)
@@ -616,6 +930,7 @@ def update_discounts_file(input_file_path: str, output_file_path: str) -> None:
     log_checkpoint(f"  - Total discounts processed: {total_discounts}")
     log_checkpoint(f"  - Successfully enhanced: {successful_count}")
     log_checkpoint(f"  - Failed/deprecated: {deprecated_count}")
+    log_checkpoint(f"  - Response cache: {get_llm_cache().stats()}")
     
     if deprecated_count > 0:
         if len(deprecated_discount_ids) <= 20:
@@ -668,11 +983,14 @@ def find_json_files(data_dir_path=None):
 
 def save_tracking_state(output_dir):
     """Save current tracking state to a file for potential recovery"""
-    global processed_discounts, failed_discounts, model_429_count
+    # Snapshot under the locks: enrichment workers keep adding while this runs
+    with tracking_lock:
+        processed, failed = list(processed_discounts), list(failed_discounts)
     tracking_state = {
-        'processed_discounts': list(processed_discounts),
-        'failed_discounts': list(failed_discounts),
-        'model_429_count': model_429_count,
+        'processed_discounts': processed,
+        'failed_discounts': failed,
+        'model_429_count': model_rotation.failure_snapshot(),
+        'source_hashes': source_hashes,
         'timestamp': datetime.datetime.now().isoformat()
     }
     
@@ -686,7 +1004,6 @@ def save_tracking_state(output_dir):
 
 def load_tracking_state(output_dir):
     """Load tracking state from file if it exists"""
-    global processed_discounts, failed_discounts, model_429_count
     tracking_file = os.path.join(output_dir, 'groq_tracking_state.json')
     
     if os.path.exists(tracking_file):
@@ -697,6 +1014,8 @@ def load_tracking_state(output_dir):
             processed_discounts.update(tracking_state.get('processed_discounts', []))
             failed_discounts.update(tracking_state.get('failed_discounts', []))
             model_429_count.update(tracking_state.get('model_429_count', {}))
+            for file_name, hashes in tracking_state.get('source_hashes', {}).items():
+                source_hashes.setdefault(file_name, {}).update(hashes)
             
             logger.info(f"Loaded tracking state: {len(processed_discounts)} processed, {len(failed_discounts)} failed")
             return True
@@ -707,11 +1026,10 @@ def load_tracking_state(output_dir):
 
 def reset_global_tracking():
     """Reset global tracking variables for processing new files"""
-    global processed_discounts, failed_discounts, model_429_count, current_model_index
     processed_discounts.clear()
     failed_discounts.clear()
-    model_429_count.clear()
-    current_model_index = 0
+    source_hashes.clear()
+    model_rotation.reset()  # Also clears model_429_count
     logger.info("🔄 Reset global tracking for new file processing")
 
 def process_json_files(data_dir_path=None):
@@ -769,11 +1087,6 @@ def process_json_files(data_dir_path=None):
                 log_checkpoint("✅ All discounts successfully enhanced after retries")
 
             success_count += 1
-            
-            # Add delay between files to avoid rate limits
-            if success_count < len(json_files):  # Don't delay after the last file
-                logger.info(f"Waiting {RATE_LIMIT_CONFIG['MODEL_SWITCH_DELAY']} seconds before processing next file...")
-                time.sleep(RATE_LIMIT_CONFIG['MODEL_SWITCH_DELAY'])
                 
         except Exception as e:
             logger.error(f"Error processing file {input_file_path}: {str(e)}")
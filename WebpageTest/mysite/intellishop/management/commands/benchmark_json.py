@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.http import JsonResponse
+from bson import ObjectId
+from intellishop.utils.coupon_cards import SUMMARY
+from intellishop.utils.fast_json import FastJsonResponse, loads
+import copy
+import datetime
+import glob
+import json
+import os
+import statistics
+import time
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+
+class Command(BaseCommand):
+    help = 'Compare JsonResponse with FastJsonResponse on discount list payloads built from data/enhanced_*_rows.json'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help='Discounts per response')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per encoder')
+        parser.add_argument('--summary', action='store_true', help='Use the SUMMARY card shape instead of full documents')
+
+    def handle(self, *args, **options):
+        documents = self._load_documents(options['count'])
+        if options['summary']:
+            documents = SUMMARY.serialize_many(documents)
+        self.stdout.write(f"{len(documents)} discounts per response, {options['repeat']} runs")
+
+        baseline_runs = []
+        for _ in range(options['repeat']):
+            discounts = copy.deepcopy(documents)
+            start = time.perf_counter()
+            baseline = self._current_response(discounts)
+            baseline_runs.append(time.perf_counter() - start)
+
+        fast_runs = []
+        for _ in range(options['repeat']):
+            start = time.perf_counter()
+            fast = FastJsonResponse({'discounts': documents, 'total_count': len(documents), 'next_cursor': None})
+            fast_runs.append(time.perf_counter() - start)
+
+        if json.loads(baseline.content) != loads(fast.content):
+            raise CommandError('FastJsonResponse output differs from JsonResponse')
+
+        baseline_ms = statistics.median(baseline_runs) * 1000
+        fast_ms = statistics.median(fast_runs) * 1000
+        self.stdout.write(f"JsonResponse (str(_id) pass + stdlib json): {baseline_ms:8.2f} ms  {len(baseline.content):>10,} bytes")
+        self.stdout.write(f"FastJsonResponse (orjson, BSON-aware):      {fast_ms:8.2f} ms  {len(fast.content):>10,} bytes")
+        self.stdout.write(self.style.SUCCESS(f"Speedup: {baseline_ms / fast_ms:.1f}x"))
+
+    def _load_documents(self, count):
+        """Real coupon rows, repeated up to ``count`` with the BSON types MongoDB returns"""
+        rows = []
+        for path in sorted(glob.glob(os.path.join(DATA_DIR, 'enhanced_*_rows.json'))):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                self.stdout.write(self.style.WARNING(f"Skipping {os.path.basename(path)}: {str(e)}"))
+                continue
+            rows.extend(data if isinstance(data, list) else [data])
+        if not rows:
+            raise CommandError(f'No enhanced_*_rows.json files found in {DATA_DIR}')
+
+        now = datetime.datetime.utcnow().replace(microsecond=0)
+        documents = []
+        for idx in range(count):
+            document = dict(rows[idx % len(rows)])
+            document['_id'] = ObjectId()
+            document['discount_id'] = str(document['_id'])
+            document['expires_at'] = now
+            documents.append(document)
+        return documents
+
+    def _current_response(self, discounts):
+        """The list endpoints before FastJsonResponse: rewrite _id, then JsonResponse"""
+        for discount in discounts:
+            if '_id' in discount:
+                discount['_id'] = str(discount['_id'])
+        return JsonResponse({'discounts': discounts, 'total_count': len(discounts), 'next_cursor': None})
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
+from intellishop.models.mongodb_models import Club
 from intellishop.utils.mongodb_utils import get_collection_handle
+from intellishop.utils.catalog_cache import bump_catalog_version
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +16,8 @@ class Command(BaseCommand):
         if collection is not None:
             try:
                 result = collection.delete_many({})
+                Club.rebuild()
+                bump_catalog_version()
                 self.stdout.write(
                     self.style.SUCCESS(f'Successfully cleared {result.deleted_count} coupons from collection')
                 )
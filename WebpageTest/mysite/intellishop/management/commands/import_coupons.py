@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand, CommandError
-from intellishop.models.mongodb_models import Coupon
+from intellishop.models.mongodb_models import Club, Coupon
+from intellishop.utils.catalog_cache import bump_catalog_version
 from django.conf import settings
 import os
 import json
@@ -78,6 +79,8 @@ class Command(BaseCommand):
         if collection is not None:
             try:
                 result = collection.delete_many({})
+                Club.rebuild()
+                bump_catalog_version()
                 self.stdout.write(self.style.SUCCESS(f'Deleted {result.deleted_count} existing coupons'))
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f'Error clearing coupons: {str(e)}'))
@@ -1,9 +1,9 @@
 from django.core.management.base import BaseCommand, CommandError
-from intellishop.models.mongodb_models import Coupon
+from intellishop.models.mongodb_models import Club, Coupon
+from intellishop.utils.catalog_cache import bump_catalog_version
 import os
 import json
 import csv
-import datetime
 import logging
 from django.conf import settings
 
@@ -105,6 +105,8 @@ class Command(BaseCommand):
             if collection is not None:
                 try:
                     result = collection.delete_many({})
+                    Club.rebuild()
+                    bump_catalog_version()
                     self.stdout.write(self.style.SUCCESS(f'Deleted {result.deleted_count} existing offers'))
                 except Exception as e:
                     self.stdout.write(self.style.ERROR(f'Error clearing offers: {str(e)}'))
@@ -195,6 +197,10 @@ class Command(BaseCommand):
                 Coupon.insert_one(offer)
                 valid_count += 1
         
+        if valid_count:
+            Club.rebuild()
+            bump_catalog_version()
+        
         # Display results
         self.stdout.write(self.style.SUCCESS(f'Processed {total_count} offers:'))
         self.stdout.write(f'  Valid: {valid_count}')
@@ -229,11 +235,8 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.WARNING(f'No offer found with code: {code}'))
                 
         elif remove_expired:
-            # Remove all expired offers
-            current_date = datetime.datetime.utcnow().isoformat()
-            result = collection.delete_many({
-                'valid_until': {'$lt': current_date}
-            })
+            # Remove all expired offers (by the parsed expires_at, not the valid_until string)
+            result = collection.delete_many(Coupon.expired_query())
             self.stdout.write(self.style.SUCCESS(f'Removed {result.deleted_count} expired offers'))
             
         elif remove_all:
@@ -243,6 +246,11 @@ class Command(BaseCommand):
             
         else:
             self.stdout.write(self.style.WARNING('No removal criteria specified. Use --code, --expired, or --all'))
+            return
+        
+        if result.deleted_count > 0:
+            Club.rebuild()
+            bump_catalog_version()
 
     def list_offers(self, options):
         active_only = options.get('active')
@@ -257,16 +265,10 @@ class Command(BaseCommand):
         query = {}
         
         if active_only:
-            current_date = datetime.datetime.utcnow().isoformat()
-            query['$or'] = [
-                {'valid_until': {'$exists': False}},
-                {'valid_until': None},
-                {'valid_until': {'$gt': current_date}}
-            ]
+            query.update(Coupon.unexpired_query())
             
         if expired_only:
-            current_date = datetime.datetime.utcnow().isoformat()
-            query['valid_until'] = {'$lt': current_date}
+            query.update(Coupon.expired_query())
             
         if code_filter:
             # Use regex for partial matching
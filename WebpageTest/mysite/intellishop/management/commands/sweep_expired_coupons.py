@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from pymongo.errors import PyMongoError
+from intellishop.models.mongodb_models import Coupon
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Flag expired coupons as inactive (for cron; the web process also sweeps in the background)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Move inactive coupons to the archive collection',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            backfilled = Coupon.backfill_expiry()
+            result = Coupon.sweep_expired(archive=options.get('archive', False))
+        except PyMongoError as e:
+            logger.error(f"Expiry sweep failed: {str(e)}")
+            raise CommandError(f'Expiry sweep failed: {str(e)}')
+
+        if backfilled:
+            self.stdout.write(f'Backfilled expiry fields on {backfilled} coupons')
+        self.stdout.write(self.style.SUCCESS(
+            f"Expired {result['expired']} coupons, archived {result['archived']}"
+        ))
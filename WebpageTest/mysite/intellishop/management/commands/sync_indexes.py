@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from pymongo.errors import PyMongoError
+from intellishop.models.mongodb_models import User, Coupon, SessionRecord
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Models whose declared indexes are managed by this command
+MODELS = [User, Coupon, SessionRecord]
+
+class Command(BaseCommand):
+    help = 'Create the indexes declared on the MongoDB models and verify every query shape uses one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Drop indexes that are not declared on the models',
+        )
+        parser.add_argument(
+            '--check-only',
+            action='store_true',
+            help='Only explain the query shapes, do not create or drop indexes',
+        )
+
+    def handle(self, *args, **options):
+        failed = False
+
+        if not options.get('check_only'):
+            for model in MODELS:
+                failed |= self._sync(model, options.get('prune', False))
+
+        for model in MODELS:
+            failed |= self._check(model)
+
+        if failed:
+            raise CommandError('Index sync or query plan check failed')
+        self.stdout.write(self.style.SUCCESS('All query shapes are served by an index'))
+
+    def _sync(self, model, prune):
+        result = model.sync_indexes(prune=prune)
+        for outcome in ('created', 'rebuilt', 'dropped', 'unchanged'):
+            for name in result[outcome]:
+                self.stdout.write(f"{model.collection_name}.{name}: {outcome}")
+        for name, error in result['failed']:
+            self.stdout.write(self.style.ERROR(f"{model.collection_name}.{name}: {error}"))
+        return bool(result['failed'])
+
+    def _check(self, model):
+        """Explain each canonical query and flag collection scans"""
+        failed = False
+        for shape, query in model.query_shapes().items():
+            try:
+                stages = model.explain_query(query)
+            except (PyMongoError, AttributeError) as e:
+                self.stdout.write(self.style.ERROR(f"{model.collection_name} [{shape}]: explain failed - {str(e)}"))
+                failed = True
+                continue
+
+            indexes = sorted({index for _, index in stages if index})
+            plan = ' <- '.join(stage for stage, _ in stages if stage)
+            if any(stage == 'COLLSCAN' for stage, _ in stages):
+                self.stdout.write(self.style.ERROR(f"{model.collection_name} [{shape}]: COLLSCAN ({plan})"))
+                logger.warning(f"Query shape '{shape}' on {model.collection_name} is not covered by an index: {query}")
+                failed = True
+            else:
+                self.stdout.write(f"{model.collection_name} [{shape}]: {plan} using {', '.join(indexes) or 'no index'}")
+        return failed
@@ -0,0 +1,104 @@
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+from intellishop.models.mongodb_models import User
+from intellishop.utils.db_profiler import set_current_view, reset_current_view
+
+
+class QueryProfilingMiddleware:
+    """
+    Tag every MongoDB command with the URL route that issued it (see db_profiler).
+    Sync and async capable, so async views are not pushed onto a thread under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Awaited in the request's own task, so the view tag stays in its context
+            self.process_view = self._aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request._db_profiler_token = None
+        try:
+            return self.get_response(request)
+        finally:
+            self._reset(request)
+
+    async def __acall__(self, request):
+        request._db_profiler_token = None
+        try:
+            return await self.get_response(request)
+        finally:
+            self._reset(request)
+
+    def _reset(self, request):
+        if request._db_profiler_token is not None:
+            reset_current_view(request._db_profiler_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self._tag_view(request, view_func)
+        return None
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self._tag_view(request, view_func)
+        return None
+
+    def _tag_view(self, request, view_func):
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name if match else None) or getattr(view_func, '__name__', None)
+        request._db_profiler_token = set_current_view(view_name)
+
+
+def get_user(request):
+    """Logged-in user document for this request (None for anonymous), loaded once"""
+    if not hasattr(request, '_cached_intellishop_user'):
+        user_id = request.session.get('user_id')
+        request._cached_intellishop_user = User.get_cached(user_id) if user_id else None
+    return request._cached_intellishop_user
+
+
+async def aget_user(request):
+    """Async variant of get_user"""
+    if not hasattr(request, '_cached_intellishop_user'):
+        user_id = await request.session.aget('user_id')
+        request._cached_intellishop_user = await User.aget_cached(user_id) if user_id else None
+    return request._cached_intellishop_user
+
+
+class UserMiddleware:
+    """
+    Attach the logged-in user as the lazy ``request.intellishop_user`` (and
+    ``await request.aintellishop_user()`` for async views). The document comes
+    from User.get_cached and is read at most once per request.
+    Must come after SessionMiddleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self._attach(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self._attach(request)
+        return await self.get_response(request)
+
+    def _attach(self, request):
+        request.intellishop_user = SimpleLazyObject(partial(get_user, request))
+        request.aintellishop_user = partial(aget_user, request)
@@ -80,7 +80,9 @@ TEXT_SEARCH_CONFIG = {
     'CASE_SENSITIVE': False,
     'MIN_WORD_LENGTH': 2,
     'MAX_RESULTS': 1000,
-    'SEARCH_OPERATOR': 'AND'  # 'AND' or 'OR' - using AND for individual words
+    'SEARCH_OPERATOR': 'AND',  # 'AND' or 'OR' - using AND for individual words
+    'BACKEND': 'inverted_index',  # 'inverted_index' (in-process index) or 'regex' (legacy $regex scan)
+    'TOKENS_FIELD': 'search_tokens'  # Precomputed normalized tokens stored on each coupon at import
 }
 
 # Update FILTER_CONFIG to include text search
@@ -124,4 +126,107 @@ FAVORITES_CONFIG = {
     'MAX_FAVORITES': 100,  # Maximum number of favorites per user
     'FIELD_NAME': 'favorites',
     'ID_FIELD': 'discount_id'
-}
\ No newline at end of file
+}
+
+# Process-wide coupon catalog cache (see intellishop/utils/catalog_cache.py)
+CATALOG_CACHE_CONFIG = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 256,             # Cached query results kept per process (LRU)
+    'MAX_DOCUMENTS': 50000,         # Memory budget: total documents across all entries
+    'VERSION_CHECK_INTERVAL': 5,    # Seconds between catalog version polls
+    'USE_CHANGE_STREAM': True,      # Invalidate immediately when the server supports change streams
+    'META_COLLECTION': 'catalog_meta'
+}
+
+# Paging for the discount list endpoints (keyset on _id, see MongoDBModel.find_page)
+PAGINATION_CONFIG = {
+    'DEFAULT_PAGE_SIZE': 24,     # Used when a cursor is given without a limit
+    'MAX_PAGE_SIZE': 200,        # Requested limits are clamped to this
+    'STREAM_BATCH_SIZE': 500,    # Cursor batch size for streamed (NDJSON) responses
+    'ID_BATCH_SIZE': 500         # Text search ids sent per $in (find_ids / count / iter_find with ids)
+}
+
+# Fields rendered on a coupon card (static/js/coupon-utils.js); list endpoints send only these
+COUPON_CARD_FIELDS = [
+    'discount_id',
+    'title',
+    'price',
+    'price_type',
+    'discount_type',
+    'description',
+    'image_link',
+    'discount_link',
+    'terms_and_conditions',
+    'valid_until',
+    'usage_limit',
+    'coupon_code',
+    'provider_link'
+]
+
+# Server-rendered cards (templates/intellishop/partials/coupon_card.html) also show the store
+COUPON_DETAIL_FIELDS = COUPON_CARD_FIELDS + ['club_name']
+
+# Coupon card shapes (see intellishop/utils/coupon_cards.py)
+COUPON_CARD_CONFIG = {
+    'PREVIEW_LENGTH': 250,  # Summary cards cut long texts here (same as the "show more" cutoff)
+    'PREVIEW_FIELDS': ['description', 'terms_and_conditions']
+}
+
+# Coupon import engine (Coupon.import_from_json / import_from_csv)
+IMPORT_CONFIG = {
+    'BATCH_SIZE': 500   # Write operations per unordered bulk_write round trip
+}
+
+# Persistent cache of Groq responses (see intellishop/utils/llm_cache.py)
+LLM_CACHE_CONFIG = {
+    'ENABLED': True,
+    'PATH': None,                       # SQLite file; None -> $LLM_CACHE_PATH or mysite/llm_cache.sqlite3
+    'MAX_ENTRIES': 20000,               # LRU bound on stored responses
+    'TTL_SECONDS': 30 * 24 * 3600,      # Responses older than this are treated as misses
+    'EVICT_EVERY': 100                  # Run eviction after this many writes
+}
+
+# Personalized home feed ranking (see intellishop/utils/ranking.py)
+RANKING_CONFIG = {
+    'FEED_SIZE': 10,            # Coupons shown on the home page
+    'FAVORITE_BOOST': 1000      # Added to the score of coupons the user already favorited
+}
+
+# MongoDB command profiling (see intellishop/utils/db_profiler.py, /db_profile/)
+QUERY_PROFILING_CONFIG = {
+    'ENABLED': True,
+    'SLOW_QUERY_MS': 100,           # Commands at least this slow are logged to intellishop.slow_queries
+    'BUFFER_SIZE': 1000,            # Most recent commands kept in memory
+    'MAX_SHAPES': 2000,             # Distinct (view, collection, command, shape) aggregates kept
+    'EXPLAIN_SAMPLE_RATE': 0.01     # Fraction of model finds re-run with explain() to sample docsExamined
+}
+
+# Coupon expiry: valid_until (display string) is parsed at import into the
+# expires_at Date and the is_active flag that every catalog query filters on
+EXPIRY_CONFIG = {
+    'DATE_FORMATS': ['%d.%m.%y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y'],  # valid_until formats, tried in order
+    'SWEEP_INTERVAL': 300,              # Seconds between in-process expiry sweeps (0 disables the thread)
+    'ARCHIVE_COLLECTION': 'coupons_expired'     # Target of sweep_expired_coupons --archive
+}
+
+# Filter selecting live coupons (served by the partial indexes on Coupon)
+ACTIVE_COUPON_FILTER = {'is_active': True}
+
+# Session backend (intellishop/session_backend.py): in-process LRU in front of MongoDB
+SESSION_STORE_CONFIG = {
+    'LRU_SIZE': 10000,      # Sessions kept per process
+    'LOCAL_TTL': 5          # Seconds a cached session is trusted before re-reading MongoDB
+}
+
+# User profile cache (intellishop/utils/user_cache.py): user documents per process
+USER_CACHE_CONFIG = {
+    'ENABLED': True,
+    'TTL': 10,              # Seconds a cached user is served (bounds staleness across workers)
+    'MAX_SIZE': 5000        # Users kept per process (LRU)
+}
+
+# Conditional GET on catalog-derived views (intellishop/utils/http_cache.py)
+HTTP_CACHE_CONFIG = {
+    'ENABLED': True,
+    'ETAG_PREFIX': '1'      # Bump when templates or response formats change, to invalidate browser copies
+}
@@ -1,18 +1,134 @@
 from bson import ObjectId
+from bson.errors import InvalidId
+import bisect
 import datetime
 import logging
 import re
+from asgiref.sync import sync_to_async
 from jsonschema import validate, ValidationError
+from django.utils.text import slugify
+from pymongo import ASCENDING, DeleteOne, IndexModel, InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 import json
 import csv
 import os
-from .constants import CATEGORIES, CONSUMER_STATUS, DISCOUNT_TYPE, FILTER_CONFIG
+from .constants import (
+    CATEGORIES, CONSUMER_STATUS, DISCOUNT_TYPE, FILTER_CONFIG, IMPORT_CONFIG,
+    EXPIRY_CONFIG, ACTIVE_COUPON_FILTER, PAGINATION_CONFIG
+)
+from intellishop.utils.hebrew_text import document_tokens
+from intellishop.utils.catalog_cache import catalog_cache, bump_catalog_version
+from intellishop.utils.ranking import get_ranking_matrix
+from intellishop.utils.db_profiler import profiled
+from intellishop.utils import user_cache
 
 logger = logging.getLogger(__name__)
 
+# Index options that make two definitions with the same name different
+INDEX_OPTIONS = ('unique', 'sparse', 'partialFilterExpression', 'expireAfterSeconds')
+
+def _index_matches(current, spec):
+    """Compare an index from index_information() with an IndexModel document"""
+    if list(current.get('key', [])) != list(spec['key'].items()):
+        return False
+    for option in INDEX_OPTIONS:
+        if option in ('unique', 'sparse'):
+            if bool(current.get(option)) != bool(spec.get(option)):
+                return False
+        elif current.get(option) != spec.get(option):
+            return False
+    return True
+
+def _plan_stages(plan):
+    """Flatten an explain() winning plan into (stage, index name) pairs"""
+    if 'queryPlan' in plan:  # Slot-based engine (MongoDB 5+) wraps the classic plan
+        plan = plan['queryPlan']
+    stages = [(plan.get('stage'), plan.get('indexName'))]
+    children = list(plan.get('inputStages', []))
+    if 'inputStage' in plan:
+        children.append(plan['inputStage'])
+    for child in children:
+        stages.extend(_plan_stages(child))
+    return stages
+
 class MongoDBModel:
     """Base class for MongoDB models"""
     collection_name = None
+    default_projection = None  # Projection applied to reads when none is given
+    indexes = []  # IndexModel declarations, applied by sync_indexes()
+    
+    @classmethod
+    def sync_indexes(cls, prune=False):
+        """
+        Create the declared indexes. Safe to run repeatedly: matching indexes
+        are left alone and an index whose options changed is rebuilt.
+        
+        Args:
+            prune (bool): Also drop indexes that are no longer declared
+            
+        Returns:
+            dict: Index names per outcome ('created', 'unchanged', 'rebuilt',
+                'dropped') and (name, error) pairs under 'failed'
+        """
+        result = {'created': [], 'unchanged': [], 'rebuilt': [], 'dropped': [], 'failed': []}
+        collection = cls.get_collection()
+        if collection is None:
+            result['failed'].append((cls.collection_name, 'Could not get collection handle'))
+            return result
+        
+        existing = collection.index_information()
+        for index in cls.indexes:
+            spec = index.document
+            name = spec['name']
+            current = existing.get(name)
+            try:
+                if current is None:
+                    collection.create_indexes([index])
+                    result['created'].append(name)
+                elif _index_matches(current, spec):
+                    result['unchanged'].append(name)
+                else:
+                    collection.drop_index(name)
+                    collection.create_indexes([index])
+                    result['rebuilt'].append(name)
+            except PyMongoError as e:
+                logger.error(f"Error creating index {cls.collection_name}.{name}: {str(e)}")
+                result['failed'].append((name, str(e)))
+        
+        if prune:
+            declared = {index.document['name'] for index in cls.indexes}
+            for name in existing:
+                if name == '_id_' or name in declared:
+                    continue
+                try:
+                    collection.drop_index(name)
+                    result['dropped'].append(name)
+                except PyMongoError as e:
+                    logger.error(f"Error dropping index {cls.collection_name}.{name}: {str(e)}")
+                    result['failed'].append((name, str(e)))
+        return result
+    
+    @classmethod
+    def query_shapes(cls):
+        """Canonical production queries, checked against the indexes by explain_query()"""
+        return {}
+    
+    @classmethod
+    def explain_query(cls, query, sort=None):
+        """
+        Run explain() on a query and return its winning plan
+        
+        Returns:
+            list: (stage, index name) pairs, e.g. [('FETCH', None), ('IXSCAN', 'category_1')]
+        """
+        collection = cls.get_collection()
+        if collection is None:
+            return []
+        cursor = collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = cursor.explain()
+        return _plan_stages(explanation.get('queryPlanner', {}).get('winningPlan', {}))
     
     @classmethod
     def get_collection(cls):
@@ -21,19 +137,30 @@ class MongoDBModel:
         return get_collection_handle(cls.collection_name)
     
     @classmethod
-    def find_one(cls, query):
+    @profiled('find_one', explain=True)
+    def find_one(cls, query, projection=None):
         """Find a single document"""
         collection = cls.get_collection()
         if collection is not None:  # Add explicit None check
-            return collection.find_one(query)
+            return collection.find_one(query, projection or cls.default_projection)
         return None
     
     @classmethod
-    def find(cls, query=None, sort=None, limit=None):
+    def find(cls, query=None, sort=None, limit=None, projection=None):
         """Find multiple documents"""
+        return cls._find(query, sort=sort, limit=limit, projection=projection)
+    
+    @classmethod
+    @profiled('find', explain=True)
+    def _find(cls, query=None, sort=None, limit=None, projection=None):
+        """
+        Find multiple documents straight from the collection, bypassing any
+        cache a subclass puts in front of find. Used for per-request query
+        shapes (keyset pages, id batches) that would only churn such a cache.
+        """
         collection = cls.get_collection()
         if collection is not None:  # Add explicit None check
-            cursor = collection.find(query or {})
+            cursor = collection.find(query or {}, projection or cls.default_projection)
             
             if sort:
                 cursor = cursor.sort(sort)
@@ -45,6 +172,109 @@ class MongoDBModel:
         return []  # Return empty list instead of None for consistency
     
     @classmethod
+    def find_page(cls, query=None, limit=20, after=None, projection=None, ids=None):
+        """
+        Keyset (seek) pagination ordered by ``_id``.
+        
+        Each page is a bounded ``_id > after`` range scan on the primary key
+        index, so deep pages cost the same as the first one and concurrent
+        inserts never shift or duplicate results.
+        
+        Args:
+            query (dict): Filter query
+            limit (int): Page size
+            after (ObjectId): ``_id`` of the last document of the previous page
+            projection (dict): Fields to return
+            ids (list): Sorted ``_id`` values to restrict the page to (see find_ids)
+            
+        Returns:
+            tuple: (documents, next_after) - next_after is None on the last page
+        """
+        # Fetch one extra document to know whether another page exists
+        if ids is not None:
+            documents = cls.find_ids(query, ids, limit=limit + 1, after=after, projection=projection)
+        else:
+            page_query = query or {}
+            if after is not None:
+                seek = {'_id': {'$gt': after}}
+                page_query = {'$and': [page_query, seek]} if page_query else seek
+            documents = cls._find(page_query, sort=[('_id', 1)], limit=limit + 1, projection=projection)
+        if len(documents) > limit:
+            documents = documents[:limit]
+            return documents, documents[-1]['_id']
+        return documents, None
+    
+    @classmethod
+    def find_ids(cls, query, ids, limit=None, after=None, projection=None):
+        """
+        Documents matching ``query`` whose ``_id`` is in ``ids`` (e.g. text search
+        matches), in ``_id`` order. The ids are sent PAGINATION_CONFIG['ID_BATCH_SIZE']
+        at a time, starting after the keyset cursor, until ``limit`` documents are
+        found - never as one ``$in`` over every id.
+        
+        Args:
+            query (dict): Filter query
+            ids (list): Sorted ``_id`` values
+            limit (int): Maximum number of documents (None for all)
+            after (ObjectId): Only ids greater than this
+            projection (dict): Fields to return
+            
+        Returns:
+            list: Matching documents
+        """
+        documents = []
+        for id_batch in cls._id_batches(ids, after):
+            remaining = limit - len(documents) if limit else None
+            documents.extend(cls._find(cls._with_ids(query, id_batch), sort=[('_id', 1)], limit=remaining, projection=projection))
+            if limit and len(documents) >= limit:
+                break
+        return documents
+    
+    @classmethod
+    def _id_batches(cls, ids, after=None):
+        """Consecutive slices of the sorted ``ids`` past ``after``"""
+        start = bisect.bisect_right(ids, after) if after is not None else 0
+        batch_size = PAGINATION_CONFIG['ID_BATCH_SIZE']
+        for offset in range(start, len(ids), batch_size):
+            yield ids[offset:offset + batch_size]
+    
+    @classmethod
+    def _with_ids(cls, query, id_batch):
+        condition = {'_id': {'$in': id_batch}}
+        return {'$and': [query, condition]} if query else condition
+    
+    @classmethod
+    def iter_find(cls, query=None, projection=None, batch_size=None, ids=None):
+        """Yield matching documents in ``_id`` order without materializing the result"""
+        if ids is not None:
+            for id_batch in cls._id_batches(ids):
+                yield from cls.iter_find(cls._with_ids(query, id_batch), projection, batch_size)
+            return
+        collection = cls.get_collection()
+        if collection is None:
+            return
+        cursor = collection.find(query or {}, projection or cls.default_projection).sort('_id', 1)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        try:
+            for document in cursor:
+                yield document
+        finally:
+            cursor.close()
+    
+    @classmethod
+    @profiled('count')
+    def count(cls, query=None, ids=None):
+        """Count documents matching the query (and, given sorted ``ids``, in them)"""
+        if ids is not None:
+            return sum(cls.count(cls._with_ids(query, id_batch)) for id_batch in cls._id_batches(ids))
+        collection = cls.get_collection()
+        if collection is not None:
+            return collection.count_documents(query or {})
+        return 0
+    
+    @classmethod
+    @profiled('insert_one')
     def insert_one(cls, document):
         """Insert a document into the collection"""
         collection = cls.get_collection()
@@ -54,6 +284,7 @@ class MongoDBModel:
         return None
     
     @classmethod
+    @profiled('update_one')
     def update_one(cls, filter_dict, update_data, upsert=False):
         """
         Update a single document in the collection.
@@ -75,17 +306,158 @@ class MongoDBModel:
         return collection.update_one(filter_dict, update_data, upsert=upsert)
     
     @classmethod
+    @profiled('delete_one')
     def delete_one(cls, query):
         """Delete a document from the collection"""
         collection = cls.get_collection()
         if collection is not None:  # Add explicit None check
             return collection.delete_one(query)
         return None
+    
+    # Async data layer: the same API for async views (``await Model.afind(...)``),
+    # running on the AsyncMongoClient of the current event loop
+    
+    @classmethod
+    def get_async_collection(cls):
+        """Get the MongoDB collection for this model on the async client"""
+        from intellishop.utils.mongodb_utils import get_async_collection_handle
+        return get_async_collection_handle(cls.collection_name)
+    
+    @classmethod
+    @profiled('find_one', explain=True)
+    async def afind_one(cls, query, projection=None):
+        """Async variant of find_one"""
+        collection = cls.get_async_collection()
+        if collection is not None:
+            return await collection.find_one(query, projection or cls.default_projection)
+        return None
+    
+    @classmethod
+    async def afind(cls, query=None, sort=None, limit=None, projection=None):
+        """Async variant of find"""
+        return await cls._afind(query, sort=sort, limit=limit, projection=projection)
+    
+    @classmethod
+    @profiled('find', explain=True)
+    async def _afind(cls, query=None, sort=None, limit=None, projection=None):
+        """Async variant of _find"""
+        collection = cls.get_async_collection()
+        if collection is not None:
+            cursor = collection.find(query or {}, projection or cls.default_projection)
+            
+            if sort:
+                cursor = cursor.sort(sort)
+            
+            if limit:
+                cursor = cursor.limit(limit)
+            
+            return await cursor.to_list()
+        return []
+    
+    @classmethod
+    async def afind_page(cls, query=None, limit=20, after=None, projection=None, ids=None):
+        """Async variant of find_page (keyset pagination on ``_id``)"""
+        if ids is not None:
+            documents = await cls.afind_ids(query, ids, limit=limit + 1, after=after, projection=projection)
+        else:
+            page_query = query or {}
+            if after is not None:
+                seek = {'_id': {'$gt': after}}
+                page_query = {'$and': [page_query, seek]} if page_query else seek
+            documents = await cls._afind(page_query, sort=[('_id', 1)], limit=limit + 1, projection=projection)
+        if len(documents) > limit:
+            documents = documents[:limit]
+            return documents, documents[-1]['_id']
+        return documents, None
+    
+    @classmethod
+    async def afind_ids(cls, query, ids, limit=None, after=None, projection=None):
+        """Async variant of find_ids"""
+        documents = []
+        for id_batch in cls._id_batches(ids, after):
+            remaining = limit - len(documents) if limit else None
+            documents.extend(await cls._afind(cls._with_ids(query, id_batch), sort=[('_id', 1)], limit=remaining, projection=projection))
+            if limit and len(documents) >= limit:
+                break
+        return documents
+    
+    @classmethod
+    async def aiter_find(cls, query=None, projection=None, batch_size=None, ids=None):
+        """Async variant of iter_find: yield matching documents in ``_id`` order"""
+        if ids is not None:
+            for id_batch in cls._id_batches(ids):
+                async for document in cls.aiter_find(cls._with_ids(query, id_batch), projection, batch_size):
+                    yield document
+            return
+        collection = cls.get_async_collection()
+        if collection is None:
+            return
+        cursor = collection.find(query or {}, projection or cls.default_projection).sort('_id', 1)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        try:
+            async for document in cursor:
+                yield document
+        finally:
+            await cursor.close()
+    
+    @classmethod
+    @profiled('count')
+    async def acount(cls, query=None, ids=None):
+        """Async variant of count"""
+        if ids is not None:
+            return sum([await cls.acount(cls._with_ids(query, id_batch)) for id_batch in cls._id_batches(ids)])
+        collection = cls.get_async_collection()
+        if collection is not None:
+            return await collection.count_documents(query or {})
+        return 0
+    
+    @classmethod
+    @profiled('insert_one')
+    async def ainsert_one(cls, document):
+        """Async variant of insert_one"""
+        collection = cls.get_async_collection()
+        if collection is not None:
+            result = await collection.insert_one(document)
+            return result.inserted_id
+        return None
+    
+    @classmethod
+    @profiled('update_one')
+    async def aupdate_one(cls, filter_dict, update_data, upsert=False):
+        """Async variant of update_one"""
+        collection = cls.get_async_collection()
+        
+        if not any(key.startswith('$') for key in update_data.keys()):
+            update_data = {'$set': update_data}
+        
+        return await collection.update_one(filter_dict, update_data, upsert=upsert)
+    
+    @classmethod
+    @profiled('delete_one')
+    async def adelete_one(cls, query):
+        """Async variant of delete_one"""
+        collection = cls.get_async_collection()
+        if collection is not None:
+            return await collection.delete_one(query)
+        return None
 
 # Add this User model for MongoDB
 class User(MongoDBModel):
     collection_name = 'users'
     
+    indexes = [
+        IndexModel([('username', ASCENDING)], unique=True),
+        IndexModel([('email', ASCENDING)], unique=True),
+    ]
+    
+    @classmethod
+    def query_shapes(cls):
+        return {
+            'login by username': {'username': 'user'},
+            'login by email': {'email': 'user@example.com'},
+        }
+    
     @classmethod
     def create_user(cls, username, password, email, status, age, location, hobbies):
         """Create a new user in MongoDB"""
@@ -117,6 +489,70 @@ class User(MongoDBModel):
         """Get a user by ID"""
         return cls.find_one({'_id': ObjectId(user_id)})
 
+    @classmethod
+    def get_cached(cls, user_id):
+        """
+        Get a user by ID through the short-TTL user cache (see utils/user_cache.py)
+        
+        Args:
+            user_id (str): User ID, as stored in the session
+            
+        Returns:
+            dict: User document, or None if the ID is invalid or unknown
+        """
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                object_id = ObjectId(user_id)
+            except (InvalidId, TypeError):
+                return None
+            user = cls.find_one({'_id': object_id})
+            user_cache.put(user_id, user)
+        return user
+
+    @classmethod
+    async def aget_cached(cls, user_id):
+        """Async variant of get_cached"""
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                object_id = ObjectId(user_id)
+            except (InvalidId, TypeError):
+                return None
+            user = await cls.afind_one({'_id': object_id})
+            user_cache.put(user_id, user)
+        return user
+
+    @classmethod
+    def _invalidate_cached(cls, filter_dict):
+        """Drop the written user from the user cache (every user if the filter is not by _id)"""
+        user_id = filter_dict.get('_id')
+        user_cache.invalidate(user_id if isinstance(user_id, (ObjectId, str)) else None)
+
+    @classmethod
+    def update_one(cls, filter_dict, update_data, upsert=False):
+        result = super().update_one(filter_dict, update_data, upsert=upsert)
+        cls._invalidate_cached(filter_dict)
+        return result
+
+    @classmethod
+    def delete_one(cls, query):
+        result = super().delete_one(query)
+        cls._invalidate_cached(query)
+        return result
+
+    @classmethod
+    async def aupdate_one(cls, filter_dict, update_data, upsert=False):
+        result = await super().aupdate_one(filter_dict, update_data, upsert=upsert)
+        cls._invalidate_cached(filter_dict)
+        return result
+
+    @classmethod
+    async def adelete_one(cls, query):
+        result = await super().adelete_one(query)
+        cls._invalidate_cached(query)
+        return result
+
     @classmethod
     def add_favorite(cls, user_id, discount_id):
         """Add a discount to user's favorites"""
@@ -136,21 +572,344 @@ class User(MongoDBModel):
     @classmethod
     def get_favorites(cls, user_id):
         """Get user's favorite discount IDs"""
-        user = cls.find_one({'_id': ObjectId(user_id)})
+        user = cls.get_cached(user_id)
         return user.get('favorites', []) if user else []
 
     @classmethod
     def is_favorite(cls, user_id, discount_id):
         """Check if a discount is in user's favorites"""
-        user = cls.find_one({'_id': ObjectId(user_id)})
-        if user and 'favorites' in user:
-            return discount_id in user['favorites']
-        return False
+        # The cached user document already carries the favorites
+        return discount_id in cls.get_favorites(user_id)
+
+    @classmethod
+    def get_favorite_statuses(cls, user_id, discount_ids):
+        """
+        Check many discounts against the user's favorites with a single read
+        
+        Args:
+            user_id (str): User ID
+            discount_ids (list): Discount IDs to check
+            
+        Returns:
+            dict: discount_id -> bool
+        """
+        favorites = set(cls.get_favorites(user_id))
+        return {discount_id: discount_id in favorites for discount_id in discount_ids}
+
+    @classmethod
+    async def aget_favorites(cls, user_id):
+        """Async variant of get_favorites"""
+        user = await cls.aget_cached(user_id)
+        return user.get('favorites', []) if user else []
+
+    @classmethod
+    async def ais_favorite(cls, user_id, discount_id):
+        """Async variant of is_favorite"""
+        return discount_id in await cls.aget_favorites(user_id)
+
+# Django sessions (intellishop.session_backend); expired sessions are removed by the TTL index
+class SessionRecord(MongoDBModel):
+    collection_name = 'sessions'
+    
+    indexes = [
+        IndexModel([('expire_date', ASCENDING)], expireAfterSeconds=0),
+    ]
 
 # Updated Coupon model with new schema
 class Coupon(MongoDBModel):
     collection_name = 'coupons'
     
+    # Precomputed search tokens are internal - keep them out of normal reads
+    default_projection = {FILTER_CONFIG['TEXT_SEARCH']['TOKENS_FIELD']: 0}
+    
+    indexes = [
+        # Favorites ($in), add_favorite_view and import upserts; legacy documents
+        # without a discount_id are left out instead of colliding on null
+        IndexModel(
+            [('discount_id', ASCENDING)],
+            unique=True,
+            partialFilterExpression={'discount_id': {'$exists': True}}
+        ),
+        IndexModel([('coupon_code', ASCENDING)]),
+        # Unfiltered catalog pages: is_active equality, then _id keyset order
+        IndexModel([('is_active', ASCENDING), ('_id', ASCENDING)]),
+        # The filter indexes below only cover live coupons (ACTIVE_COUPON_FILTER),
+        # which every catalog query includes.
+        # Expiry sweeper: active coupons whose expires_at has passed
+        IndexModel([('expires_at', ASCENDING)], partialFilterExpression=ACTIVE_COUPON_FILTER),
+        # Array fields (multikey). MongoDB cannot build a compound index over two
+        # array fields, so statuses and categories are indexed separately
+        IndexModel([('category', ASCENDING)], partialFilterExpression=ACTIVE_COUPON_FILTER),
+        IndexModel([('consumer_statuses', ASCENDING)], partialFilterExpression=ACTIVE_COUPON_FILTER),
+        IndexModel([('club_name', ASCENDING)], partialFilterExpression=ACTIVE_COUPON_FILTER),
+        # Price / percentage range filters always pin discount_type
+        IndexModel(
+            [('discount_type', ASCENDING), ('price', ASCENDING)],
+            partialFilterExpression=ACTIVE_COUPON_FILTER
+        ),
+    ]
+    
+    @classmethod
+    def query_shapes(cls):
+        """Query shapes produced by the views and _build_parameter_query"""
+        status = CONSUMER_STATUS[0]
+        category = CATEGORIES[0]
+        bucket = next(iter(FILTER_CONFIG['PERCENTAGE_BUCKETS']))
+        price_range = {'enabled': True, 'max_value': 100}
+        percentage_range = {'enabled': True, 'bucket': bucket}
+        parameter_filters = {
+            'statuses': {'statuses': [status]},
+            'interests': {'interests': [category]},
+            'statuses + interests': {'statuses': [status], 'interests': [category]},
+            'price range': {'price_range': price_range},
+            'percentage range': {'percentage_range': percentage_range},
+            'price or percentage range': {'price_range': price_range, 'percentage_range': percentage_range},
+            'interests + price range': {'interests': [category], 'price_range': price_range},
+        }
+        shapes = {
+            name: cls.active_query(cls._build_parameter_query(filters))
+            for name, filters in parameter_filters.items()
+        }
+        shapes.update({
+            'all active': cls.active_query(),
+            'club coupons': cls.active_query({'club_name': {'$in': ['club']}}),
+            'expiry sweep': {'is_active': True, 'expires_at': {'$lte': datetime.datetime.utcnow()}},
+            'favorites': {'discount_id': {'$in': ['1', '2']}},
+            'discount by id': {'discount_id': '1'},
+            'coupon by code': {'coupon_code': 'CODE'},
+        })
+        return shapes
+    
+    @classmethod
+    def active_query(cls, query=None):
+        """Restrict a catalog query to live (not expired) coupons"""
+        active = dict(query or {})
+        active.update(ACTIVE_COUPON_FILTER)
+        return active
+    
+    @classmethod
+    def expired_query(cls, now=None):
+        """Coupons flagged inactive, or past expires_at but not swept yet"""
+        now = now or datetime.datetime.utcnow()
+        return {'$or': [{'is_active': False}, {'expires_at': {'$lte': now}}]}
+    
+    @classmethod
+    def unexpired_query(cls, now=None):
+        """Live coupons whose expires_at has not passed (the complement of expired_query)"""
+        now = now or datetime.datetime.utcnow()
+        return cls.active_query({'$nor': [{'expires_at': {'$lte': now}}]})
+    
+    @classmethod
+    def parse_expiry(cls, value):
+        """
+        Convert a valid_until value to the Date stored in ``expires_at``.
+        Dates without a time are valid through the end of that day (UTC).
+        
+        Args:
+            value: valid_until string (any of EXPIRY_CONFIG['DATE_FORMATS'] or ISO) or datetime
+            
+        Returns:
+            datetime: Naive UTC expiry, or None when there is no parseable expiry
+        """
+        if isinstance(value, datetime.datetime):
+            return value
+        if not value or not isinstance(value, str):
+            return None
+        value = value.strip()
+        for date_format in EXPIRY_CONFIG['DATE_FORMATS']:
+            try:
+                return datetime.datetime.strptime(value, date_format) + datetime.timedelta(days=1)
+            except ValueError:
+                continue
+        try:
+            parsed = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return parsed
+    
+    @classmethod
+    def _expiry_fields(cls, valid_until, now=None):
+        """expires_at / is_active for a valid_until value (unknown expiry counts as active)"""
+        now = now or datetime.datetime.utcnow()
+        expires_at = cls.parse_expiry(valid_until)
+        return {'expires_at': expires_at, 'is_active': expires_at is None or expires_at > now}
+    
+    @classmethod
+    def _with_expiry(cls, document):
+        """document plus expires_at / is_active derived from its valid_until, unless it sets is_active"""
+        if 'is_active' in document:
+            return document
+        return {**document, **cls._expiry_fields(document.get('valid_until'))}
+    
+    @classmethod
+    def _with_expiry_update(cls, update_data, upsert=False):
+        """
+        Keep expires_at / is_active in step with a write that sets valid_until,
+        so the coupon is visible to active_query (and the ACTIVE_COUPON_FILTER indexes)
+        
+        Args:
+            update_data: Update document (operators, or plain fields meaning $set)
+            upsert: An upsert without valid_until still gets the fields on insert
+            
+        Returns:
+            dict: The update document with the expiry fields added
+        """
+        if not any(key.startswith('$') for key in update_data.keys()):
+            update_data = {'$set': update_data}
+        set_fields = update_data.get('$set', {})
+        if 'valid_until' in set_fields:
+            return {**update_data, '$set': cls._with_expiry(set_fields)}
+        if upsert and 'is_active' not in set_fields:
+            on_insert = update_data.get('$setOnInsert', {})
+            on_insert = {key: value for key, value in cls._with_expiry(on_insert).items() if key not in set_fields}
+            return {**update_data, '$setOnInsert': on_insert}
+        return update_data
+    
+    @classmethod
+    def insert_one(cls, document):
+        return super().insert_one(cls._with_expiry(document))
+    
+    @classmethod
+    def update_one(cls, filter_dict, update_data, upsert=False):
+        return super().update_one(filter_dict, cls._with_expiry_update(update_data, upsert), upsert=upsert)
+    
+    @classmethod
+    async def ainsert_one(cls, document):
+        return await super().ainsert_one(cls._with_expiry(document))
+    
+    @classmethod
+    async def aupdate_one(cls, filter_dict, update_data, upsert=False):
+        return await super().aupdate_one(filter_dict, cls._with_expiry_update(update_data, upsert), upsert=upsert)
+    
+    @classmethod
+    def sweep_expired(cls, archive=False, now=None):
+        """
+        Flag coupons whose expiry has passed as inactive, in one bulk update
+        
+        Args:
+            archive (bool): Also move every inactive coupon to EXPIRY_CONFIG['ARCHIVE_COLLECTION']
+            now (datetime): Reference time (defaults to utcnow)
+            
+        Returns:
+            dict: {'expired': flagged count, 'archived': moved count}
+        """
+        result = {'expired': 0, 'archived': 0}
+        collection = cls.get_collection()
+        if collection is None:
+            return result
+        
+        now = now or datetime.datetime.utcnow()
+        update = collection.update_many(
+            {'is_active': True, 'expires_at': {'$lte': now}},
+            {'$set': {'is_active': False, 'expired_at': now}}
+        )
+        result['expired'] = update.modified_count
+        if archive:
+            result['archived'] = cls._archive_inactive(collection)
+        
+        if result['expired'] or result['archived']:
+            logger.info(f"Expiry sweep: {result['expired']} expired, {result['archived']} archived")
+            cls._catalog_changed()
+        return result
+    
+    @classmethod
+    def _archive_inactive(cls, collection):
+        """Move inactive coupons to the archive collection in batches"""
+        from intellishop.utils.mongodb_utils import get_collection_handle
+        archive = get_collection_handle(EXPIRY_CONFIG['ARCHIVE_COLLECTION'])
+        if archive is None:
+            return 0
+        
+        archived = 0
+        while True:
+            batch = list(collection.find({'is_active': False}).limit(IMPORT_CONFIG['BATCH_SIZE']))
+            if not batch:
+                return archived
+            try:
+                archive.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                # Already archived by an earlier, interrupted run
+                if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                    raise
+            collection.delete_many({'_id': {'$in': [document['_id'] for document in batch]}})
+            archived += len(batch)
+    
+    @classmethod
+    def backfill_expiry(cls):
+        """
+        Set expires_at / is_active on coupons imported before they existed
+        
+        Returns:
+            int: Number of coupons updated
+        """
+        collection = cls.get_collection()
+        if collection is None:
+            return 0
+        
+        now = datetime.datetime.utcnow()
+        updated = 0
+        writes = []
+        for document in collection.find({'is_active': {'$exists': False}}, {'valid_until': 1}):
+            writes.append(UpdateOne(
+                {'_id': document['_id']},
+                {'$set': cls._expiry_fields(document.get('valid_until'), now)}
+            ))
+            if len(writes) >= IMPORT_CONFIG['BATCH_SIZE']:
+                updated += collection.bulk_write(writes, ordered=False).modified_count
+                writes = []
+        if writes:
+            updated += collection.bulk_write(writes, ordered=False).modified_count
+        
+        if updated:
+            logger.info(f"Backfilled expiry fields on {updated} coupons")
+            cls._catalog_changed()
+        return updated
+    
+    @classmethod
+    def _catalog_changed(cls):
+        """Drop derived state after coupons changed outside an import"""
+        from intellishop.utils.search_index import invalidate_search_index
+        invalidate_search_index()
+        Club.rebuild()
+        bump_catalog_version()
+    
+    @classmethod
+    def find(cls, query=None, sort=None, limit=None, projection=None):
+        """
+        Find multiple coupons, served from the process-wide catalog cache.
+        Meant for catalog-wide query shapes (the active catalog, a club, a
+        parameter filter); per-request reads such as keyset pages, id batches
+        and favorites go through _find so they don't evict those entries.
+        """
+        key = repr(('find', query, sort, limit, projection))
+        return catalog_cache.get_or_load(
+            key,
+            lambda: cls._find(query, sort=sort, limit=limit, projection=projection),
+            cls.get_collection()
+        )
+    
+    @classmethod
+    async def afind(cls, query=None, sort=None, limit=None, projection=None):
+        """Async variant of find, sharing the catalog cache entries"""
+        key = repr(('find', query, sort, limit, projection))
+        return await catalog_cache.aget_or_load(
+            key,
+            lambda: cls._afind(query, sort=sort, limit=limit, projection=projection),
+            cls.get_collection()
+        )
+    
+    @classmethod
+    def get_club_names(cls):
+        """Get the names of all clubs with live coupons, sorted alphabetically (from the club directory)"""
+        return [club['name'] for club in Club.directory()]
+    
+    @classmethod
+    async def aget_club_names(cls):
+        """Async variant of get_club_names"""
+        return [club['name'] for club in await Club.adirectory()]
+    
     # Define the updated coupon schema using imported constants
     schema = {
         "type": "object",
@@ -236,8 +995,53 @@ class Coupon(MongoDBModel):
     
     @classmethod
     def get_all(cls):
-        """Get all coupons in the collection"""
-        return list(cls.find({}))
+        """Get all live (not expired) coupons in the collection"""
+        return list(cls.find(cls.active_query()))
+    
+    @classmethod
+    def find_by_ids(cls, ids, projection=None):
+        """
+        Fetch coupons by ``_id``, returned in the order of ``ids``.
+        Not cached: the id lists are per request and would churn the catalog cache.
+        """
+        collection = cls.get_collection()
+        if collection is None or not ids:
+            return []
+        documents = collection.find({'_id': {'$in': list(ids)}}, projection or cls.default_projection)
+        by_id = {document['_id']: document for document in documents}
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+    
+    @classmethod
+    def find_by_discount_ids(cls, discount_ids, projection=None):
+        """
+        Fetch coupons by ``discount_id`` (e.g. a user's favorites).
+        Not cached: every user's list is a different ``$in`` query.
+        """
+        if not discount_ids:
+            return []
+        return cls._find({'discount_id': {'$in': list(discount_ids)}}, projection=projection)
+    
+    @classmethod
+    def get_personalized_feed(cls, statuses=None, interests=None, favorite_ids=None, limit=None, projection=None):
+        """
+        Rank the catalog for a user's home feed.
+        
+        Candidates are the coupons matching the user's statuses and interests
+        plus their favorites; they are scored by overlap with the categories and
+        statuses of the favorites, with a boost for the favorites themselves.
+        
+        Args:
+            statuses (list): User consumer statuses
+            interests (list): User categories (hobbies)
+            favorite_ids (list): discount_ids the user favorited
+            limit (int): Number of coupons (defaults to RANKING_CONFIG['FEED_SIZE'])
+            projection (dict): Fields to fetch for the winning coupons
+            
+        Returns:
+            list: Coupons, best first
+        """
+        ranking = get_ranking_matrix(cls)
+        return cls.find_by_ids(ranking.top_k(statuses, interests, favorite_ids, k=limit), projection)
     
     @classmethod
     def get_by_code(cls, code):
@@ -247,15 +1051,7 @@ class Coupon(MongoDBModel):
     @classmethod
     def get_active_coupons(cls):
         """Get all active coupons (not expired)"""
-        current_date = datetime.datetime.utcnow().isoformat()
-        return cls.find({
-            '$or': [
-                {'valid_until': {'$exists': False}},
-                {'valid_until': None},
-                {'valid_until': ''},
-                {'valid_until': {'$gt': current_date}}
-            ]
-        })
+        return cls.get_all()
     
     @classmethod
     def get_filtered_coupons(cls, filters=None):
@@ -308,38 +1104,54 @@ class Coupon(MongoDBModel):
         Returns:
             list: Matching coupons
         """
-        if not search_text or len(search_text.strip()) < FILTER_CONFIG['TEXT_SEARCH']['MIN_WORD_LENGTH']:
+        if not cls._split_search_words(search_text):
             return cls.get_all()
         
-        # Clean and prepare search text
-        search_text = search_text.strip()
-        
-        # Split into words
-        search_words = [word.strip() for word in search_text.split() if len(word.strip()) >= FILTER_CONFIG['TEXT_SEARCH']['MIN_WORD_LENGTH']]
-        
-        if not search_words:
-            return cls.get_all()
+        # All words must be found (AND logic for words)
+        return cls._find_search_results(*cls.build_filtered_search({'text_search': search_text}))
+
+    @classmethod
+    def _split_search_words(cls, search_text):
+        """Split search text into words long enough to search for"""
+        min_length = FILTER_CONFIG['TEXT_SEARCH']['MIN_WORD_LENGTH']
+        if not search_text or len(search_text.strip()) < min_length:
+            return []
+        return [word.strip() for word in search_text.strip().split() if len(word.strip()) >= min_length]
+
+    @classmethod
+    def _text_match_ids(cls, search_words):
+        """
+        Ids of the coupons containing every word, from the inverted index
+        (TEXT_SEARCH['BACKEND'] == 'inverted_index').
         
-        # Build query where each word must be found in at least one text field
+        Args:
+            search_words (list): Words that must all be found
+            
+        Returns:
+            list: Matching ``_id`` values in ascending order (the keyset order of
+            find_ids / find_page), or None when the regex backend is used
+        """
+        if FILTER_CONFIG['TEXT_SEARCH'].get('BACKEND') != 'inverted_index':
+            return None
+        from intellishop.utils.search_index import get_search_index
+        collection = cls.get_collection()
+        if collection is None:
+            return None
+        return sorted(get_search_index(collection).search(search_words))
+    
+    @classmethod
+    def _build_text_query(cls, search_words):
+        """
+        Build the legacy ``$regex`` condition for the AND-of-words text search
+        (each word must be found in at least one field: OR logic for fields)
+        """
         word_conditions = []
-        searchable_fields = FILTER_CONFIG['SEARCHABLE_FIELDS']
-        
         for word in search_words:
-            # For each word, it must appear in at least one of the searchable fields
             field_conditions = []
-            for field in searchable_fields:
-                # Use simple case-insensitive regex pattern
+            for field in FILTER_CONFIG['SEARCHABLE_FIELDS']:
                 field_conditions.append({field: {'$regex': word, '$options': 'i'}})
-            
-            # Word must be found in at least one field (OR logic for fields)
             word_conditions.append({'$or': field_conditions})
-        
-        # All words must be found (AND logic for words)
-        if word_conditions:
-            query = {'$and': word_conditions}
-            return cls.find(query, limit=FILTER_CONFIG['TEXT_SEARCH']['MAX_RESULTS'])
-        
-        return []
+        return {'$and': word_conditions}
 
     @classmethod
     def _parameters_only_search(cls, filters):
@@ -354,7 +1166,7 @@ class Coupon(MongoDBModel):
             list: Matching coupons
         """
         query = cls._build_parameter_query(filters)
-        return cls.find(query)
+        return cls.find(cls.active_query(query))
 
     @classmethod
     def _combined_search(cls, filters):
@@ -368,34 +1180,66 @@ class Coupon(MongoDBModel):
         Returns:
             list: Matching coupons
         """
-        # Build the complete query with both parameter and text filters
-        query = cls._build_parameter_query(filters)
+        return cls._find_search_results(*cls.build_filtered_search(filters))
+
+    @classmethod
+    def _find_search_results(cls, query, ids):
+        """The first TEXT_SEARCH['MAX_RESULTS'] results of build_filtered_search, in ``_id`` order"""
+        max_results = FILTER_CONFIG['TEXT_SEARCH']['MAX_RESULTS']
+        if query is None:
+            return []
+        if ids is not None:
+            return cls.find_ids(query, ids, limit=max_results)
+        # The query embeds the user's search text, so it isn't worth caching
+        return cls._find(query, sort=[('_id', 1)], limit=max_results)
+
+    @classmethod
+    def build_filtered_search(cls, filters=None):
+        """
+        Build the search behind all three search scenarios, for callers that
+        page or stream the results themselves.
+        
+        With the inverted index backend the text matches are returned as a
+        sorted id list instead of an ``$in`` inside the query: pass it as
+        ``ids`` to find_page / count / iter_find, which send it in bounded
+        batches from the keyset cursor on.
         
-        # Add text search conditions to the query
-        search_text = filters['text_search']
-        if search_text and len(search_text.strip()) >= FILTER_CONFIG['TEXT_SEARCH']['MIN_WORD_LENGTH']:
-            search_text = search_text.strip()
-            search_words = [word.strip() for word in search_text.split() if len(word.strip()) >= FILTER_CONFIG['TEXT_SEARCH']['MIN_WORD_LENGTH']]
+        Args:
+            filters (dict): Validated filters (text_search and/or parameters)
             
-            if search_words:
-                # Build text search conditions
-                word_conditions = []
-                searchable_fields = FILTER_CONFIG['SEARCHABLE_FIELDS']
-                
-                for word in search_words:
-                    field_conditions = []
-                    for field in searchable_fields:
-                        field_conditions.append({field: {'$regex': word, '$options': 'i'}})
-                    word_conditions.append({'$or': field_conditions})
-                
-                # Add text conditions to existing query
-                if word_conditions:
-                    if '$and' in query:
-                        query['$and'].extend(word_conditions)
-                    else:
-                        query['$and'] = word_conditions
+        Returns:
+            tuple: (query, ids) - query is None when nothing can match; ids is
+            None when there is no indexed text condition
+        """
+        filters = filters or {}
+        query = cls._build_parameter_query(filters)
+        ids = None
         
-        return cls.find(query, limit=FILTER_CONFIG['TEXT_SEARCH']['MAX_RESULTS'])
+        search_words = cls._split_search_words(filters.get('text_search'))
+        if search_words:
+            ids = cls._text_match_ids(search_words)
+            if ids is None:
+                # Regex backend: add the text conditions to the query
+                query.setdefault('$and', []).append(cls._build_text_query(search_words))
+            elif not ids:
+                return None, None
+        
+        return cls.active_query(query), ids
+    
+    @classmethod
+    async def abuild_filtered_search(cls, filters=None):
+        """
+        Async variant of build_filtered_search. The search is built in memory; only
+        the first text search of a process loads the search index, in a thread.
+        """
+        from intellishop.utils.search_index import get_search_index
+        index_pending = (
+            FILTER_CONFIG['TEXT_SEARCH'].get('BACKEND') == 'inverted_index'
+            and not get_search_index().is_built
+        )
+        if (filters or {}).get('text_search') and index_pending:
+            return await sync_to_async(cls.build_filtered_search, thread_sensitive=False)(filters)
+        return cls.build_filtered_search(filters)
 
     @classmethod
     def _build_parameter_query(cls, filters):
@@ -511,30 +1355,73 @@ class Coupon(MongoDBModel):
         """
         Get statistics for filter options (counts, ranges, etc.)
         
+        All facets are computed by a single $facet aggregation and cached
+        until the next catalog change.
+        
         Returns:
             dict: Statistics for filter configuration
         """
+        stats = catalog_cache.get_or_load(
+            'filter_statistics',
+            lambda: [cls._aggregate_filter_statistics()],
+            cls.get_collection()
+        )
+        return stats[0]
+    
+    @classmethod
+    def _aggregate_filter_statistics(cls):
+        """Run the facet aggregation behind get_filter_statistics"""
+        buckets = FILTER_CONFIG['PERCENTAGE_BUCKETS']
         stats = {
             'price_range': {'min': 0, 'max': 0},
-            'percentage_counts': {}
+            'percentage_counts': {bucket_name: 0 for bucket_name in buckets},
+            'category_counts': {},
+            'status_counts': {}
         }
         
-        # Get price range for fixed_amount discounts
-        fixed_amount_coupons = cls.find({'discount_type': 'fixed_amount'})
-        if fixed_amount_coupons:
-            prices = [float(c.get('price', 0)) for c in fixed_amount_coupons if c.get('price') is not None]
-            if prices:
-                stats['price_range']['min'] = min(prices)
-                stats['price_range']['max'] = max(prices)
-        
-        # Get percentage counts
-        percentage_coupons = cls.find({'discount_type': 'percentage'})
-        for bucket_name, bucket_config in FILTER_CONFIG['PERCENTAGE_BUCKETS'].items():
-            count = len(cls.find({
-                'discount_type': 'percentage',
-                'price': {'$gte': bucket_config['min'], '$lte': bucket_config['max']}
-            }))
-            stats['percentage_counts'][bucket_name] = count
+        collection = cls.get_collection()
+        if collection is None:
+            return stats
+        
+        facets = {
+            # Price range for fixed_amount discounts
+            'price_range': [
+                {'$match': {'discount_type': 'fixed_amount', 'price': {'$type': 'number'}}},
+                {'$group': {'_id': None, 'min': {'$min': '$price'}, 'max': {'$max': '$price'}}}
+            ],
+            'category_counts': [
+                {'$unwind': '$category'},
+                {'$group': {'_id': '$category', 'count': {'$sum': 1}}}
+            ],
+            'status_counts': [
+                {'$unwind': '$consumer_statuses'},
+                {'$group': {'_id': '$consumer_statuses', 'count': {'$sum': 1}}}
+            ]
+        }
+        # Percentage bucket counts
+        for bucket_name, bucket_config in buckets.items():
+            facets[f'bucket_{bucket_name}'] = [
+                {'$match': {
+                    'discount_type': 'percentage',
+                    'price': {'$gte': bucket_config['min'], '$lte': bucket_config['max']}
+                }},
+                {'$count': 'count'}
+            ]
+        
+        # Statistics describe the live catalog only, like every catalog query
+        result = next(collection.aggregate([{'$match': ACTIVE_COUPON_FILTER}, {'$facet': facets}]), {})
+        
+        if result.get('price_range'):
+            stats['price_range']['min'] = float(result['price_range'][0]['min'])
+            stats['price_range']['max'] = float(result['price_range'][0]['max'])
+        for bucket_name in buckets:
+            counted = result.get(f'bucket_{bucket_name}')
+            if counted:
+                stats['percentage_counts'][bucket_name] = counted[0]['count']
+        for facet in ('category_counts', 'status_counts'):
+            for row in result.get(facet, []):
+                if row['_id']:
+                    stats[facet][row['_id']] = row['count']
         
         return stats
     
@@ -559,6 +1446,7 @@ class Coupon(MongoDBModel):
             if not isinstance(json_data, list):
                 json_data = [json_data]
             
+            rows = []  # (entry, normalized coupon) pairs for the bulk writer
             for idx, coupon_data in enumerate(json_data):
                 try:
                     # Validate required fields
@@ -590,26 +1478,9 @@ class Coupon(MongoDBModel):
                                 })
                                 continue
                     
-                    # Normalize coupon data
+                    # Normalize coupon data; it is written in bulk below
                     normalized_data = cls._normalize_coupon_data(coupon_data)
-                    
-                    # Insert or update coupon
-                    if 'discount_id' in normalized_data and normalized_data['discount_id']:
-                        # Update by discount_id
-                        filter_dict = {'discount_id': normalized_data['discount_id']}
-                        cls.update_one(filter_dict, normalized_data, upsert=True)
-                    elif 'coupon_code' in normalized_data and normalized_data['coupon_code']:
-                        # Update by coupon_code
-                        filter_dict = {'coupon_code': normalized_data['coupon_code']}
-                        cls.update_one(filter_dict, normalized_data, upsert=True)
-                    else:
-                        # Insert as new and then update discount_id to match the inserted _id
-                        inserted_id = cls.insert_one(normalized_data)
-                        if inserted_id:
-                            # back-fill discount_id with the generated ObjectId string
-                            cls.update_one({'_id': inserted_id}, {'discount_id': str(inserted_id)})
-                    
-                    results['success'] += 1
+                    rows.append(((idx+1, coupon_data.get('title', 'Unknown')), normalized_data))
                 
                 except Exception as e:
                     error_msg = f"Entry #{idx+1}: Error processing coupon '{coupon_data.get('title', 'Unknown')}': {str(e)}"
@@ -620,11 +1491,145 @@ class Coupon(MongoDBModel):
                         'error': str(e)
                     })
             
+            summary = cls._bulk_import(rows)
+            results['success'] += summary['new'] + summary['updated']
+            for (entry, title), error in summary['failed']:
+                results['errors'].append(f"Entry #{entry}: Error processing coupon '{title}': {error}")
+                results['details'].append({
+                    'entry': entry,
+                    'title': title,
+                    'error': error
+                })
+            
         except Exception as e:
             results['errors'].append(f"Error during JSON import: {str(e)}")
         
         return results
 
+    @classmethod
+    def _build_write(cls, coupon):
+        """
+        Turn a normalized coupon into its bulk write operation.
+        
+        The ObjectId is generated client-side so ``discount_id`` is stored in
+        the same write instead of a follow-up update. Coupons are matched by
+        ``discount_id`` first, then by ``coupon_code``; anything else is new.
+        
+        Args:
+            coupon (dict): Normalized coupon document
+            
+        Returns:
+            tuple: (filter identifying the written coupon, write operation)
+        """
+        document = dict(coupon)
+        if document.get('discount_id'):
+            filter_dict = {'discount_id': document['discount_id']}
+            return filter_dict, UpdateOne(filter_dict, {'$set': document}, upsert=True)
+        
+        document.pop('discount_id', None)
+        object_id = ObjectId()
+        if document.get('coupon_code'):
+            filter_dict = {'coupon_code': document['coupon_code']}
+            return filter_dict, UpdateOne(filter_dict, {
+                '$set': document,
+                '$setOnInsert': {'_id': object_id, 'discount_id': str(object_id)}
+            }, upsert=True)
+        
+        document['_id'] = object_id
+        document['discount_id'] = str(object_id)
+        return {'_id': object_id}, InsertOne(document)
+
+    @classmethod
+    def _bulk_import(cls, rows):
+        """
+        Write normalized coupons with unordered ``bulk_write`` batches of
+        IMPORT_CONFIG['BATCH_SIZE'], then refresh the search index and bump
+        the catalog version once.
+        
+        Args:
+            rows (list): (entry, normalized coupon) pairs; ``entry`` identifies the row in errors
+            
+        Returns:
+            dict: 'new' and 'updated' counts and 'failed' (entry, error message) pairs
+        """
+        summary = {'new': 0, 'updated': 0, 'failed': []}
+        written_filters = []
+        touched_clubs = set()  # club_name values before and after the import
+        collection = cls.get_collection()
+        if collection is None:
+            summary['failed'] = [(entry, 'Database connection unavailable') for entry, _ in rows]
+            return summary
+        
+        batch = []          # (entry, filter, operation)
+        batch_keys = set()  # Coupons already written by this batch
+        for entry, coupon in rows:
+            filter_dict, operation = cls._build_write(coupon)
+            key = tuple(filter_dict.items())
+            # Unordered batches may apply writes in any order; keep repeated
+            # coupons in separate batches so the last row still wins
+            if key in batch_keys or len(batch) >= IMPORT_CONFIG['BATCH_SIZE']:
+                cls._flush_writes(collection, batch, summary, written_filters, touched_clubs)
+                batch, batch_keys = [], set()
+            batch.append((entry, filter_dict, operation))
+            batch_keys.add(key)
+            touched_clubs.update(Club.names_of(coupon.get('club_name')))
+        if batch:
+            cls._flush_writes(collection, batch, summary, written_filters, touched_clubs)
+        
+        cls._refresh_search_index(written_filters)
+        if written_filters:
+            cls._refresh_clubs(touched_clubs)
+            bump_catalog_version()
+        return summary
+
+    @classmethod
+    def _flush_writes(cls, collection, batch, summary, written_filters, touched_clubs):
+        """Send one unordered bulk_write and record the outcome of every row"""
+        # Clubs the updated coupons belong to now, so moving a coupon recounts both clubs
+        existing = [filter_dict for _, filter_dict, operation in batch if not isinstance(operation, InsertOne)]
+        if existing:
+            for document in collection.find({'$or': existing}, {'club_name': 1}):
+                touched_clubs.update(Club.names_of(document.get('club_name')))
+        try:
+            details = collection.bulk_write([operation for _, _, operation in batch], ordered=False).bulk_api_result
+        except BulkWriteError as e:
+            # Unordered: the other writes of the batch were still applied
+            details = e.details
+        except Exception as e:
+            summary['failed'].extend((entry, str(e)) for entry, _, _ in batch)
+            return
+        
+        upserted = {item['index'] for item in details.get('upserted', [])}
+        failed = {error['index']: error.get('errmsg', 'Write failed') for error in details.get('writeErrors', [])}
+        for idx, (entry, filter_dict, operation) in enumerate(batch):
+            if idx in failed:
+                summary['failed'].append((entry, failed[idx]))
+                continue
+            if isinstance(operation, InsertOne) or idx in upserted:
+                summary['new'] += 1
+            else:
+                summary['updated'] += 1
+            written_filters.append(filter_dict)
+
+    @classmethod
+    def _refresh_clubs(cls, touched_clubs):
+        """Incrementally update the club directory after an import"""
+        try:
+            Club.refresh(touched_clubs)
+        except Exception as e:
+            logger.warning(f"Could not refresh club directory after import: {str(e)}")
+
+    @classmethod
+    def _refresh_search_index(cls, written_filters):
+        """Incrementally re-index coupons written by an import"""
+        if not written_filters:
+            return
+        try:
+            from intellishop.utils.search_index import refresh_documents
+            refresh_documents(cls.get_collection(), {'$or': written_filters})
+        except Exception as e:
+            logger.warning(f"Could not refresh search index after import: {str(e)}")
+
     @classmethod
     def _validate_coupon_data_types(cls, coupon_data, entry_idx, results):
         """Validate data types of coupon fields"""
@@ -671,7 +1676,7 @@ class Coupon(MongoDBModel):
             
             # Try to parse in known formats
             parsed = False
-            for date_format in ['%d.%m.%y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y']:
+            for date_format in EXPIRY_CONFIG['DATE_FORMATS']:
                 try:
                     datetime.datetime.strptime(date_str, date_format)
                     parsed = True
@@ -737,7 +1742,7 @@ class Coupon(MongoDBModel):
         if 'valid_until' in normalized and normalized['valid_until']:
             date_str = normalized['valid_until']
             # Try common date formats
-            for date_format in ['%d.%m.%y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y']:
+            for date_format in EXPIRY_CONFIG['DATE_FORMATS']:
                 try:
                     date_obj = datetime.datetime.strptime(date_str, date_format)
                     normalized['valid_until'] = date_obj.strftime('%Y-%m-%d')  # ISO format
@@ -745,6 +1750,10 @@ class Coupon(MongoDBModel):
                 except ValueError:
                     continue
         
+        # Date-typed expiry: valid_until stays the display string, expires_at /
+        # is_active drive the active-coupon indexes and the expiry sweeper
+        normalized.update(cls._expiry_fields(normalized.get('valid_until')))
+        
         # Ensure numeric price value
         if 'price' in normalized and normalized['price'] is not None:
             try:
@@ -753,6 +1762,11 @@ class Coupon(MongoDBModel):
                 # If conversion fails, set a default price
                 normalized['price'] = 0
         
+        # Precompute normalized search tokens once, so searches never re-tokenize text
+        normalized[FILTER_CONFIG['TEXT_SEARCH']['TOKENS_FIELD']] = document_tokens(
+            normalized, FILTER_CONFIG['SEARCHABLE_FIELDS']
+        )
+        
         return normalized
 
     @classmethod
@@ -827,6 +1841,7 @@ class Coupon(MongoDBModel):
                     'status': 'consumer_statuses'
                 }
                 
+                rows = []  # (row number, normalized coupon) pairs for the bulk writer
                 for row in reader:
                     results['total'] += 1
                     
@@ -855,32 +1870,19 @@ class Coupon(MongoDBModel):
                             results['errors'].append(f"Row {results['total']}: {str(e)}")
                             continue
                         
-                        # Check if we want to update by coupon_code (if it exists)
-                        if 'coupon_code' in coupon and coupon['coupon_code']:
-                            existing = cls.find_one({'coupon_code': coupon['coupon_code']})
-                            
-                            if existing:
-                                # Update existing coupon
-                                cls.update_one({'_id': existing['_id']}, coupon)
-                                results['updated'] += 1
-                            else:
-                                # Insert new coupon and back-fill discount_id with MongoDB _id
-                                inserted_id = cls.insert_one(coupon)
-                                if inserted_id:
-                                    cls.update_one({'_id': inserted_id}, {'discount_id': str(inserted_id)})
-                                results['new'] += 1
-                        else:
-                            # Insert as new coupon and back-fill discount_id
-                            inserted_id = cls.insert_one(coupon)
-                            if inserted_id:
-                                cls.update_one({'_id': inserted_id}, {'discount_id': str(inserted_id)})
-                            results['new'] += 1
-                            
-                        results['valid'] += 1
+                        rows.append((results['total'], coupon))
                         
                     except Exception as e:
                         results['invalid'] += 1
                         results['errors'].append(f"Row {results['total']}: {str(e)}")
+                
+                summary = cls._bulk_import(rows)
+                results['new'] += summary['new']
+                results['updated'] += summary['updated']
+                results['valid'] += summary['new'] + summary['updated']
+                for row_number, error in summary['failed']:
+                    results['invalid'] += 1
+                    results['errors'].append(f"Row {row_number}: {error}")
                         
             finally:
                 if close_after:
@@ -891,6 +1893,152 @@ class Coupon(MongoDBModel):
             
         return results
 
+# Club/store directory, materialized from the coupons (see Coupon._bulk_import)
+class Club(MongoDBModel):
+    """
+    One document per club, keyed by its slug:
+    {_id: slug, name, names: [club_name spellings], coupon_count, logo, updated_at}
+    
+    Counts cover live coupons only. Imports refresh the clubs they touch;
+    bulk removals and the expiry sweep rebuild the whole directory.
+    """
+    collection_name = 'clubs'
+    
+    # Live coupon counts per club_name spelling, with a logo taken from one of them
+    COUNTS_PIPELINE = [
+        {'$match': ACTIVE_COUPON_FILTER},
+        {'$unwind': '$club_name'},
+        {'$group': {'_id': '$club_name', 'coupon_count': {'$sum': 1}, 'logo': {'$max': '$image_link'}}},
+    ]
+    
+    @classmethod
+    def slug(cls, club_name):
+        """Normalized URL key of a club name ('Max Stock' -> 'max-stock')"""
+        name = str(club_name or '').strip()
+        return slugify(name, allow_unicode=True) or name.lower()
+    
+    @classmethod
+    def names_of(cls, club_name):
+        """club_name values of a coupon (stored as an array, older documents as a string)"""
+        if isinstance(club_name, list):
+            return [name for name in club_name if name]
+        return [club_name] if club_name else []
+    
+    @classmethod
+    def _counts(cls, club_names=None):
+        """Aggregate live coupon counts, optionally for some club_name spellings only"""
+        pipeline = list(cls.COUNTS_PIPELINE)
+        if club_names is not None:
+            in_clubs = {'club_name': {'$in': list(club_names)}}
+            # Before $unwind to use the club_name index, after it to drop the other clubs of each coupon
+            pipeline[0] = {'$match': dict(ACTIVE_COUPON_FILTER, **in_clubs)}
+            pipeline.insert(2, {'$match': in_clubs})
+        collection = Coupon.get_collection()
+        if collection is None:
+            return None
+        return list(collection.aggregate(pipeline))
+    
+    @classmethod
+    def _club_documents(cls, counts):
+        """Merge per-spelling counts into one document per slug"""
+        clubs = {}
+        now = datetime.datetime.utcnow()
+        for row in sorted(counts, key=lambda row: str(row['_id'])):
+            if not row['_id']:
+                continue
+            slug = cls.slug(row['_id'])
+            club = clubs.setdefault(slug, {
+                '_id': slug, 'name': row['_id'], 'names': [], 'coupon_count': 0, 'logo': None, 'updated_at': now
+            })
+            club['names'].append(row['_id'])
+            club['coupon_count'] += row['coupon_count']
+            club['logo'] = club['logo'] or row.get('logo') or None
+        return clubs
+    
+    @classmethod
+    def refresh(cls, club_names):
+        """
+        Recount the clubs behind some club_name values (after an import)
+        
+        Args:
+            club_names (iterable): club_name values of the written coupons, before and after
+            
+        Returns:
+            int: Number of clubs updated or removed
+        """
+        collection = cls.get_collection()
+        slugs = {cls.slug(name) for name in club_names if name}
+        if collection is None or not slugs:
+            return 0
+        # Recount every known spelling of the affected clubs
+        spellings = {name for name in club_names if name}
+        for club in collection.find({'_id': {'$in': list(slugs)}}, {'names': 1}):
+            spellings.update(club.get('names', []))
+        counts = cls._counts(spellings)
+        if counts is None:
+            return 0
+        clubs = cls._club_documents(counts)
+        
+        writes = [ReplaceOne({'_id': slug}, club, upsert=True) for slug, club in clubs.items()]
+        writes.extend(DeleteOne({'_id': slug}) for slug in slugs - set(clubs))
+        if writes:
+            collection.bulk_write(writes, ordered=False)
+        return len(writes)
+    
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute the whole directory from the coupons collection
+        
+        Returns:
+            int: Number of clubs
+        """
+        collection = cls.get_collection()
+        counts = cls._counts()
+        if collection is None or counts is None:
+            return 0
+        clubs = cls._club_documents(counts)
+        writes = [ReplaceOne({'_id': slug}, club, upsert=True) for slug, club in clubs.items()]
+        if writes:
+            collection.bulk_write(writes, ordered=False)
+        collection.delete_many({'_id': {'$nin': list(clubs)}})
+        catalog_cache.clear(notify=False)
+        logger.info(f"Rebuilt club directory: {len(clubs)} clubs")
+        return len(clubs)
+    
+    @classmethod
+    def directory(cls):
+        """Clubs with live coupons, sorted by name (served from the catalog cache)"""
+        return catalog_cache.get_or_load(
+            'club_directory',
+            lambda: cls.find({'coupon_count': {'$gt': 0}}, sort=[('name', ASCENDING)]),
+            Coupon.get_collection()
+        )
+    
+    @classmethod
+    async def adirectory(cls):
+        """Async variant of directory"""
+        return await catalog_cache.aget_or_load(
+            'club_directory',
+            lambda: cls.afind({'coupon_count': {'$gt': 0}}, sort=[('name', ASCENDING)]),
+            Coupon.get_collection()
+        )
+    
+    @classmethod
+    def lookup(cls, club):
+        """
+        Find a club by slug or by any of its names
+        
+        Returns:
+            dict: Club document (shared - do not modify), or None if it has no live coupons
+        """
+        by_slug = catalog_cache.get_or_build(
+            'club_index',
+            lambda: {club['_id']: club for club in cls.directory()},
+            Coupon.get_collection()
+        )
+        return by_slug.get(cls.slug(club))
+
 def find_json_and_csv_files(data_dir_path=None):
     # ... existing code ...
     
@@ -0,0 +1,225 @@
+"""
+MongoDB session store with an in-process LRU in front of it.
+
+Sessions used to live in the SQLite ``django_session`` table, which costs a
+query per authenticated request and a write lock whenever a session changes.
+Here they are documents of ``SessionRecord`` (the ``sessions`` collection,
+TTL-indexed on ``expire_date`` so MongoDB removes expired ones itself):
+
+    {_id: session_key, session_data: <signed, encoded dict>, expire_date: Date}
+
+Each process also keeps the encoded session of its most recent
+``SESSION_STORE_CONFIG['LRU_SIZE']`` keys. A cached copy is served without a
+round trip for ``LOCAL_TTL`` seconds; writes from this process refresh it,
+and writes from other workers become visible once it ages out, so sessions
+are at most ``LOCAL_TTL`` seconds stale across workers.
+
+Enable with ``SESSION_ENGINE = 'intellishop.session_backend'``.
+"""
+
+import datetime
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.sessions.backends.base import CreateError, SessionBase, UpdateError
+from django.utils import timezone
+from pymongo.errors import DuplicateKeyError
+
+from intellishop.models.constants import SESSION_STORE_CONFIG
+from intellishop.models.mongodb_models import SessionRecord
+
+logger = logging.getLogger(__name__)
+
+# session_key -> (session_data, expiry timestamp, cached_at)
+_local_sessions = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _expiry_timestamp(expire_date):
+    # MongoDB returns naive UTC datetimes
+    if timezone.is_naive(expire_date):
+        expire_date = expire_date.replace(tzinfo=datetime.timezone.utc)
+    return expire_date.timestamp()
+
+
+def _cache_get(session_key):
+    with _local_lock:
+        entry = _local_sessions.get(session_key)
+        if entry is None:
+            return None
+        session_data, expires, cached_at = entry
+        if expires <= time.time() or time.monotonic() - cached_at > SESSION_STORE_CONFIG['LOCAL_TTL']:
+            del _local_sessions[session_key]
+            return None
+        _local_sessions.move_to_end(session_key)
+        return session_data
+
+
+def _cache_set(session_key, session_data, expire_date):
+    with _local_lock:
+        _local_sessions[session_key] = (session_data, _expiry_timestamp(expire_date), time.monotonic())
+        _local_sessions.move_to_end(session_key)
+        while len(_local_sessions) > SESSION_STORE_CONFIG['LRU_SIZE']:
+            _local_sessions.popitem(last=False)
+
+
+def _cache_discard(session_key):
+    with _local_lock:
+        _local_sessions.pop(session_key, None)
+
+
+class SessionStore(SessionBase):
+    """Django session store backed by the ``sessions`` collection"""
+
+    # Reads
+
+    def _live_query(self, session_key):
+        return {'_id': session_key, 'expire_date': {'$gt': timezone.now()}}
+
+    def _loaded(self, session_key, document):
+        """Decode a fetched document (or mark the key invalid) and cache it"""
+        if document is None:
+            self._session_key = None
+            return {}
+        _cache_set(session_key, document['session_data'], document['expire_date'])
+        return self.decode(document['session_data'])
+
+    def load(self):
+        session_key = self.session_key
+        if not session_key:
+            return {}
+        session_data = _cache_get(session_key)
+        if session_data is not None:
+            return self.decode(session_data)
+        try:
+            document = SessionRecord.find_one(self._live_query(session_key))
+        except Exception as e:
+            logger.error(f"Error loading session: {str(e)}")
+            document = None
+        return self._loaded(session_key, document)
+
+    async def aload(self):
+        session_key = self.session_key
+        if not session_key:
+            return {}
+        session_data = _cache_get(session_key)
+        if session_data is not None:
+            return self.decode(session_data)
+        try:
+            document = await SessionRecord.afind_one(self._live_query(session_key))
+        except Exception as e:
+            logger.error(f"Error loading session: {str(e)}")
+            document = None
+        return self._loaded(session_key, document)
+
+    def exists(self, session_key):
+        if _cache_get(session_key) is not None:
+            return True
+        return SessionRecord.count({'_id': session_key}) > 0
+
+    async def aexists(self, session_key):
+        if _cache_get(session_key) is not None:
+            return True
+        return await SessionRecord.acount({'_id': session_key}) > 0
+
+    # Writes
+
+    def create(self):
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                # Key collision, try a new one
+                continue
+            self.modified = True
+            return
+
+    async def acreate(self):
+        while True:
+            self._session_key = await self._aget_new_session_key()
+            try:
+                await self.asave(must_create=True)
+            except CreateError:
+                continue
+            self.modified = True
+            return
+
+    def _document(self, session_data, expire_date):
+        return {
+            '_id': self._get_or_create_session_key(),
+            'session_data': session_data,
+            'expire_date': expire_date,
+        }
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        session_data = self.encode(self._get_session(no_load=must_create))
+        document = self._document(session_data, self.get_expiry_date())
+        if SessionRecord.get_collection() is None:
+            raise UpdateError
+        if must_create:
+            try:
+                SessionRecord.insert_one(document)
+            except DuplicateKeyError:
+                raise CreateError
+        else:
+            result = SessionRecord.update_one({'_id': document['_id']}, {
+                '$set': {'session_data': session_data, 'expire_date': document['expire_date']}
+            })
+            if result.matched_count == 0:
+                # Deleted by another request (e.g. logout) since it was loaded
+                raise UpdateError
+        _cache_set(document['_id'], session_data, document['expire_date'])
+
+    async def asave(self, must_create=False):
+        if self.session_key is None:
+            return await self.acreate()
+        session_data = self.encode(await self._aget_session(no_load=must_create))
+        document = self._document(session_data, await self.aget_expiry_date())
+        if SessionRecord.get_async_collection() is None:
+            raise UpdateError
+        if must_create:
+            try:
+                await SessionRecord.ainsert_one(document)
+            except DuplicateKeyError:
+                raise CreateError
+        else:
+            result = await SessionRecord.aupdate_one({'_id': document['_id']}, {
+                '$set': {'session_data': session_data, 'expire_date': document['expire_date']}
+            })
+            if result.matched_count == 0:
+                raise UpdateError
+        _cache_set(document['_id'], session_data, document['expire_date'])
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        _cache_discard(session_key)
+        SessionRecord.delete_one({'_id': session_key})
+
+    async def adelete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        _cache_discard(session_key)
+        await SessionRecord.adelete_one({'_id': session_key})
+
+    @classmethod
+    def clear_expired(cls):
+        """Remove expired sessions now (the TTL monitor does it about once a minute)"""
+        collection = SessionRecord.get_collection()
+        if collection is not None:
+            collection.delete_many({'expire_date': {'$lt': timezone.now()}})
+
+    @classmethod
+    async def aclear_expired(cls):
+        collection = SessionRecord.get_async_collection()
+        if collection is not None:
+            await collection.delete_many({'expire_date': {'$lt': timezone.now()}})
@@ -23,6 +23,10 @@ window.CouponUtils = {
         const div = document.createElement('div');
         div.className = `discount-card ${config.cardClass}`.trim();
         div.setAttribute('data-discount-id', coupon.discount_id);
+        if (typeof coupon.is_favorite === 'boolean') {
+            // Flag embedded by the list endpoints, picked up by favorites-manager.js
+            div.setAttribute('data-is-favorite', coupon.is_favorite);
+        }
 
         // Determine label and color
         let priceLabel = '';
@@ -41,16 +45,22 @@ window.CouponUtils = {
         }
 
         // Show more logic for description and terms
-        function getShowMoreHtml(text, idPrefix) {
+        // Summary cards from the list endpoints carry only a preview of long
+        // texts (<field>_truncated); the full text is loaded on "show more"
+        function getShowMoreHtml(text, idPrefix, field) {
             const maxLength = 250;
             if (!text) return '';
-            if (text.length <= maxLength) {
+            const truncated = field && coupon[`${field}_truncated`];
+            if (text.length <= maxLength && !truncated) {
                 return `<span>${text}</span>`;
             }
             const shortText = text.slice(0, maxLength) + '...';
+            const fullHtml = truncated
+                ? `<span id="${idPrefix}-full" style="display:none;" data-field="${field}" data-discount-id="${coupon.discount_id}" data-pending="true"></span>`
+                : `<span id="${idPrefix}-full" style="display:none;">${text}</span>`;
             return `
                 <span id="${idPrefix}-short">${shortText}</span>
-                <span id="${idPrefix}-full" style="display:none;">${text}</span>
+                ${fullHtml}
                 <a href="#" class="show-more-link" data-id="${idPrefix}">הצג עוד</a>
             `;
         }
@@ -96,11 +106,11 @@ ${expired ? `<div class='expired-label' style="background-color:#dc3545;color:wh
                     </h4>
                     <div class="desc-block">
                         <strong>תיאור:</strong>
-                        <div>${getShowMoreHtml(coupon.description, `desc-${coupon.discount_id}`)}</div>
+                        <div>${getShowMoreHtml(coupon.description, `desc-${coupon.discount_id}`, 'description')}</div>
                     </div>
                     <div class="terms-block" style="margin-top:10px;">
                         <strong>תנאים והגבלות:</strong>
-                        <div>${getShowMoreHtml(coupon.terms_and_conditions, `terms-${coupon.discount_id}`)}</div>
+                        <div>${getShowMoreHtml(coupon.terms_and_conditions, `terms-${coupon.discount_id}`, 'terms_and_conditions')}</div>
                     </div>
                 </div>
             </div>
@@ -169,6 +179,60 @@ ${expired ? `<div class='expired-label' style="background-color:#dc3545;color:wh
         }
     },
 
+    /**
+     * Append another page of coupon cards below the ones already rendered
+     * @param {Array} coupons - Array of coupon objects
+     * @param {HTMLElement} container - Container that already holds cards
+     * @param {Object} options - Rendering options
+     */
+    appendCouponCards: function(coupons, container, options = {}) {
+        coupons.forEach(coupon => {
+            container.appendChild(this.renderCouponCard(coupon, options));
+        });
+
+        if (typeof initFavoritesForNewCards === 'function') {
+            initFavoritesForNewCards();
+        }
+    },
+
+    /**
+     * Add a "Load more" button that follows the list endpoints' next_cursor
+     * @param {HTMLElement} container - Container holding the rendered cards
+     * @param {string|null} nextCursor - next_cursor of the last page (null on the last page)
+     * @param {Function} fetchPage - Called with the cursor, resolves to the next page's JSON
+     * @param {Object} options - Rendering options
+     */
+    renderLoadMore: function(container, nextCursor, fetchPage, options = {}) {
+        if (!nextCursor) {
+            return;
+        }
+
+        const wrapper = document.createElement('div');
+        wrapper.className = 'load-more-container';
+        wrapper.innerHTML = `
+            <button type="button" class="btn btn-outline-primary load-more-btn">טען עוד</button>
+        `;
+        const button = wrapper.querySelector('button');
+
+        button.addEventListener('click', () => {
+            button.disabled = true;
+            button.textContent = 'טוען...';
+            fetchPage(nextCursor)
+                .then(data => {
+                    wrapper.remove();
+                    this.appendCouponCards(data.discounts || [], container, options);
+                    this.renderLoadMore(container, data.next_cursor, fetchPage, options);
+                })
+                .catch(error => {
+                    console.error('Error loading more discounts:', error);
+                    button.disabled = false;
+                    button.textContent = 'טען עוד';
+                });
+        });
+
+        container.appendChild(wrapper);
+    },
+
     /**
      * Add event delegation for show more/less functionality
      * @param {HTMLElement} container - Container element
@@ -184,6 +248,12 @@ ${expired ? `<div class='expired-label' style="background-color:#dc3545;color:wh
                     shortSpan.style.display = '';
                     fullSpan.style.display = 'none';
                     e.target.textContent = 'הצג עוד';
+                } else if (fullSpan.dataset.pending === 'true') {
+                    CouponUtils.loadFullText(fullSpan).then(() => {
+                        shortSpan.style.display = 'none';
+                        fullSpan.style.display = '';
+                        e.target.textContent = 'הצג פחות';
+                    });
                 } else {
                     shortSpan.style.display = 'none';
                     fullSpan.style.display = '';
@@ -193,6 +263,28 @@ ${expired ? `<div class='expired-label' style="background-color:#dc3545;color:wh
         });
     },
 
+    /**
+     * Fill a truncated text span from the discount's detail card
+     * @param {HTMLElement} fullSpan - Span with data-discount-id and data-field
+     * @returns {Promise} - Resolves once the span holds the full text
+     */
+    loadFullText: function(fullSpan) {
+        const discountId = fullSpan.dataset.discountId;
+        const field = fullSpan.dataset.field;
+        return fetch(`/discount/${encodeURIComponent(discountId)}/`)
+            .then(response => response.ok ? response.json() : Promise.reject(response.status))
+            .then(data => {
+                fullSpan.textContent = (data.discount && data.discount[field]) || '';
+                delete fullSpan.dataset.pending;
+            })
+            .catch(error => {
+                console.error('Error loading full coupon text:', error);
+                // Fall back to the preview so the toggle still works
+                fullSpan.textContent = document.getElementById(fullSpan.id.replace(/-full$/, '-short')).textContent;
+                delete fullSpan.dataset.pending;
+            });
+    },
+
     /**
      * Debug function to log DOM structure around favorite icon
      * @param {HTMLElement} iconElement - The heart icon element
@@ -348,17 +440,44 @@ ${expired ? `<div class='expired-label' style="background-color:#dc3545;color:wh
      * @param {HTMLElement} iconElement - The heart icon element
      */
     checkFavoriteStatus: function(discountId, iconElement) {
-        fetch(`/check_favorite/${discountId}/`)
-        .then(response => response.json())
-        .then(data => {
-            if (data.is_favorite) {
-                try {
-                    iconElement.classList.add('favorite-active');
-                    this._updateFavoriteText(iconElement, true);
-                } catch (domError) {
-                    console.warn('DOM update failed during status check:', domError);
+        iconElement.setAttribute('data-discount-id', discountId);
+        this.checkFavoriteStatuses([iconElement]);
+    },
+
+    /**
+     * Check favorite status for many coupons with a single request
+     * @param {Iterable<HTMLElement>} icons - Heart icon elements with data-discount-id
+     */
+    checkFavoriteStatuses: function(icons) {
+        const iconsById = new Map();
+        icons.forEach(icon => {
+            const discountId = icon.getAttribute('data-discount-id');
+            if (discountId) {
+                if (!iconsById.has(discountId)) {
+                    iconsById.set(discountId, []);
                 }
+                iconsById.get(discountId).push(icon);
             }
+        });
+        if (iconsById.size === 0 || typeof fetchFavoriteStatuses !== 'function') {
+            return;
+        }
+
+        fetchFavoriteStatuses(Array.from(iconsById.keys()))
+        .then(statuses => {
+            iconsById.forEach((iconElements, discountId) => {
+                if (!statuses[discountId]) {
+                    return;
+                }
+                iconElements.forEach(iconElement => {
+                    try {
+                        iconElement.classList.add('favorite-active');
+                        this._updateFavoriteText(iconElement, true);
+                    } catch (domError) {
+                        console.warn('DOM update failed during status check:', domError);
+                    }
+                });
+            });
         })
         .catch(error => {
             console.error('Error checking favorite status:', error);
@@ -589,11 +708,8 @@ ${expired ? `<div class='expired-label' style="background-color:#dc3545;color:wh
                 }
             });
 
-            // Check favorite status for all coupons on page load
-            document.querySelectorAll('.like-icon').forEach(icon => {
-                const discountId = icon.getAttribute('data-discount-id');
-                this.checkFavoriteStatus(discountId, icon);
-            });
+            // Check favorite status for all coupons on page load (one request)
+            this.checkFavoriteStatuses(document.querySelectorAll('.like-icon'));
         }
 
         // Initialize copy code functionality
@@ -33,6 +33,71 @@ function removeFavorite(couponId) {
     localStorage.setItem('favoriteCoupons', JSON.stringify(favs));
 }
 
+// Store a server-side favorite flag in localStorage
+function rememberFavorite(couponId, isFav) {
+    if (isFav) {
+        addFavorite(couponId);
+    } else {
+        removeFavorite(couponId);
+    }
+}
+
+// Fetch favorite flags for many coupons with a single request
+async function fetchFavoriteStatuses(couponIds) {
+    if (!couponIds.length) {
+        return {};
+    }
+    const response = await fetch('/check_favorites/', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': getCSRFToken(),
+        },
+        body: JSON.stringify({ discount_ids: couponIds })
+    });
+    if (response.status === 401) {
+        return {};  // Not logged in - localStorage is the source of truth
+    }
+    if (!response.ok) {
+        throw new Error(`Failed to check favorites: HTTP ${response.status}`);
+    }
+    const data = await response.json();
+    return data.favorites || {};
+}
+
+// Sync cards with the server: use flags embedded by the view (data-is-favorite)
+// and look up the rest in one batch request instead of one request per card
+function syncFavoriteStatuses(cards) {
+    const pending = new Map();
+    cards.forEach(card => {
+        const couponId = card.getAttribute('data-discount-id');
+        if (!couponId) {
+            return;
+        }
+        const embedded = card.getAttribute('data-is-favorite');
+        if (embedded !== null) {
+            rememberFavorite(couponId, embedded === 'true');
+        } else {
+            pending.set(couponId, card);
+        }
+    });
+
+    if (pending.size === 0) {
+        return Promise.resolve();
+    }
+    return fetchFavoriteStatuses(Array.from(pending.keys()))
+        .then(statuses => {
+            Object.entries(statuses).forEach(([couponId, isFav]) => {
+                rememberFavorite(couponId, isFav);
+                const favBtn = pending.get(couponId)?.querySelector('.fav-btn');
+                if (favBtn) {
+                    setFavBtnState(favBtn, isFav);
+                }
+            });
+        })
+        .catch(error => console.error('Error checking favorite statuses:', error));
+}
+
 // Update the UI for a single coupon card
 function updateCouponCardUI(card, isFav) {
     const heart = card.querySelector('.like-icon');
@@ -77,7 +142,9 @@ function setFavBtnState(btn, isFav) {
 
 // Initialize all coupon cards on page load
 function initFavoritesUI() {
-    document.querySelectorAll('.discount-card[data-discount-id]').forEach(card => {
+    const cards = document.querySelectorAll('.discount-card[data-discount-id]');
+    syncFavoriteStatuses(cards);
+    cards.forEach(card => {
         const couponId = card.getAttribute('data-discount-id');
         const isFav = isFavorite(couponId);
 
@@ -105,6 +172,7 @@ function initFavoritesUI() {
                     // Don't show error alert, just log it
                 }
             };
+            favBtn.setAttribute('data-initialized', 'true');
         }
     });
 }
@@ -226,35 +294,38 @@ function showSuccessMessage(message) {
 
 // Initialize favorites for dynamically added cards
 function initFavoritesForNewCards() {
-    document.querySelectorAll('.discount-card[data-discount-id]').forEach(card => {
+    const newCards = Array.from(document.querySelectorAll('.discount-card[data-discount-id]')).filter(card => {
+        const favBtn = card.querySelector('.fav-btn');
+        return favBtn && !favBtn.hasAttribute('data-initialized');
+    });
+    syncFavoriteStatuses(newCards);
+
+    newCards.forEach(card => {
         const couponId = card.getAttribute('data-discount-id');
         const favBtn = card.querySelector('.fav-btn');
+        const isFav = isFavorite(couponId);
+        setFavBtnState(favBtn, isFav);
         
-        if (favBtn && !favBtn.hasAttribute('data-initialized')) {
-            const isFav = isFavorite(couponId);
-            setFavBtnState(favBtn, isFav);
-            
-            favBtn.onclick = async function() {
-                const currentlyFav = isFavorite(couponId);
-                try {
-                    if (currentlyFav) {
-                        await updateFavoriteOnServer(couponId, 'remove');
-                        removeFavorite(couponId);
-                        showSuccessMessage('Removed from favorites!');
-                    } else {
-                        await updateFavoriteOnServer(couponId, 'add');
-                        addFavorite(couponId);
-                        showSuccessMessage('Added to favorites!');
-                    }
-                    setFavBtnState(favBtn, !currentlyFav);
-                } catch (e) {
-                    console.error('Error updating favorites:', e);
-                    // Don't show error alert, just log it
+        favBtn.onclick = async function() {
+            const currentlyFav = isFavorite(couponId);
+            try {
+                if (currentlyFav) {
+                    await updateFavoriteOnServer(couponId, 'remove');
+                    removeFavorite(couponId);
+                    showSuccessMessage('Removed from favorites!');
+                } else {
+                    await updateFavoriteOnServer(couponId, 'add');
+                    addFavorite(couponId);
+                    showSuccessMessage('Added to favorites!');
                 }
-            };
-            
-            favBtn.setAttribute('data-initialized', 'true');
-        }
+                setFavBtnState(favBtn, !currentlyFav);
+            } catch (e) {
+                console.error('Error updating favorites:', e);
+                // Don't show error alert, just log it
+            }
+        };
+        
+        favBtn.setAttribute('data-initialized', 'true');
     });
 }
 
@@ -20,12 +20,15 @@ urlpatterns = [
     path('show_all_discounts/', views.show_all_discounts, name='show_all_discounts'),
     path('filtered_discounts/', views.filtered_discounts, name='filtered_discounts'),
     path('search_discounts/', views.search_discounts_by_text, name='search_discounts_by_text'),
+    path('discount/<str:discount_id>/', views.discount_detail_view, name='discount_detail'),
     path('ai_filter_helper/', views.ai_filter_helper, name='ai_filter_helper'),
     path('add_favorite/', views.add_favorite_view, name='add_favorite'),
     path('remove_favorite/', views.remove_favorite_view, name='remove_favorite'),
     path('check_favorite/<str:discount_id>/', views.check_favorite_view, name='check_favorite'),
+    path('check_favorites/', views.check_favorites_view, name='check_favorites'),
     path('api/club_names/', views.get_club_names, name='get_club_names'),
     path('debug_favorites/', views.debug_favorites, name='debug_favorites'),
     path('debug_page/', views.debug_favorites_page, name='debug_favorites_page'),
+    path('db_profile/', views.db_profile_view, name='db_profile'),
 ] 
 
@@ -0,0 +1,316 @@
+"""
+Process-wide read-through cache for the coupon catalog.
+
+The catalog only changes when an import or a clear runs, so query results
+are kept in memory and served without a MongoDB round trip. Every write path
+bumps a catalog version stored in ``CATALOG_CACHE_CONFIG['META_COLLECTION']``;
+each process polls that version at most every ``VERSION_CHECK_INTERVAL``
+seconds and, when the server supports it, also watches the coupons collection
+through a change stream for immediate invalidation.
+"""
+
+import datetime
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from pymongo import ReturnDocument
+
+from intellishop.models.constants import CATALOG_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_ID = 'coupons'
+
+
+def _meta_collection():
+    from intellishop.utils.mongodb_utils import get_collection_handle
+    return get_collection_handle(CATALOG_CACHE_CONFIG['META_COLLECTION'])
+
+
+def _version_fields(meta):
+    return (meta.get('version', 0), meta.get('updated_at')) if meta else (0, None)
+
+
+def get_catalog_meta():
+    """
+    Read the shared catalog version and the time of the last bump
+
+    Returns:
+        tuple: (version, updated_at) - (0, None) if it was never bumped
+    """
+    collection = _meta_collection()
+    if collection is None:
+        return 0, None
+    return _version_fields(collection.find_one({'_id': CATALOG_VERSION_ID}, {'version': 1, 'updated_at': 1}))
+
+
+async def aget_catalog_meta():
+    """Async variant of get_catalog_meta for the async views"""
+    from intellishop.utils.mongodb_utils import get_async_collection_handle
+    collection = get_async_collection_handle(CATALOG_CACHE_CONFIG['META_COLLECTION'])
+    if collection is None:
+        return 0, None
+    return _version_fields(await collection.find_one({'_id': CATALOG_VERSION_ID}, {'version': 1, 'updated_at': 1}))
+
+
+def get_catalog_version():
+    """Read the shared catalog version (0 if it was never bumped)"""
+    return get_catalog_meta()[0]
+
+
+async def aget_catalog_version():
+    """Async variant of get_catalog_version for the async views"""
+    return (await aget_catalog_meta())[0]
+
+
+def bump_catalog_version():
+    """
+    Mark the catalog as changed for every process and drop the local cache.
+
+    Invalidation callbacks are not run for the local process: the writer
+    already keeps derived state (e.g. the search index) up to date itself.
+    """
+    new_version = updated_at = None
+    try:
+        collection = _meta_collection()
+        if collection is not None:
+            meta = collection.find_one_and_update(
+                {'_id': CATALOG_VERSION_ID},
+                {'$inc': {'version': 1}, '$set': {'updated_at': datetime.datetime.utcnow()}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            if meta:
+                new_version, updated_at = meta.get('version'), meta.get('updated_at')
+    except Exception as e:
+        logger.warning(f"Could not bump catalog version: {str(e)}")
+    catalog_cache.clear(notify=False)
+    if new_version is not None:
+        catalog_cache._version = new_version
+        catalog_cache._updated_at = updated_at
+    return new_version
+
+
+class CatalogCache:
+    """Bounded LRU of query results, invalidated by the catalog version"""
+
+    def __init__(self, config=None):
+        self.config = config or CATALOG_CACHE_CONFIG
+        self._entries = OrderedDict()  # key -> list of documents
+        self._derived = {}  # key -> structure built from the whole catalog
+        self._document_count = 0
+        self._version = None
+        self._updated_at = None  # Time of the last version bump (naive UTC)
+        self._generation = 0  # Bumped on clear so in-flight loads are not stored
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+        self._watcher = None
+        self._invalidation_callbacks = []
+
+    @property
+    def enabled(self):
+        return self.config.get('ENABLED', True)
+
+    def on_invalidate(self, callback):
+        """Register a callable run when another process changed the catalog"""
+        self._invalidation_callbacks.append(callback)
+
+    def clear(self, notify=True):
+        with self._lock:
+            self._entries.clear()
+            self._derived.clear()
+            self._document_count = 0
+            self._generation += 1
+        if not notify:
+            return
+        for callback in self._invalidation_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Catalog invalidation callback failed: {str(e)}")
+
+    def _version_check_due(self):
+        now = time.monotonic()
+        if now - self._last_check < self.config['VERSION_CHECK_INTERVAL']:
+            return False
+        self._last_check = now
+        return True
+
+    def _check_version(self):
+        """Poll the shared version at most every VERSION_CHECK_INTERVAL seconds"""
+        if not self._version_check_due():
+            return
+        try:
+            version, updated_at = get_catalog_meta()
+        except Exception as e:
+            logger.warning(f"Could not read catalog version: {str(e)}")
+            return
+        self._apply_version(version, updated_at)
+
+    async def _acheck_version(self):
+        if not self._version_check_due():
+            return
+        try:
+            version, updated_at = await aget_catalog_meta()
+        except Exception as e:
+            logger.warning(f"Could not read catalog version: {str(e)}")
+            return
+        self._apply_version(version, updated_at)
+
+    def _apply_version(self, version, updated_at=None):
+        self._updated_at = updated_at
+        if version != self._version:
+            if self._version is not None:
+                logger.info(f"Catalog version changed {self._version} -> {version}, dropping cache")
+            self._version = version
+            self.clear()
+
+    def version_info(self):
+        """
+        The catalog version as last polled (at most VERSION_CHECK_INTERVAL seconds old)
+
+        Returns:
+            tuple: (version, updated_at) - version is None if it could not be read yet
+        """
+        self._check_version()
+        return self._version, self._updated_at
+
+    async def aversion_info(self):
+        """Async variant of version_info"""
+        await self._acheck_version()
+        return self._version, self._updated_at
+
+    def _ensure_watcher(self, collection):
+        if self._watcher is not None or not self.config.get('USE_CHANGE_STREAM') or collection is None:
+            return
+        self._watcher = threading.Thread(
+            target=self._watch, args=(collection,), name='catalog-change-stream', daemon=True
+        )
+        self._watcher.start()
+
+    def _watch(self, collection):
+        """Drop the cache on every coupon change (replica sets / Atlas only)"""
+        try:
+            with collection.watch() as stream:
+                logger.info("Watching coupons collection for catalog changes")
+                for _ in stream:
+                    self.clear()
+        except Exception as e:
+            # Standalone servers do not support change streams; polling still applies
+            logger.info(f"Catalog change stream unavailable, using version polling: {str(e)}")
+
+    def get_or_load(self, key, loader, collection=None):
+        """
+        Return the cached documents for ``key`` or load and cache them.
+
+        Args:
+            key (str): Cache key describing the query
+            loader (callable): Returns the list of documents on a miss
+            collection: Coupons collection, used to start the change stream
+
+        Returns:
+            list: Shallow copies of the cached documents (safe to mutate)
+        """
+        if not self.enabled:
+            return loader()
+
+        self._ensure_watcher(collection)
+        self._check_version()
+
+        with self._lock:
+            documents = self._entries.get(key)
+            if documents is not None:
+                self._entries.move_to_end(key)
+            generation = self._generation
+
+        if documents is None:
+            documents = loader()
+            self._store(key, documents, generation)
+
+        # Views convert _id and reformat fields in place, so hand out copies
+        return [dict(document) for document in documents]
+
+    async def aget_or_load(self, key, loader, collection=None):
+        """
+        Async variant of get_or_load
+
+        Args:
+            key (str): Cache key describing the query
+            loader (callable): Coroutine function returning the list of documents on a miss
+            collection: Sync coupons collection, used to start the change stream
+
+        Returns:
+            list: Shallow copies of the cached documents (safe to mutate)
+        """
+        if not self.enabled:
+            return await loader()
+
+        self._ensure_watcher(collection)
+        await self._acheck_version()
+
+        with self._lock:
+            documents = self._entries.get(key)
+            if documents is not None:
+                self._entries.move_to_end(key)
+            generation = self._generation
+
+        if documents is None:
+            documents = await loader()
+            self._store(key, documents, generation)
+
+        return [dict(document) for document in documents]
+
+    def get_or_build(self, key, builder, collection=None):
+        """
+        Return a structure derived from the whole catalog, rebuilt after every
+        invalidation (e.g. the ranking matrices).
+
+        Args:
+            key (str): Name of the derived structure
+            builder (callable): Builds the structure on a miss
+            collection: Coupons collection, used to start the change stream
+
+        Returns:
+            object: The shared structure - callers must not mutate it
+        """
+        if not self.enabled:
+            return builder()
+
+        self._ensure_watcher(collection)
+        self._check_version()
+
+        with self._lock:
+            derived = self._derived.get(key)
+            generation = self._generation
+        if derived is not None:
+            return derived
+
+        derived = builder()
+        with self._lock:
+            if generation == self._generation:
+                self._derived[key] = derived
+        return derived
+
+    def _store(self, key, documents, generation):
+        max_documents = self.config['MAX_DOCUMENTS']
+        if len(documents) > max_documents:
+            return  # Larger than the whole budget - never cache
+        with self._lock:
+            if generation != self._generation:
+                return  # Catalog changed while loading
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._document_count -= len(previous)
+            self._entries[key] = documents
+            self._document_count += len(documents)
+            while self._entries and (
+                len(self._entries) > self.config['MAX_ENTRIES']
+                or self._document_count > max_documents
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._document_count -= len(evicted)
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,116 @@
+"""
+Coupon card serialization shared by every view that lists coupons.
+
+Each shape pairs a MongoDB projection (only the fields the card needs are
+read) with a transform whose field tables are built once, so serializing a
+card is a single pass over a fixed tuple:
+
+- ``SUMMARY``: the JSON list endpoints. Long texts (``PREVIEW_FIELDS``) are
+  cut to ``PREVIEW_LENGTH`` characters and flagged ``<field>_truncated``; the
+  full card is fetched from ``/discount/<discount_id>/`` on "show more".
+- ``DETAIL``: single-coupon responses and the server-rendered pages, which
+  show the full texts inline. ``template_card`` maps a document to the keys of
+  ``partials/coupon_card.html``.
+"""
+
+from intellishop.models.constants import COUPON_CARD_CONFIG, COUPON_CARD_FIELDS, COUPON_DETAIL_FIELDS
+
+# (template key, document field, default) for partials/coupon_card.html
+TEMPLATE_FIELDS = (
+    ('store_logo', 'image_link', ''),
+    ('code', 'coupon_code', ''),
+    ('name', 'title', 'Special Offer'),
+    ('description', 'description', ''),
+    ('date_expires', 'valid_until', ''),
+    ('store_url', 'discount_link', ''),
+    ('discount_link', 'discount_link', ''),
+    ('provider_link', 'provider_link', ''),
+    ('discount_id', 'discount_id', ''),
+    ('terms_and_conditions', 'terms_and_conditions', ''),
+    ('usage_limit', 'usage_limit', None),
+    ('price', 'price', 0),
+    ('discount_type', 'discount_type', ''),
+)
+
+
+class CouponCardShape:
+    """Projection + transform for one card shape"""
+
+    def __init__(self, name, fields, preview_fields=(), preview_length=None):
+        self.name = name
+        self.fields = tuple(fields)
+        self.projection = {field: 1 for field in self.fields}
+        self.preview_length = preview_length
+        self._preview_fields = tuple(
+            (field, f"{field}_truncated") for field in preview_fields if field in self.fields
+        ) if preview_length else ()
+        previewed = {field for field, _ in self._preview_fields}
+        self._plain_fields = tuple(field for field in self.fields if field not in previewed)
+
+    def serialize(self, document, favorites=None):
+        """
+        Convert a coupon document to its JSON card
+
+        Args:
+            document (dict): Coupon document, read with ``self.projection``
+            favorites (set): User's favorite discount IDs, embedded as is_favorite
+
+        Returns:
+            dict: Card; ``_id`` stays an ObjectId for utils.fast_json to encode
+        """
+        get = document.get
+        card = {'_id': document['_id']} if '_id' in document else {}
+        for field in self._plain_fields:
+            if field in document:
+                card[field] = document[field]
+        for field, flag in self._preview_fields:
+            text = get(field)
+            if isinstance(text, str) and len(text) > self.preview_length:
+                card[field] = text[:self.preview_length]
+                card[flag] = True
+            elif field in document:
+                card[field] = text
+        if favorites is not None:
+            card['is_favorite'] = get('discount_id') in favorites
+        return card
+
+    def serialize_many(self, documents, favorites=None):
+        serialize = self.serialize
+        return [serialize(document, favorites) for document in documents]
+
+    @staticmethod
+    def template_card(document, is_favorite=None):
+        """
+        Convert a coupon document to the context of ``partials/coupon_card.html``
+
+        Args:
+            document (dict): Coupon document (DETAIL projection)
+            is_favorite (bool): Favorite state, None when unknown
+
+        Returns:
+            dict: Template card
+        """
+        get = document.get
+        card = {key: get(field, default) for key, field, default in TEMPLATE_FIELDS}
+        price = card['price']
+        card['amount'] = f"{price}%" if card['discount_type'] == 'percentage' else f"${price}"
+        club_names = get('club_name') or []
+        card['store_name'] = club_names[0] if club_names else "Unknown Store"
+        card['minimum_amount'] = 0
+        card['is_favorite'] = is_favorite
+        return card
+
+    def template_cards(self, documents, favorites=None):
+        """Template cards for ``documents``; favorites=None leaves is_favorite unknown"""
+        if favorites is None:
+            return [self.template_card(document) for document in documents]
+        return [self.template_card(document, document.get('discount_id') in favorites) for document in documents]
+
+
+SUMMARY = CouponCardShape(
+    'summary',
+    COUPON_CARD_FIELDS,
+    preview_fields=COUPON_CARD_CONFIG['PREVIEW_FIELDS'],
+    preview_length=COUPON_CARD_CONFIG['PREVIEW_LENGTH']
+)
+DETAIL = CouponCardShape('detail', COUPON_DETAIL_FIELDS)
@@ -0,0 +1,315 @@
+"""
+Command-level MongoDB instrumentation.
+
+A ``pymongo.monitoring`` command listener (registered on the shared client in
+mongodb_utils) times every command and records it with:
+
+- the collection and a normalized query shape (values replaced by ``?``)
+- the duration and number of documents returned
+- the Django view that issued it (set by QueryProfilingMiddleware)
+- the model operation (e.g. ``Coupon.find``) set by the ``profiled`` decorator
+
+A sample of model finds (``EXPLAIN_SAMPLE_RATE``) is re-run with ``explain()``
+to record ``docsExamined``. Recent commands are kept in a ring buffer and
+aggregated per (view, collection, command, shape); both are served by the
+``/db_profile/`` admin endpoint. Commands slower than ``SLOW_QUERY_MS`` are
+logged to the ``intellishop.slow_queries`` logger.
+"""
+
+import contextvars
+import functools
+import inspect
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+from pymongo import monitoring
+
+from intellishop.models.constants import QUERY_PROFILING_CONFIG
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('intellishop.slow_queries')
+
+# Driver housekeeping, not application queries
+IGNORED_COMMANDS = frozenset({
+    'hello', 'ismaster', 'isMaster', 'ping', 'buildInfo', 'buildinfo', 'saslStart',
+    'saslContinue', 'authenticate', 'getnonce', 'endSessions', 'killCursors', 'explain'
+})
+
+# Where each command keeps its filter
+FILTER_FIELDS = {
+    'find': 'filter',
+    'count': 'query',
+    'distinct': 'query',
+    'findAndModify': 'query',
+}
+
+_current_view = contextvars.ContextVar('db_profiler_view', default=None)
+_current_operation = contextvars.ContextVar('db_profiler_operation', default=None)
+
+
+def query_shape(query):
+    """
+    Normalize a query to its shape: keys and operators are kept, values become ``?``.
+
+    Args:
+        query: MongoDB filter (or any BSON value)
+
+    Returns:
+        str: Stable representation, e.g. ``{category: {$in: ?}}``
+    """
+    def _shape(value):
+        if isinstance(value, dict):
+            return '{' + ', '.join(f"{key}: {_shape(value[key])}" for key in sorted(value)) + '}'
+        if isinstance(value, (list, tuple)) and value and all(isinstance(item, dict) for item in value):
+            # $and / $or clauses and pipelines keep their structure
+            return '[' + ', '.join(_shape(item) for item in value) + ']'
+        return '?'
+    if query is None:
+        return '{}'
+    return _shape(query)
+
+
+def _command_filter(command_name, command):
+    """Extract the filter of a command for shape normalization"""
+    if command_name in FILTER_FIELDS:
+        return command.get(FILTER_FIELDS[command_name])
+    if command_name == 'aggregate':
+        return command.get('pipeline')
+    if command_name in ('update', 'delete'):
+        statements = command.get('updates' if command_name == 'update' else 'deletes') or []
+        return statements[0].get('q') if statements else None
+    return None
+
+
+def _command_collection(command_name, command):
+    if command_name == 'getMore':
+        return command.get('collection')
+    collection = command.get(command_name)
+    return collection if isinstance(collection, str) else None
+
+
+def _documents_returned(reply):
+    cursor = reply.get('cursor')
+    if isinstance(cursor, dict):
+        return len(cursor.get('firstBatch', cursor.get('nextBatch', [])))
+    if 'n' in reply:
+        return reply['n']
+    if 'values' in reply:
+        return len(reply['values'])
+    return 0
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """Ring buffer and per-shape aggregates of MongoDB commands"""
+
+    def __init__(self, config=None):
+        self.config = config or QUERY_PROFILING_CONFIG
+        self._pending = {}      # (connection_id, request_id) -> started command info
+        self._recent = deque(maxlen=self.config['BUFFER_SIZE'])
+        self._shapes = {}       # (view, collection, command, shape) -> aggregate
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.config.get('ENABLED', True)
+
+    # -- pymongo.monitoring.CommandListener -------------------------------
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        command = event.command
+        self._pending[(event.connection_id, event.request_id)] = {
+            'command': event.command_name,
+            'collection': _command_collection(event.command_name, command),
+            'shape': query_shape(_command_filter(event.command_name, command)),
+            'view': _current_view.get(),
+            'operation': _current_operation.get(),
+        }
+
+    def succeeded(self, event):
+        info = self._pending.pop((event.connection_id, event.request_id), None)
+        if info is not None:
+            self._record(info, event.duration_micros / 1000.0, _documents_returned(event.reply))
+
+    def failed(self, event):
+        info = self._pending.pop((event.connection_id, event.request_id), None)
+        if info is not None:
+            self._record(info, event.duration_micros / 1000.0, 0, error=str(event.failure))
+
+    # -- recording --------------------------------------------------------
+
+    def _aggregate(self, info):
+        key = (info['view'], info['collection'], info['command'], info['shape'])
+        aggregate = self._shapes.get(key)
+        if aggregate is None:
+            if len(self._shapes) >= self.config['MAX_SHAPES']:
+                return None
+            aggregate = self._shapes[key] = {
+                'view': info['view'],
+                'collection': info['collection'],
+                'command': info['command'],
+                'shape': info['shape'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'docs_returned': 0,
+                'explain_samples': 0,
+                'docs_examined': 0,
+            }
+        return aggregate
+
+    def _record(self, info, duration_ms, documents, error=None):
+        entry = dict(info, duration_ms=round(duration_ms, 3), docs_returned=documents, time=time.time())
+        if error:
+            entry['error'] = error
+        with self._lock:
+            self._recent.append(entry)
+            aggregate = self._aggregate(info)
+            if aggregate is not None:
+                aggregate['count'] += 1
+                aggregate['total_ms'] += duration_ms
+                aggregate['max_ms'] = max(aggregate['max_ms'], duration_ms)
+                aggregate['docs_returned'] += documents
+
+        if duration_ms >= self.config['SLOW_QUERY_MS']:
+            slow_query_logger.warning(
+                f"Slow MongoDB {info['command']} on {info['collection']} ({duration_ms:.1f} ms, "
+                f"{documents} docs) from {info['view'] or '-'} [{info['operation'] or '-'}]: {info['shape']}"
+            )
+
+    def record_explain(self, collection_name, query, explanation):
+        """Attach docsExamined from a sampled explain() to the find aggregate"""
+        stats = explanation.get('executionStats') or {}
+        if 'totalDocsExamined' not in stats:
+            return
+        info = {
+            'view': _current_view.get(),
+            'collection': collection_name,
+            'command': 'find',
+            'shape': query_shape(query),
+        }
+        with self._lock:
+            aggregate = self._aggregate(info)
+            if aggregate is not None:
+                aggregate['explain_samples'] += 1
+                aggregate['docs_examined'] += stats['totalDocsExamined']
+
+    # -- reporting --------------------------------------------------------
+
+    def snapshot(self, recent=100):
+        """
+        Return the profile for the admin endpoint
+
+        Args:
+            recent (int): Number of most recent commands to include
+
+        Returns:
+            dict: 'routes' (load per view), 'shapes' (per query shape, slowest
+                total first) and 'recent' commands
+        """
+        with self._lock:
+            shapes = [dict(aggregate) for aggregate in self._shapes.values()]
+            recent_entries = list(self._recent)[-recent:] if recent else []
+
+        routes = {}
+        for aggregate in shapes:
+            aggregate['avg_ms'] = round(aggregate['total_ms'] / aggregate['count'], 3) if aggregate['count'] else 0
+            aggregate['avg_docs_examined'] = (
+                round(aggregate['docs_examined'] / aggregate['explain_samples'], 1)
+                if aggregate['explain_samples'] else None
+            )
+            route = routes.setdefault(aggregate['view'] or '-', {'view': aggregate['view'], 'count': 0, 'total_ms': 0.0})
+            route['count'] += aggregate['count']
+            route['total_ms'] += aggregate['total_ms']
+
+        return {
+            'routes': sorted(routes.values(), key=lambda route: route['total_ms'], reverse=True),
+            'shapes': sorted(shapes, key=lambda aggregate: aggregate['total_ms'], reverse=True),
+            'recent': recent_entries,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._shapes.clear()
+
+
+query_profiler = QueryProfiler()
+
+
+def set_current_view(view_name):
+    """Tag the commands issued by the current request; returns a token for reset_current_view"""
+    return _current_view.set(view_name)
+
+
+def reset_current_view(token):
+    _current_view.reset(token)
+
+
+def profiled(operation, explain=False):
+    """
+    Decorate a MongoDBModel classmethod so its commands carry ``Model.operation``.
+    Coroutine methods (the async data layer) are wrapped with an async wrapper.
+
+    Args:
+        operation (str): Operation name recorded with each command
+        explain (bool): Sample docsExamined with explain() (query must be the first argument)
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(cls, *args, **kwargs):
+                if not query_profiler.enabled:
+                    return await func(cls, *args, **kwargs)
+                token = _current_operation.set(f"{cls.__name__}.{operation}")
+                try:
+                    result = await func(cls, *args, **kwargs)
+                    if explain and random.random() < query_profiler.config['EXPLAIN_SAMPLE_RATE']:
+                        query = args[0] if args else kwargs.get('query')
+                        await _asample_explain(cls, query or {})
+                    return result
+                finally:
+                    _current_operation.reset(token)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(cls, *args, **kwargs):
+            if not query_profiler.enabled:
+                return func(cls, *args, **kwargs)
+            token = _current_operation.set(f"{cls.__name__}.{operation}")
+            try:
+                result = func(cls, *args, **kwargs)
+                if explain and random.random() < query_profiler.config['EXPLAIN_SAMPLE_RATE']:
+                    query = args[0] if args else kwargs.get('query')
+                    _sample_explain(cls, query or {})
+                return result
+            finally:
+                _current_operation.reset(token)
+        return wrapper
+    return decorator
+
+
+def _sample_explain(model, query):
+    collection = model.get_collection()
+    if collection is None:
+        return
+    try:
+        explanation = collection.find(query).explain()
+        query_profiler.record_explain(collection.name, query, explanation)
+    except Exception as e:
+        logger.debug(f"Explain sample failed for {model.__name__}: {str(e)}")
+
+
+async def _asample_explain(model, query):
+    collection = model.get_async_collection()
+    if collection is None:
+        return
+    try:
+        explanation = await collection.find(query).explain()
+        query_profiler.record_explain(collection.name, query, explanation)
+    except Exception as e:
+        logger.debug(f"Explain sample failed for {model.__name__}: {str(e)}")
@@ -0,0 +1,58 @@
+"""
+Background expiry sweeper.
+
+Coupons carry a Date ``expires_at`` and an ``is_active`` flag (set at import
+from ``valid_until``). Catalog queries and the partial indexes only cover
+``is_active: true``, so expired coupons must be flagged for them to drop out.
+A daemon thread runs ``Coupon.sweep_expired()`` every
+``EXPIRY_CONFIG['SWEEP_INTERVAL']`` seconds; deployments that prefer cron can
+run the ``sweep_expired_coupons`` management command instead.
+"""
+
+import logging
+import threading
+
+from intellishop.models.constants import EXPIRY_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def _run(stop_event, interval):
+    from intellishop.models.mongodb_models import Coupon
+    while not stop_event.is_set():
+        try:
+            Coupon.sweep_expired()
+        except Exception as e:
+            logger.error(f"Expiry sweep failed: {str(e)}")
+        stop_event.wait(interval)
+
+
+def start_expiry_sweeper(interval=None):
+    """
+    Start the process-wide sweeper thread (no-op if it is already running)
+
+    Args:
+        interval (int): Seconds between sweeps (defaults to EXPIRY_CONFIG['SWEEP_INTERVAL'])
+
+    Returns:
+        threading.Event: Set it to stop the sweeper, or None when sweeping is disabled
+    """
+    global _sweeper
+    interval = EXPIRY_CONFIG['SWEEP_INTERVAL'] if interval is None else interval
+    if not interval or interval <= 0:
+        logger.info("Coupon expiry sweeper disabled (SWEEP_INTERVAL is 0)")
+        return None
+    with _sweeper_lock:
+        if _sweeper is not None and _sweeper[0].is_alive():
+            return _sweeper[1]
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=_run, args=(stop_event, interval), name='coupon-expiry-sweeper', daemon=True
+        )
+        thread.start()
+        _sweeper = (thread, stop_event)
+        logger.info(f"Started coupon expiry sweeper (every {interval}s)")
+        return stop_event
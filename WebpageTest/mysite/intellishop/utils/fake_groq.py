@@ -0,0 +1,76 @@
+"""
+Local stand-in for the Groq SDK client.
+
+Set ``GROQ_FAKE=1`` to make ``create_groq_client`` return a ``FakeGroq`` (and
+``create_async_groq_client`` an ``AsyncFakeGroq``) so
+the enrichment script, the AI filter helper and their test commands run
+without network access or an API key. Tests can also build a ``FakeGroq``
+with their own responder and inspect ``calls``.
+"""
+
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+
+def echo_responder(model, messages):
+    """Default responder: echo a JSON object user message, otherwise return {}"""
+    content = messages[-1]['content']
+    start, end = content.find('{'), content.rfind('}')
+    if start != -1 and end > start:
+        try:
+            return json.dumps(json.loads(content[start:end + 1]), ensure_ascii=False)
+        except json.JSONDecodeError:
+            pass
+    return '{}'
+
+
+class _FakeCompletions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, messages, model, **kwargs):
+        with self._client._lock:
+            self._client.calls.append({'model': model, 'messages': messages, 'kwargs': kwargs})
+        content = self._client.responder(model, messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _AsyncFakeCompletions(_FakeCompletions):
+    async def create(self, messages, model, **kwargs):
+        return super().create(messages, model, **kwargs)
+
+
+class FakeGroq:
+    """Mimics ``Groq().chat.completions.create`` and records every call"""
+
+    def __init__(self, api_key=None, responder=None):
+        self.responder = responder or echo_responder
+        self.calls = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+
+
+class AsyncFakeGroq(FakeGroq):
+    """Mimics ``AsyncGroq().chat.completions.create``"""
+
+    def __init__(self, api_key=None, responder=None):
+        super().__init__(api_key=api_key, responder=responder)
+        self.chat = SimpleNamespace(completions=_AsyncFakeCompletions(self))
+
+
+def create_groq_client():
+    """Return a Groq client, or a FakeGroq when GROQ_FAKE is set"""
+    if os.environ.get('GROQ_FAKE', '').lower() in ('1', 'true', 'yes'):
+        return FakeGroq()
+    from groq import Groq
+    return Groq(api_key=os.environ.get("GROQ_API_KEY"))
+
+
+def create_async_groq_client():
+    """Return an AsyncGroq client, or an AsyncFakeGroq when GROQ_FAKE is set"""
+    if os.environ.get('GROQ_FAKE', '').lower() in ('1', 'true', 'yes'):
+        return AsyncFakeGroq()
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=os.environ.get("GROQ_API_KEY"))
@@ -0,0 +1,63 @@
+"""
+BSON-aware JSON encoding for the API responses.
+
+``orjson`` serializes dicts, lists, str, numbers and ``datetime`` natively in
+C; the remaining BSON types (``ObjectId``, ``Decimal128``...) go through
+``_bson_default``, which orjson only calls for values it cannot encode. Coupon
+cards can therefore be encoded straight from MongoDB documents, without a
+pass that rewrites ``_id`` to ``str`` first.
+"""
+
+import datetime
+import decimal
+
+import orjson
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from django.http import HttpResponse
+
+DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _bson_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """
+    Encode ``data`` (which may contain BSON values) as UTF-8 JSON
+
+    Returns:
+        bytes: JSON document
+    """
+    return orjson.dumps(data, default=_bson_default, option=DUMPS_OPTIONS)
+
+
+def loads(data):
+    return orjson.loads(data)
+
+
+class FastJsonResponse(HttpResponse):
+    """
+    Drop-in replacement for ``JsonResponse`` encoded with orjson.
+
+    Args:
+        data: Object to serialize; must be a dict unless ``safe`` is False
+        safe (bool): Only allow dicts, like JsonResponse
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
@@ -4,12 +4,11 @@ This module provides functionality to use Groq API for extracting filter paramet
 It reuses the Groq API infrastructure from groq_chat.py but with a specific prompt for filter extraction.
 """
 
-import os
 import json
+import asyncio
 import logging
 import time
 from typing import Dict, Any, Optional
-from groq import Groq
 from dotenv import load_dotenv
 from intellishop.models.constants import (
     CATEGORIES, 
@@ -18,6 +17,9 @@ from intellishop.models.constants import (
     get_categories_string,
     get_consumer_status_string
 )
+from asgiref.sync import sync_to_async
+from intellishop.utils.fake_groq import create_groq_client, create_async_groq_client
+from intellishop.utils.llm_cache import get_llm_cache, make_key
 
 # Load environment variables
 load_dotenv()
@@ -136,6 +138,50 @@ def select_percentage_bucket(text: str) -> str:
     
     return ''
 
+# Models tried in order; a 429 moves to the next one (same list as groq_chat.py)
+FILTER_MODELS = ["llama3-70b-8192", "llama3-8b-8192", "llama-3.1-8b-instant",
+                 "llama-3.3-70b-versatile", "gemma2-9b-it"]
+
+def _completion_messages(user_text: str):
+    return [
+        {"role": "system", "content": FILTER_EXTRACTION_PROMPT},
+        {"role": "user", "content": user_text.strip()}
+    ]
+
+def _finalize_filters(extracted_filters: Dict[str, Any], user_text: str) -> Dict[str, Any]:
+    """Validate the model output and fill in the percentage bucket from the text"""
+    validated_filters = validate_extracted_filters(extracted_filters)
+    
+    # If percentage_range is missing but should be included based on text analysis
+    if not validated_filters.get('percentage_range') and any(term in user_text.lower() for term in ['discount', 'off', 'sale', 'reduced', 'save', 'deal', '%', 'percent']):
+        selected_bucket = select_percentage_bucket(user_text)
+        if selected_bucket:
+            validated_filters['percentage_range'] = {
+                'enabled': True,
+                'bucket': selected_bucket
+            }
+            logger.info(f"✓ Added missing percentage_range with bucket: {selected_bucket}")
+        else:
+            # Default to up_to_20 if no specific bucket can be determined
+            validated_filters['percentage_range'] = {
+                'enabled': True,
+                'bucket': 'up_to_20'
+            }
+            logger.info("✓ Added default percentage_range with 'up_to_20' bucket")
+    
+    # Additional check: if percentage_range exists but has no bucket, add one
+    if validated_filters.get('percentage_range') and validated_filters['percentage_range'].get('enabled') and not validated_filters['percentage_range'].get('bucket'):
+        selected_bucket = select_percentage_bucket(user_text)
+        if selected_bucket:
+            validated_filters['percentage_range']['bucket'] = selected_bucket
+            logger.info(f"✓ Added missing bucket to existing percentage_range: {selected_bucket}")
+        else:
+            validated_filters['percentage_range']['bucket'] = 'up_to_20'
+            logger.info("✓ Added default bucket 'up_to_20' to existing percentage_range")
+    
+    logger.info(f"Successfully extracted filters: {validated_filters}")
+    return validated_filters
+
 def extract_filters_from_text(user_text: str, max_retries: int = 2) -> Dict[str, Any]:
     """
     Extract filter parameters from user text using Groq API.
@@ -155,70 +201,37 @@ def extract_filters_from_text(user_text: str, max_retries: int = 2) -> Dict[str,
     logging.getLogger("groq").setLevel(logging.WARNING)
     logging.getLogger("groq._base_client").setLevel(logging.WARNING)
     
-    # Available models (same as in groq_chat.py)
-    models = ["llama3-70b-8192", "llama3-8b-8192", "llama-3.1-8b-instant", 
-              "llama-3.3-70b-versatile", "gemma2-9b-it"]
-    
+    models = FILTER_MODELS
     current_model_index = 0
     retry_count = 0
+    llm_cache = get_llm_cache()
     
     while retry_count <= max_retries:
         try:
-            client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
             current_model = models[current_model_index]
+            messages = _completion_messages(user_text)
             
-            logger.info(f"Extracting filters from text using model: {current_model}")
-            
-            # Create the complete prompt
-            system_message = FILTER_EXTRACTION_PROMPT
-            user_message = user_text.strip()
-            
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                model=current_model,
-                max_tokens=1024,
-                response_format={"type": "json_object"}
-            )
-            
-            # Parse the response
-            response_content = chat_completion.choices[0].message.content
-            extracted_filters = json.loads(response_content)
-            
-            # Validate the extracted filters
-            validated_filters = validate_extracted_filters(extracted_filters)
-            
-            # If percentage_range is missing but should be included based on text analysis
-            if not validated_filters.get('percentage_range') and any(term in user_text.lower() for term in ['discount', 'off', 'sale', 'reduced', 'save', 'deal', '%', 'percent']):
-                selected_bucket = select_percentage_bucket(user_text)
-                if selected_bucket:
-                    validated_filters['percentage_range'] = {
-                        'enabled': True,
-                        'bucket': selected_bucket
-                    }
-                    logger.info(f"✓ Added missing percentage_range with bucket: {selected_bucket}")
-                else:
-                    # Default to up_to_20 if no specific bucket can be determined
-                    validated_filters['percentage_range'] = {
-                        'enabled': True,
-                        'bucket': 'up_to_20'
-                    }
-                    logger.info("✓ Added default percentage_range with 'up_to_20' bucket")
+            # Identical queries (up to case/whitespace) reuse the stored response
+            cache_key = make_key(FILTER_EXTRACTION_PROMPT, current_model, messages[1]['content'])
+            response_content = llm_cache.get(cache_key)
             
-            # Additional check: if percentage_range exists but has no bucket, add one
-            if validated_filters.get('percentage_range') and validated_filters['percentage_range'].get('enabled') and not validated_filters['percentage_range'].get('bucket'):
-                selected_bucket = select_percentage_bucket(user_text)
-                if selected_bucket:
-                    validated_filters['percentage_range']['bucket'] = selected_bucket
-                    logger.info(f"✓ Added missing bucket to existing percentage_range: {selected_bucket}")
-                else:
-                    validated_filters['percentage_range']['bucket'] = 'up_to_20'
-                    logger.info("✓ Added default bucket 'up_to_20' to existing percentage_range")
+            if response_content is None:
+                logger.info(f"Extracting filters from text using model: {current_model}")
+                client = create_groq_client()
+                chat_completion = client.chat.completions.create(
+                    messages=messages,
+                    model=current_model,
+                    max_tokens=1024,
+                    response_format={"type": "json_object"}
+                )
+                response_content = chat_completion.choices[0].message.content
+                filters = _finalize_filters(json.loads(response_content), user_text)
+                # Only responses that parsed and validated are stored
+                llm_cache.set(cache_key, response_content)
+                return filters
             
-            logger.info(f"Successfully extracted filters: {validated_filters}")
-            return validated_filters
+            logger.info(f"Using cached filter extraction for model: {current_model}")
+            return _finalize_filters(json.loads(response_content), user_text)
                 
         except Exception as e:
             error_message = f"Error extracting filters from text: {str(e)}"
@@ -244,6 +257,79 @@ def extract_filters_from_text(user_text: str, max_retries: int = 2) -> Dict[str,
     
     return {}
 
+async def aextract_filters_from_text(user_text: str, max_retries: int = 2) -> Dict[str, Any]:
+    """
+    Async variant of extract_filters_from_text for the async ai_filter_helper view:
+    the Groq call goes through AsyncGroq and back-offs use asyncio.sleep, so
+    the event loop keeps serving other requests while the model answers.
+    
+    Args:
+        user_text (str): The user's text input
+        max_retries (int): Maximum number of retry attempts
+        
+    Returns:
+        Dict[str, Any]: Filter parameters in the expected format
+    """
+    if not user_text or not user_text.strip():
+        logger.warning("Empty user text provided")
+        return {}
+    
+    logging.getLogger("groq").setLevel(logging.WARNING)
+    logging.getLogger("groq._base_client").setLevel(logging.WARNING)
+    
+    models = FILTER_MODELS
+    current_model_index = 0
+    retry_count = 0
+    llm_cache = get_llm_cache()
+    # The cache is a local SQLite file; keep its I/O off the event loop
+    cache_get = sync_to_async(llm_cache.get, thread_sensitive=False)
+    cache_set = sync_to_async(llm_cache.set, thread_sensitive=False)
+    
+    while retry_count <= max_retries:
+        try:
+            current_model = models[current_model_index]
+            messages = _completion_messages(user_text)
+            
+            cache_key = make_key(FILTER_EXTRACTION_PROMPT, current_model, messages[1]['content'])
+            response_content = await cache_get(cache_key)
+            
+            if response_content is None:
+                logger.info(f"Extracting filters from text using model: {current_model}")
+                client = create_async_groq_client()
+                chat_completion = await client.chat.completions.create(
+                    messages=messages,
+                    model=current_model,
+                    max_tokens=1024,
+                    response_format={"type": "json_object"}
+                )
+                response_content = chat_completion.choices[0].message.content
+                filters = _finalize_filters(json.loads(response_content), user_text)
+                await cache_set(cache_key, response_content)
+                return filters
+            
+            logger.info(f"Using cached filter extraction for model: {current_model}")
+            return _finalize_filters(json.loads(response_content), user_text)
+                
+        except Exception as e:
+            error_message = f"Error extracting filters from text: {str(e)}"
+            
+            if "429" in str(e):
+                prev_model = models[current_model_index]
+                current_model_index = (current_model_index + 1) % len(models)
+                logger.info(f"429 Too Many Requests: Switching model from {prev_model} to {models[current_model_index]}")
+                await asyncio.sleep(1)
+                continue
+            
+            if retry_count < max_retries:
+                retry_count += 1
+                logger.warning(f"{error_message}\nRetrying attempt {retry_count} of {max_retries}...")
+                await asyncio.sleep(2)
+            else:
+                logger.error(f"{error_message}\nMax retries exceeded. Returning empty filters.")
+                return {}
+    
+    return {}
+
 def validate_extracted_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
     """
     Validate and sanitize the extracted filters to ensure they match expected format.
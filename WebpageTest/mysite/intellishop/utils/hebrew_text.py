@@ -0,0 +1,124 @@
+"""
+Hebrew-aware text normalization and tokenization.
+
+Shared by the search index, the coupon import and the scraper. This module is
+pure Python (no Django imports) so the standalone scraper can import it too.
+
+Normalization folds case, removes niqqud/cantillation marks and maps final
+letters (ך ם ן ף ץ) to their regular forms. Tokens that start with the common
+one-letter prefixes (ה ו ב ל מ ש כ) are additionally indexed without them, so
+"והנחה" is found when searching for "הנחה".
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Hebrew points and cantillation marks (U+0591-U+05C7), excluding maqaf and
+# sof pasuq which are punctuation rather than diacritics
+NIQQUD_PATTERN = re.compile(r'[\u0591-\u05BD\u05BF-\u05C2\u05C4-\u05C7]')
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+HEBREW_LETTER_PATTERN = re.compile(r'[\u05D0-\u05EA]')
+
+FINAL_LETTERS = str.maketrans({
+    'ך': 'כ',
+    'ם': 'מ',
+    'ן': 'נ',
+    'ף': 'פ',
+    'ץ': 'צ',
+})
+
+PREFIX_LETTERS = frozenset('הובלמשכ')
+
+# Prefix letters are only stripped while at least this many letters remain
+MIN_STEM_LENGTH = 2
+
+# At most this many leading prefix letters are stripped (e.g. "ו" + "ה")
+MAX_PREFIX_LETTERS = 2
+
+
+def strip_niqqud(text):
+    """Remove niqqud and cantillation marks, keeping the letters"""
+    if not text:
+        return ''
+    return NIQQUD_PATTERN.sub('', text)
+
+
+def normalize_text(text):
+    """Case-fold, strip niqqud and normalize final letters in free text"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', str(text))
+    return strip_niqqud(text).lower().translate(FINAL_LETTERS)
+
+
+@lru_cache(maxsize=65536)
+def normalize_token(token):
+    """Normalize a single raw token (cached, tokens repeat heavily)"""
+    return normalize_text(token)
+
+
+@lru_cache(maxsize=65536)
+def token_variants(token):
+    """
+    Return a normalized token together with its prefix-stripped forms.
+
+    Args:
+        token (str): Normalized token
+
+    Returns:
+        tuple: The token followed by up to MAX_PREFIX_LETTERS stripped variants
+    """
+    variants = [token]
+    stem = token
+    for _ in range(MAX_PREFIX_LETTERS):
+        if len(stem) - 1 < MIN_STEM_LENGTH or stem[0] not in PREFIX_LETTERS:
+            break
+        if not HEBREW_LETTER_PATTERN.match(stem[1]):
+            break
+        stem = stem[1:]
+        variants.append(stem)
+    return tuple(variants)
+
+
+def tokenize(text):
+    """
+    Split text into normalized tokens, without prefix stripping.
+
+    Used for query words: the indexed side already carries the stripped
+    variants, so the query is matched as typed.
+    """
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(part) for part in text if part)
+    # Niqqud marks are not word characters, so remove them before splitting
+    text = strip_niqqud(str(text))
+    return [normalize_token(token) for token in TOKEN_PATTERN.findall(text)]
+
+
+def index_tokens(text):
+    """Return the set of tokens (including prefix-stripped variants) to index for text"""
+    tokens = set()
+    for token in tokenize(text):
+        tokens.update(token_variants(token))
+    return tokens
+
+
+def document_tokens(document, fields):
+    """
+    Precompute the sorted token array stored on a coupon document.
+
+    Args:
+        document (dict): Coupon document
+        fields (list): Text fields to tokenize
+
+    Returns:
+        list: Sorted unique tokens
+    """
+    tokens = set()
+    for field in fields:
+        tokens.update(index_tokens(document.get(field)))
+    return sorted(tokens)
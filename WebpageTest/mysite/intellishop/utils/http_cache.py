@@ -0,0 +1,111 @@
+"""
+HTTP conditional GET for views whose output only changes with the catalog.
+
+The catalog version (utils/catalog_cache.py) is bumped by every import and
+clear, so it identifies the coupon data a response was built from.
+``catalog_conditional`` turns it into a strong ETag plus ``Last-Modified``
+(the time of the last bump) and answers a matching ``If-None-Match`` /
+``If-Modified-Since`` with 304 before the view runs, so nothing is queried
+or serialized. Browsers are told to revalidate every time (``no-cache``), so
+a new import is picked up on the next request.
+
+Views that embed the logged-in user (favorites, username) pass
+``per_user=True``: the ETag then also covers the cached user document
+(utils/user_cache.py) and the response is ``private`` with ``Vary: Cookie``.
+"""
+
+import datetime
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from intellishop.models.constants import HTTP_CACHE_CONFIG
+from intellishop.utils.catalog_cache import catalog_cache
+
+
+def _user_tag(user):
+    """Short digest of the parts of the user document views render"""
+    if not user:
+        return 'anon'
+    state = (str(user.get('_id')), user.get('username'), sorted(user.get('favorites', [])))
+    return hashlib.blake2b(repr(state).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _validators(version, updated_at, user_tag):
+    """
+    Returns:
+        tuple: (quoted strong ETag, Last-Modified timestamp or None)
+    """
+    parts = [HTTP_CACHE_CONFIG['ETAG_PREFIX'], f"c{version}"]
+    if user_tag is not None:
+        parts.append(user_tag)
+    last_modified = None
+    # Per-user content changes without a catalog bump; rely on the ETag alone
+    if updated_at is not None and user_tag is None:
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=datetime.timezone.utc)
+        last_modified = int(updated_at.timestamp())
+    return f'"{"-".join(parts)}"', last_modified
+
+
+def _finish(request, response, etag, last_modified, per_user):
+    if response.status_code not in (200, 304):
+        return response
+    response.headers.setdefault('ETag', etag)
+    if last_modified is not None:
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    if per_user:
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie',))
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def catalog_conditional(per_user=False):
+    """
+    Decorator: ETag / Last-Modified from the catalog version, 304 on a match
+
+    Works on sync and async views. Only GET and HEAD are conditional; other
+    methods, and requests made while the version cannot be read, go straight
+    to the view.
+
+    Args:
+        per_user (bool): The response embeds the logged-in user (needs
+            intellishop.middleware.UserMiddleware)
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_view(request, *args, **kwargs):
+                if not HTTP_CACHE_CONFIG['ENABLED'] or request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+                version, updated_at = await catalog_cache.aversion_info()
+                if version is None:
+                    return await view_func(request, *args, **kwargs)
+                user_tag = _user_tag(await request.aintellishop_user()) if per_user else None
+                etag, last_modified = _validators(version, updated_at, user_tag)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return _finish(request, response, etag, last_modified, per_user)
+            return async_view
+
+        @wraps(view_func)
+        def sync_view(request, *args, **kwargs):
+            if not HTTP_CACHE_CONFIG['ENABLED'] or request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            version, updated_at = catalog_cache.version_info()
+            if version is None:
+                return view_func(request, *args, **kwargs)
+            user_tag = _user_tag(request.intellishop_user) if per_user else None
+            etag, last_modified = _validators(version, updated_at, user_tag)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return _finish(request, response, etag, last_modified, per_user)
+        return sync_view
+    return decorator
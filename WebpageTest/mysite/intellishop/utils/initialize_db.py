@@ -1,5 +1,5 @@
-from intellishop.utils.mongodb_utils import get_collection_handle
-from intellishop.models.mongodb_models import Coupon
+from intellishop.models.mongodb_models import User, Coupon, SessionRecord, Club
+from intellishop.utils.expiry_sweeper import start_expiry_sweeper
 import logging
 import os
 import csv
@@ -8,38 +8,22 @@ import json
 logger = logging.getLogger(__name__)
 
 def create_indexes():
-    """Create MongoDB indexes for performance and constraints"""
-    # Users collection
-    users_collection = get_collection_handle('users')
-    
-    # Add None check before trying to create indexes
-    if users_collection is not None:
+    """
+    Create the indexes declared on the models (MongoDBModel.indexes).
+    Use the sync_indexes management command to also verify query plans.
+    """
+    for model in (User, Coupon, SessionRecord):
         try:
-            # Create unique indexes
-            users_collection.create_index('username', unique=True)
-            users_collection.create_index('email', unique=True)
-            logger.info("Created user collection indexes")
+            result = model.sync_indexes()
+            if result['failed']:
+                logger.error(f"Error creating {model.collection_name} indexes: {result['failed']}")
+            else:
+                logger.info(
+                    f"Synced {model.collection_name} indexes: {len(result['created'])} created, "
+                    f"{len(result['rebuilt'])} rebuilt, {len(result['unchanged'])} unchanged"
+                )
         except Exception as e:
-            logger.error(f"Error creating user indexes: {str(e)}")
-    else:
-        logger.error("Could not get users collection handle")
-    
-    # Coupons collection
-    coupons_collection = get_collection_handle('coupons')
-    
-    # Add None check before trying to create indexes
-    if coupons_collection is not None:
-        try:
-            # Create a simple non-unique index on coupon_code for faster lookups
-            coupons_collection.create_index('coupon_code')
-            
-            # Create index for finding active coupons
-            coupons_collection.create_index('valid_until')
-            logger.info("Created coupon collection indexes")
-        except Exception as e:
-            logger.error(f"Error creating coupon indexes: {str(e)}")
-    else:
-        logger.error("Could not get coupons collection handle")
+            logger.error(f"Error creating {model.collection_name} indexes: {str(e)}")
 
 def import_sample_coupon_data():
     """Import sample coupon data from the app data directory"""
@@ -79,6 +63,11 @@ def initialize_database():
     try:
         create_indexes()
         import_sample_coupon_data()
+        Coupon.backfill_expiry()
+        # Imports keep the club directory current; build it once for existing catalogs
+        if Club.count() == 0:
+            Club.rebuild()
+        start_expiry_sweeper()
         logger.info("Database initialization completed successfully")
     except Exception as e:
         logger.error(f"Database initialization error: {str(e)}")
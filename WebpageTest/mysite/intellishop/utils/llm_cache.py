@@ -0,0 +1,186 @@
+"""
+Content-addressed, on-disk cache of Groq responses.
+
+Responses are keyed by a hash of (prompt template, model, normalized input),
+so re-running discount enrichment or repeating a popular AI filter query
+costs no API call. Entries live in a small SQLite file shared by every
+process, with LRU eviction (MAX_ENTRIES) and a TTL. Like hebrew_text, this
+module has no Django imports so groq_chat.py can use it directly.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from intellishop.models.constants import LLM_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# WebpageTest/mysite, next to the Django sqlite database
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'llm_cache.sqlite3'
+)
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_input(value):
+    """
+    Canonical text for a prompt input: free text is case-folded with
+    whitespace collapsed, structured input is dumped with sorted keys.
+    """
+    if isinstance(value, str):
+        return WHITESPACE_PATTERN.sub(' ', value).strip().casefold()
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+def make_key(prompt_template, model, user_input):
+    """
+    Build the cache key for one request.
+    
+    Args:
+        prompt_template (str): System prompt sent with the request
+        model (str): Groq model name
+        user_input: User text or object sent to the model
+        
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in (prompt_template, model, normalize_input(user_input)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed response cache with LRU + TTL eviction and hit/miss counters"""
+
+    def __init__(self, path=None, config=None):
+        self.config = config or LLM_CACHE_CONFIG
+        self.path = path or self.config.get('PATH') or os.environ.get('LLM_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._connection = None
+        self._lock = threading.Lock()
+        self.enabled = self.config.get('ENABLED', True)
+
+    def _connect(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, response TEXT NOT NULL, '
+                'created_at REAL NOT NULL, last_access REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)')
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _disable(self, error):
+        logger.warning(f"LLM response cache disabled ({self.path}): {str(error)}")
+        self.enabled = False
+
+    def get(self, key):
+        """Return the cached response text for ``key``, or None on a miss"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            try:
+                connection = self._connect()
+                row = connection.execute(
+                    'SELECT response, created_at FROM responses WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None and now - row[1] > self.config['TTL_SECONDS']:
+                    connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    connection.commit()
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                connection.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+                connection.commit()
+            except sqlite3.Error as e:
+                self._disable(e)
+                return None
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, response):
+        """Store a response (only cache responses that passed validation)"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                connection = self._connect()
+                connection.execute(
+                    'INSERT OR REPLACE INTO responses (key, response, created_at, last_access) VALUES (?, ?, ?, ?)',
+                    (key, response, now, now)
+                )
+                connection.commit()
+                self._writes += 1
+                if self._writes % self.config['EVICT_EVERY'] == 0:
+                    self._evict(connection, now)
+            except sqlite3.Error as e:
+                self._disable(e)
+
+    def _evict(self, connection, now):
+        connection.execute('DELETE FROM responses WHERE created_at < ?', (now - self.config['TTL_SECONDS'],))
+        connection.execute(
+            'DELETE FROM responses WHERE key IN ('
+            'SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+            (self.config['MAX_ENTRIES'],)
+        )
+        connection.commit()
+
+    def clear(self):
+        """Drop every cached response and reset the counters"""
+        with self._lock:
+            self.hits = self.misses = 0
+            if not self.enabled:
+                return
+            try:
+                connection = self._connect()
+                connection.execute('DELETE FROM responses')
+                connection.commit()
+            except sqlite3.Error as e:
+                self._disable(e)
+
+    def stats(self):
+        """Hit/miss counters of this process and the number of stored entries"""
+        entries = 0
+        if self.enabled:
+            with self._lock:
+                try:
+                    entries = self._connect().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+                except sqlite3.Error as e:
+                    self._disable(e)
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': entries
+        }
+
+
+_llm_cache = None
+
+
+def get_llm_cache():
+    """Return the process-wide response cache"""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache()
+    return _llm_cache
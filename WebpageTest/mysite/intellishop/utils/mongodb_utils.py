@@ -1,20 +1,38 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, AsyncMongoClient
 from django.conf import settings
+from asgiref.sync import sync_to_async
 import os
+import asyncio
+import itertools
 import logging
+import weakref
 import certifi
+from intellishop.utils.db_profiler import query_profiler
 
 logger = logging.getLogger(__name__)
 
 # MongoDB client connection
 _mongo_client = None
 
+# Async clients are bound to the event loop that created them: one per loop.
+# Only the ASGI entry point (mysite.asgi) has a loop that lives as long as the
+# worker and turns them on with enable_async_client(). Elsewhere (WSGI, where
+# async_to_sync runs every async view in a new loop, and management commands)
+# the async data layer runs the shared sync client in worker threads instead.
+_async_mongo_clients = weakref.WeakKeyDictionary()
+_async_client_enabled = False
+
+# Documents fetched per worker-thread hop when iterating a threaded cursor
+THREADED_CURSOR_BATCH = 100
+
 def get_mongo_client():
     """Get or create MongoDB client connection"""
     global _mongo_client
     if _mongo_client is None:
         mongo_uri = settings.MONGODB_URI
-        _mongo_client = MongoClient(mongo_uri)
+        # Command listener feeding the query profile (/db_profile/) and slow-query log
+        listeners = [query_profiler] if query_profiler.enabled else []
+        _mongo_client = MongoClient(mongo_uri, event_listeners=listeners)
     return _mongo_client
 
 def get_database():
@@ -30,6 +48,105 @@ def get_collection_handle(collection_name):
         return db[collection_name]
     return None
 
+def enable_async_client():
+    """Serve the async data layer from a per-loop AsyncMongoClient (long-lived event loops only)"""
+    global _async_client_enabled
+    _async_client_enabled = True
+
+def get_async_mongo_client():
+    """Get or create the AsyncMongoClient of the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_mongo_clients.get(loop)
+    if client is None:
+        listeners = [query_profiler] if query_profiler.enabled else []
+        client = AsyncMongoClient(settings.MONGODB_URI, event_listeners=listeners)
+        _async_mongo_clients[loop] = client
+    return client
+
+def get_async_database():
+    """Get MongoDB database (async client)"""
+    return get_async_mongo_client()[settings.MONGODB_NAME]
+
+def get_async_collection_handle(collection_name):
+    """
+    Get MongoDB collection by name for the async data layer
+    
+    Args:
+        collection_name: Collection name
+        
+    Returns:
+        The collection on the running loop's AsyncMongoClient when enable_async_client()
+        was called, otherwise the sync collection behind a ThreadedCollection
+    """
+    if not _async_client_enabled:
+        collection = get_collection_handle(collection_name)
+        return ThreadedCollection(collection) if collection is not None else None
+    db = get_async_database()
+    if db is not None:
+        return db[collection_name]
+    return None
+
+class ThreadedCollection:
+    """
+    The AsyncCollection methods the async data layer uses, over a sync collection:
+    each call runs in a worker thread (sync_to_async), so no client is tied to a
+    short-lived event loop
+    """
+    _ASYNC_METHODS = {
+        'find_one', 'count_documents', 'insert_one', 'insert_many',
+        'update_one', 'update_many', 'delete_one', 'delete_many',
+    }
+    
+    def __init__(self, collection):
+        self._collection = collection
+    
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name in self._ASYNC_METHODS:
+            return sync_to_async(attribute, thread_sensitive=False)
+        return attribute
+    
+    def find(self, *args, **kwargs):
+        return ThreadedCursor(self._collection.find(*args, **kwargs))
+
+class ThreadedCursor:
+    """AsyncCursor counterpart of ThreadedCollection.find"""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._batch_size = THREADED_CURSOR_BATCH
+    
+    def sort(self, *args, **kwargs):
+        self._cursor.sort(*args, **kwargs)
+        return self
+    
+    def limit(self, limit):
+        self._cursor.limit(limit)
+        return self
+    
+    def batch_size(self, batch_size):
+        self._cursor.batch_size(batch_size)
+        self._batch_size = batch_size or THREADED_CURSOR_BATCH
+        return self
+    
+    async def to_list(self, length=None):
+        return await sync_to_async(lambda: list(itertools.islice(self._cursor, length)), thread_sensitive=False)()
+    
+    async def explain(self):
+        return await sync_to_async(self._cursor.explain, thread_sensitive=False)()
+    
+    async def close(self):
+        await sync_to_async(self._cursor.close, thread_sensitive=False)()
+    
+    async def __aiter__(self):
+        next_batch = sync_to_async(lambda: list(itertools.islice(self._cursor, self._batch_size)), thread_sensitive=False)
+        while True:
+            batch = await next_batch()
+            if not batch:
+                return
+            for document in batch:
+                yield document
+
 def get_db_handle():
     """
     Returns a handle to the MongoDB database and client
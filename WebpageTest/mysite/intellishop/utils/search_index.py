@@ -0,0 +1,175 @@
+"""
+In-process inverted index for coupon text search.
+
+Replaces the per-word x per-field ``$regex`` scans (which MongoDB cannot serve
+from an index) with posting-list intersection over the fields listed in
+``TEXT_SEARCH_FIELDS``. The index is built lazily from the coupons collection
+on first use and refreshed incrementally by the import paths. Only live
+coupons (ACTIVE_COUPON_FILTER) are indexed; the expiry sweeper invalidates it.
+
+Documents are indexed from the token array precomputed at import time
+(TEXT_SEARCH['TOKENS_FIELD']); older documents without it are tokenized on
+the fly with the same normalizer.
+"""
+
+import bisect
+import logging
+import threading
+
+from intellishop.models.constants import FILTER_CONFIG, ACTIVE_COUPON_FILTER
+from intellishop.utils.catalog_cache import catalog_cache
+from intellishop.utils.hebrew_text import document_tokens, tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class InvertedIndex:
+    """Token -> set of coupon ``_id`` posting lists with prefix lookup"""
+
+    def __init__(self, fields=None):
+        self.fields = list(fields or FILTER_CONFIG['SEARCHABLE_FIELDS'])
+        self.tokens_field = FILTER_CONFIG['TEXT_SEARCH']['TOKENS_FIELD']
+        self._postings = {}      # token -> set(_id)
+        self._doc_tokens = {}    # _id -> set(token), needed to un-index on update
+        self._vocabulary = []    # sorted tokens, for prefix expansion via bisect
+        self._lock = threading.RLock()
+        self.is_built = False
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    def _document_tokens(self, document):
+        precomputed = document.get(self.tokens_field)
+        if isinstance(precomputed, list):
+            return set(precomputed)
+        return set(document_tokens(document, self.fields))
+
+    @property
+    def projection(self):
+        """Fields needed to index a document"""
+        projection = {field: 1 for field in self.fields}
+        projection[self.tokens_field] = 1
+        projection['is_active'] = 1
+        return projection
+
+    def add_document(self, document):
+        """Index (or re-index) a single coupon document"""
+        doc_id = document.get('_id')
+        if doc_id is None:
+            return
+        tokens = self._document_tokens(document)
+        with self._lock:
+            self._remove(doc_id)
+            for token in tokens:
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = set()
+                    bisect.insort(self._vocabulary, token)
+                posting.add(doc_id)
+            self._doc_tokens[doc_id] = tokens
+
+    def remove_document(self, doc_id):
+        """Drop a coupon from the index"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        for token in self._doc_tokens.pop(doc_id, ()):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(doc_id)
+            if not posting:
+                del self._postings[token]
+                idx = bisect.bisect_left(self._vocabulary, token)
+                if idx < len(self._vocabulary) and self._vocabulary[idx] == token:
+                    del self._vocabulary[idx]
+
+    def build(self, documents):
+        """Rebuild the whole index from an iterable of documents"""
+        with self._lock:
+            self._postings = {}
+            self._doc_tokens = {}
+            self._vocabulary = []
+            for document in documents:
+                doc_id = document.get('_id')
+                if doc_id is None:
+                    continue
+                tokens = self._document_tokens(document)
+                for token in tokens:
+                    self._postings.setdefault(token, set()).add(doc_id)
+                self._doc_tokens[doc_id] = tokens
+            self._vocabulary = sorted(self._postings)
+            self.is_built = True
+        logger.info(f"Built search index: {len(self._doc_tokens)} coupons, {len(self._vocabulary)} tokens")
+
+    def _prefix_matches(self, word):
+        """Union of posting lists for every token starting with ``word``"""
+        start = bisect.bisect_left(self._vocabulary, word)
+        matches = set()
+        for idx in range(start, len(self._vocabulary)):
+            token = self._vocabulary[idx]
+            if not token.startswith(word):
+                break
+            matches |= self._postings[token]
+        return matches
+
+    def search(self, words):
+        """
+        Return ids of coupons that contain every word (as a token prefix).
+        Query words are normalized but not prefix-stripped; the indexed
+        side already carries the stripped variants.
+
+        Args:
+            words (list): Query words, already split
+
+        Returns:
+            set: Matching coupon ``_id`` values
+        """
+        query_tokens = []
+        for word in words:
+            query_tokens.extend(tokenize(word))
+        if not query_tokens:
+            return set()
+
+        with self._lock:
+            postings = [self._prefix_matches(token) for token in dict.fromkeys(query_tokens)]
+
+        # Intersect smallest-first so the work is bounded by the rarest word
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if not result:
+                break
+            result = result & posting
+        return result
+
+
+_search_index = InvertedIndex()
+
+
+def get_search_index(collection=None):
+    """Return the process-wide index, building it from ``collection`` on first use"""
+    if not _search_index.is_built and collection is not None:
+        _search_index.build(collection.find(ACTIVE_COUPON_FILTER, _search_index.projection))
+    return _search_index
+
+
+def refresh_documents(collection, query):
+    """Re-index the coupons matching ``query`` after they were written"""
+    if not _search_index.is_built or collection is None:
+        return  # Will be picked up by the lazy full build
+    for document in collection.find(query, _search_index.projection):
+        if document.get('is_active', True):
+            _search_index.add_document(document)
+        else:
+            _search_index.remove_document(document['_id'])
+
+
+def invalidate_search_index():
+    """Force a full rebuild on the next search (e.g. after bulk deletes)"""
+    _search_index.is_built = False
+
+
+# Imports and clears run in other processes; rebuild when they change the catalog
+catalog_cache.on_invalidate(invalidate_search_index)
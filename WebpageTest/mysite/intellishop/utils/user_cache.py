@@ -0,0 +1,66 @@
+"""
+Short-TTL, process-wide cache of user documents.
+
+Almost every page and AJAX call loads the logged-in user (profile, statuses,
+hobbies, ``favorites``). ``User.get_cached`` serves the document from here
+for ``USER_CACHE_CONFIG['TTL']`` seconds; ``User.update_one``/``delete_one``
+(and so ``add_favorite``/``remove_favorite``) invalidate the entry, so this
+process never serves its own stale writes. Writes made by other workers show
+up once the entry expires.
+
+``intellishop.middleware.UserMiddleware`` exposes the result as the lazy,
+request-scoped ``request.intellishop_user``.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from intellishop.models.constants import USER_CACHE_CONFIG
+
+# user_id (str) -> (document, cached_at)
+_users = OrderedDict()
+_lock = threading.Lock()
+
+
+def get(user_id):
+    """
+    Cached user document, or None on a miss
+
+    Returns:
+        dict: A copy of the document, safe to modify
+    """
+    if not USER_CACHE_CONFIG['ENABLED']:
+        return None
+    user_id = str(user_id)
+    with _lock:
+        entry = _users.get(user_id)
+        if entry is None:
+            return None
+        document, cached_at = entry
+        if time.monotonic() - cached_at > USER_CACHE_CONFIG['TTL']:
+            del _users[user_id]
+            return None
+        _users.move_to_end(user_id)
+    return copy.deepcopy(document)
+
+
+def put(user_id, document):
+    if not USER_CACHE_CONFIG['ENABLED'] or document is None:
+        return
+    document = copy.deepcopy(document)
+    with _lock:
+        _users[str(user_id)] = (document, time.monotonic())
+        _users.move_to_end(str(user_id))
+        while len(_users) > USER_CACHE_CONFIG['MAX_SIZE']:
+            _users.popitem(last=False)
+
+
+def invalidate(user_id=None):
+    """Drop one user, or every cached user when user_id is None"""
+    with _lock:
+        if user_id is None:
+            _users.clear()
+        else:
+            _users.pop(str(user_id), None)
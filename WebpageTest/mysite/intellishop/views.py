@@ -1,7 +1,10 @@
 # View functions that handle HTTP requests and return responses
+# The read-heavy JSON endpoints (filtered_discounts, search_discounts_by_text,
+# get_club_names, check_favorite_view, ai_filter_helper) are async views on the
+# async data layer (MongoDBModel.a* methods); serve them with mysite.asgi.
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
-from .models.mongodb_models import User, Coupon
+from django.http import JsonResponse, StreamingHttpResponse
+from .models.mongodb_models import User, Coupon, Club
 import json
 from pymongo.errors import DuplicateKeyError
 from bson.objectid import ObjectId
@@ -11,7 +14,11 @@ from datetime import datetime
 from django.templatetags.static import static
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
-from intellishop.models.constants import FILTER_CONFIG
+from intellishop.models.constants import FILTER_CONFIG, PAGINATION_CONFIG, QUERY_PROFILING_CONFIG
+from intellishop.utils.db_profiler import query_profiler
+from intellishop.utils import coupon_cards
+from intellishop.utils.fast_json import FastJsonResponse, dumps as fast_dumps
+from intellishop.utils.http_cache import catalog_conditional
 import logging
 from django.core.mail import send_mail
 import random
@@ -27,8 +34,8 @@ def index_home(request):
     if not user_id:
         return redirect('login')
     
-    # Get user from MongoDB
-    user = User.find_one({'_id': ObjectId(user_id)})
+    # Cached user document (intellishop.middleware.UserMiddleware)
+    user = request.intellishop_user
     if not user:
         return redirect('login')
 
@@ -45,93 +52,22 @@ def index_home(request):
     if user_hobbies:
         filters['interests'] = user_hobbies
     
-    # Get filtered coupons from MongoDB (UPDATED LOGIC)
+    # Rank the catalog for this user (see intellishop/utils/ranking.py): coupons
+    # matching their statuses/interests plus their favourites, weighted by the
+    # favourites' categories & statuses, limited to RANKING_CONFIG['FEED_SIZE']
     try:
-        # Step 1: Fetch coupons based on user filters (no random limit)
-        if filters:
-            base_coupons = list(Coupon.get_filtered_coupons(filters))
-        else:
-            base_coupons = list(Coupon.get_all())
-
-        # Step 2: Fetch user's favourite coupons
-        favorite_ids = user.get('favorites', [])
-        favorite_coupons = []
-        if favorite_ids:
-            favorite_coupons = list(Coupon.find({'discount_id': {'$in': favorite_ids}}))
-
-        # Step 3: Build weighting based on favourites' categories & statuses
-        from collections import defaultdict
-        fav_cat_count = defaultdict(int)
-        fav_status_count = defaultdict(int)
-        for fav in favorite_coupons:
-            for cat in fav.get('category', []):
-                fav_cat_count[cat] += 1
-            for st in fav.get('consumer_statuses', []):
-                fav_status_count[st] += 1
-
-        # Step 4: Merge base coupons with favourites (dedup by discount_id)
-        combined_map = {}
-        for c in base_coupons + favorite_coupons:
-            combined_map[c.get('discount_id')] = c
-        combined_coupons = list(combined_map.values())
-
-        # Step 5: Compute weight & sort
-        def _compute_weight(coupon):
-            weight = 0
-            # Category influence
-            for cat in coupon.get('category', []):
-                weight += fav_cat_count.get(cat, 0)
-            # Consumer status influence
-            for st in coupon.get('consumer_statuses', []):
-                weight += fav_status_count.get(st, 0)
-            # Direct favourite boost
-            if coupon.get('discount_id') in favorite_ids:
-                weight += 1000
-            return weight
-        combined_coupons.sort(key=_compute_weight, reverse=True)
-        # NEW: Limit to maximum 10 coupons for display
-        combined_coupons = combined_coupons[:10]
+        combined_coupons = Coupon.get_personalized_feed(
+            statuses=filters.get('statuses'),
+            interests=filters.get('interests'),
+            favorite_ids=user.get('favorites', []),
+            projection=coupon_cards.DETAIL.projection
+        )
 
     except Exception as e:
         logger.error(f"Error getting filtered coupons: {str(e)}")
         combined_coupons = []
 
-    # Format coupons for display (UPDATED to iterate combined_coupons)
-    formatted_coupons = []
-    for coupon in combined_coupons:
-        try:
-            # Format the amount based on discount_type
-            if coupon.get('discount_type') == 'percentage':
-                amount = f"{coupon.get('price', 0)}%"
-            else:
-                amount = f"${coupon.get('price', 0)}"
-            
-            # Get store name from club_name array
-            club_names = coupon.get('club_name', [])
-            store_name = club_names[0] if club_names else "Unknown Store"
-            
-            formatted_coupon = {
-                'store_name': store_name,
-                'store_logo': coupon.get('image_link', ''),
-                'code': coupon.get('coupon_code', ''),
-                'amount': amount,
-                'name': coupon.get('title', 'Special Offer'),
-                'description': coupon.get('description', ''),
-                'date_expires': coupon.get('valid_until', ''),
-                'store_url': coupon.get('discount_link', ''),
-                'discount_link': coupon.get('discount_link', ''),
-                'provider_link': coupon.get('provider_link', ''),
-                'minimum_amount': 0,  # Default value
-                'discount_id': coupon.get('discount_id', ''),
-                'terms_and_conditions': coupon.get('terms_and_conditions', ''),
-                'usage_limit': coupon.get('usage_limit', None),
-                'price': coupon.get('price', 0),  # Ensure price is passed
-                'discount_type': coupon.get('discount_type', ''),  # Ensure discount_type is passed
-            }
-            formatted_coupons.append(formatted_coupon)
-        except Exception as e:
-            logger.error(f"Error formatting coupon: {str(e)}")
-            continue
+    formatted_coupons = coupon_cards.DETAIL.template_cards(combined_coupons, set(user.get('favorites', [])))
 
     context = {
         'user': {
@@ -282,8 +218,8 @@ def mfa_verification(request):
     if not user_id:
         return redirect('login')
 
-    # Get user from MongoDB to verify admin status
-    user = User.find_one({'_id': ObjectId(user_id)})
+    # Get user to verify admin status
+    user = request.intellishop_user
     if not user:
         return redirect('login')
 
@@ -381,29 +317,25 @@ def aliexpress_coupons(request):
     
     return render(request, 'intellishop/coupon_for_aliexpress.html', {'error': 'Coupon not found'})
 
-def get_club_names(request):
-    """Get all unique club names from the database for the Stores dropdown"""
+@catalog_conditional()
+async def get_club_names(request):
+    """Get the clubs with live coupons for the Stores dropdown (from the club directory)"""
     try:
-        # Get all unique club names from the coupons collection
-        collection = Coupon.get_collection()
-        if collection is None:
-            return JsonResponse({'clubs': []})
-        
-        # Use aggregation to get unique club names
-        pipeline = [
-            {'$unwind': '$club_name'},  # Unwind the array
-            {'$group': {'_id': '$club_name'}},  # Group by club name
-            {'$sort': {'_id': 1}}  # Sort alphabetically
-        ]
-        
-        unique_clubs = list(collection.aggregate(pipeline))
-        clubs = [club['_id'] for club in unique_clubs if club['_id']]
-        
-        return JsonResponse({'clubs': clubs})
+        clubs = await Club.adirectory()
+        
+        return JsonResponse({
+            'clubs': [club['name'] for club in clubs],
+            'directory': [
+                {'name': club['name'], 'slug': club['_id'], 'coupon_count': club['coupon_count'], 'logo': club.get('logo')}
+                for club in clubs
+            ]
+        })
     except Exception as e:
         logger.error(f"Error getting club names: {str(e)}")
-        return JsonResponse({'clubs': []})
+        # Not 200, so the empty list is not cached under the catalog ETag
+        return JsonResponse({'clubs': []}, status=503)
 
+@catalog_conditional(per_user=True)
 def coupon_detail(request, club_name):
     """Display coupons for a specific club/provider"""
     try:
@@ -412,47 +344,23 @@ def coupon_detail(request, club_name):
         if not user_id:
             return redirect('login')
         
-        # Get user from MongoDB
-        user = User.find_one({'_id': ObjectId(user_id)})
+        # Cached user document (intellishop.middleware.UserMiddleware)
+        user = request.intellishop_user
         if not user:
             return redirect('login')
         
-        # Get coupons for this specific club - search within the club_name array
-        club_coupons_raw = Coupon.find({'club_name': {'$in': [club_name]}})
-        
-        # Convert ObjectId to string for JSON serialization
-        club_coupons = []
-        for coupon in club_coupons_raw:
-            if '_id' in coupon:
-                coupon['_id'] = str(coupon['_id'])
-            if coupon.get('discount_type') == 'percentage':
-                amount = f"{coupon.get('price', 0)}%"
-            else:
-                amount = f"${coupon.get('price', 0)}"
-            club_names = coupon.get('club_name', [])
-            store_name = club_names[0] if club_names else "Unknown Store"
-            formatted_coupon = {
-                'store_name': store_name,
-                'store_logo': coupon.get('image_link', ''),
-                'code': coupon.get('coupon_code', ''),
-                'amount': amount,
-                'name': coupon.get('title', 'Special Offer'),
-                'description': coupon.get('description', ''),
-                'date_expires': coupon.get('valid_until', ''),
-                'store_url': coupon.get('discount_link', ''),
-                'discount_link': coupon.get('discount_link', ''),
-                'provider_link': coupon.get('provider_link', ''),
-                'minimum_amount': 0,
-                'discount_id': coupon.get('discount_id', ''),
-                'terms_and_conditions': coupon.get('terms_and_conditions', ''),
-                'usage_limit': coupon.get('usage_limit', None),
-                'price': coupon.get('price', 0),
-                'discount_type': coupon.get('discount_type', ''),
-            }
-            club_coupons.append(formatted_coupon)
+        # Resolve the slug (or name) in the club directory, then read the club's
+        # coupons by every spelling of its name through the club_name index
+        club = Club.lookup(club_name)
+        names = club['names'] if club else [club_name]
+        club_coupons_raw = Coupon.find(
+            Coupon.active_query({'club_name': {'$in': names}}),
+            projection=coupon_cards.DETAIL.projection
+        )
+        club_coupons = coupon_cards.DETAIL.template_cards(club_coupons_raw, set(user.get('favorites', [])))
         
         # Format club name for display (capitalize first letter)
-        display_name = club_name.title()
+        display_name = (club['name'] if club else club_name).title()
         
         context = {
             'user': user,
@@ -470,9 +378,10 @@ def coupon_detail(request, club_name):
             'club_coupons': [],
             'coupon_count': 0,
             'error': 'Error loading coupons'
-        })
+        }, status=503)
 
 # FILTER PAGE
+@catalog_conditional(per_user=True)
 def filter_search(request):
     # Check if the user is logged in using custom session variable
     if not request.session.get('user_id'):
@@ -485,6 +394,8 @@ def filter_search(request):
         'min_price': int(stats['price_range']['min']),
         'max_price': int(stats['price_range']['max']),
         'percentage_counts': stats['percentage_counts'],
+        'category_counts': stats['category_counts'],
+        'status_counts': stats['status_counts'],
     }
     
     return render(request, 'intellishop/filter_search.html', context)
@@ -496,7 +407,7 @@ def profile_view(request):
     if not user_id:
         return redirect('login')
     
-    user = User.find_one({'_id': ObjectId(user_id)})
+    user = request.intellishop_user
     if not user:
         return redirect('login')
 
@@ -576,39 +487,14 @@ def favorites_view(request):
     user_id = request.session.get('user_id')
     if not user_id:
         return redirect('login')
-    user = User.find_one({'_id': ObjectId(user_id)})
+    user = request.intellishop_user
     if not user:
         return redirect('login')
     favorite_ids = user.get('favorites', [])
     favorite_coupons = []
     if favorite_ids:
-        raw_coupons = Coupon.find({'discount_id': {'$in': favorite_ids}})
-        for coupon in raw_coupons:
-            if coupon.get('discount_type') == 'percentage':
-                amount = f"{coupon.get('price', 0)}%"
-            else:
-                amount = f"${coupon.get('price', 0)}"
-            club_names = coupon.get('club_name', [])
-            store_name = club_names[0] if club_names else "Unknown Store"
-            formatted_coupon = {
-                'store_name': store_name,
-                'store_logo': coupon.get('image_link', ''),
-                'code': coupon.get('coupon_code', ''),
-                'amount': amount,
-                'name': coupon.get('title', 'Special Offer'),
-                'description': coupon.get('description', ''),
-                'date_expires': coupon.get('valid_until', ''),
-                'store_url': coupon.get('discount_link', ''),
-                'discount_link': coupon.get('discount_link', ''),
-                'provider_link': coupon.get('provider_link', ''),
-                'minimum_amount': 0,
-                'discount_id': coupon.get('discount_id', ''),
-                'terms_and_conditions': coupon.get('terms_and_conditions', ''),
-                'usage_limit': coupon.get('usage_limit', None),
-                'price': coupon.get('price', 0),
-                'discount_type': coupon.get('discount_type', ''),
-            }
-            favorite_coupons.append(formatted_coupon)
+        raw_coupons = Coupon.find_by_discount_ids(favorite_ids, projection=coupon_cards.DETAIL.projection)
+        favorite_coupons = [coupon_cards.DETAIL.template_card(coupon, True) for coupon in raw_coupons]
     context = {
         'user': user,
         'favorite_coupons': favorite_coupons,
@@ -616,18 +502,159 @@ def favorites_view(request):
     }
     return render(request, 'intellishop/favorites.html', context)
 
+def _parse_page_params(params):
+    """
+    Read the optional paging options of the discount list endpoints
+    
+    Args:
+        params (dict): Request JSON body or query string
+        
+    Returns:
+        tuple: (limit, after, stream) - limit defaults to DEFAULT_PAGE_SIZE
+        
+    Raises:
+        ValueError: If limit or the cursor is malformed
+    """
+    limit = params.get('limit')
+    after = params.get('after') or None
+    stream = str(params.get('stream', '')).lower() in ('1', 'true', 'yes')
+    
+    if limit not in (None, ''):
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError('limit must be a positive integer')
+        limit = min(limit, PAGINATION_CONFIG['MAX_PAGE_SIZE'])
+    else:
+        limit = PAGINATION_CONFIG['DEFAULT_PAGE_SIZE']
+    
+    if after is not None:
+        if not ObjectId.is_valid(str(after)):
+            raise ValueError('Invalid cursor')
+        after = ObjectId(str(after))
+    
+    return limit, after, stream
+
+def _session_favorites(request):
+    """
+    Favorite discount IDs of the logged-in user, read once per request
+    
+    Returns:
+        set: Favorite discount IDs, or None for anonymous users
+    """
+    try:
+        user = request.intellishop_user
+        return set(user.get('favorites', [])) if user else None
+    except Exception as e:
+        logger.error(f"Error loading favorites: {str(e)}")
+        return None
+
+async def _asession_favorites(request):
+    """Async variant of _session_favorites"""
+    try:
+        user = await request.aintellishop_user()
+        return set(user.get('favorites', [])) if user else None
+    except Exception as e:
+        logger.error(f"Error loading favorites: {str(e)}")
+        return None
+
+def _stream_discounts(query, favorites=None, ids=None):
+    """Stream every matching discount as newline-delimited JSON, straight from the cursor"""
+    def _lines():
+        if query is None:
+            return
+        documents = Coupon.iter_find(
+            query,
+            projection=coupon_cards.SUMMARY.projection,
+            batch_size=PAGINATION_CONFIG['STREAM_BATCH_SIZE'],
+            ids=ids
+        )
+        for document in documents:
+            yield fast_dumps(coupon_cards.SUMMARY.serialize(document, favorites)) + b'\n'
+    return StreamingHttpResponse(_lines(), content_type='application/x-ndjson')
+
+def _astream_discounts(query, favorites=None, ids=None):
+    """Async variant of _stream_discounts (an async iterator, streamed by ASGI servers)"""
+    async def _lines():
+        if query is None:
+            return
+        documents = Coupon.aiter_find(
+            query,
+            projection=coupon_cards.SUMMARY.projection,
+            batch_size=PAGINATION_CONFIG['STREAM_BATCH_SIZE'],
+            ids=ids
+        )
+        async for document in documents:
+            yield fast_dumps(coupon_cards.SUMMARY.serialize(document, favorites)) + b'\n'
+    return StreamingHttpResponse(_lines(), content_type='application/x-ndjson')
+
+def _discounts_response(query, page, response_data, favorites=None, ids=None):
+    """
+    Build the JSON response of a discount list endpoint
+    
+    Args:
+        query (dict): MongoDB query, or None when nothing can match
+        page (tuple): (limit, after, stream) from _parse_page_params
+        response_data (dict): Extra response keys (applied filters, search type...)
+        favorites (set): User's favorite discount IDs, embedded as is_favorite
+        ids (list): Sorted text search matches from Coupon.build_filtered_search
+        
+    Returns:
+        HttpResponse: One keyset page as FastJsonResponse, or a streamed NDJSON response
+    """
+    limit, after, stream = page
+    if stream:
+        return _stream_discounts(query, favorites, ids)
+    
+    if query is None:
+        return _discounts_json([], 0, None, response_data, favorites)
+    
+    discounts, next_after = Coupon.find_page(query, limit=limit, after=after, projection=coupon_cards.SUMMARY.projection, ids=ids)
+    next_cursor = str(next_after) if next_after is not None else None
+    # Full count only on the first page; later pages just follow next_cursor
+    total_count = Coupon.count(query, ids) if after is None else None
+    
+    return _discounts_json(discounts, total_count, next_cursor, response_data, favorites)
+
+async def _adiscounts_response(query, page, response_data, favorites=None, ids=None):
+    """Async variant of _discounts_response"""
+    limit, after, stream = page
+    if stream:
+        return _astream_discounts(query, favorites, ids)
+    
+    if query is None:
+        return _discounts_json([], 0, None, response_data, favorites)
+    
+    discounts, next_after = await Coupon.afind_page(query, limit=limit, after=after, projection=coupon_cards.SUMMARY.projection, ids=ids)
+    next_cursor = str(next_after) if next_after is not None else None
+    total_count = await Coupon.acount(query, ids) if after is None else None
+    
+    return _discounts_json(discounts, total_count, next_cursor, response_data, favorites)
+
+def _discounts_json(discounts, total_count, next_cursor, response_data, favorites):
+    data = {
+        'discounts': coupon_cards.SUMMARY.serialize_many(discounts, favorites),
+        'total_count': total_count,
+        'next_cursor': next_cursor
+    }
+    data.update(response_data)
+    return FastJsonResponse(data)
+
 @csrf_exempt
+@catalog_conditional(per_user=True)
 def show_all_discounts(request):
-    # Fetch all coupons from MongoDB
-    discounts = Coupon.get_all()
-    # Convert ObjectId to string for JSON serialization
-    for discount in discounts:
-        if '_id' in discount:
-            discount['_id'] = str(discount['_id'])
-    return JsonResponse({'discounts': discounts})
+    """
+    Return active discounts one keyset page at a time. Optional query parameters:
+    ?limit=50 (default DEFAULT_PAGE_SIZE), ?after=<next_cursor> for the next page,
+    ?stream=1 for NDJSON of every result
+    """
+    try:
+        page = _parse_page_params(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return _discounts_response(Coupon.active_query(), page, {}, favorites=_session_favorites(request))
 
 @csrf_exempt
-def filtered_discounts(request):
+async def filtered_discounts(request):
     """
     Get filtered discounts based on applied criteria with three search scenarios:
     1. Text-only: Find discounts where each word appears in text fields
@@ -647,59 +674,70 @@ def filtered_discounts(request):
             "enabled": true,
             "max_value": 50,
             "bucket": "between_30_40"
-        }
+        },
+        "limit": 50,                            # Optional - page size (default 24)
+        "after": "<next_cursor>",               # Optional - resume after this page
+        "stream": false                         # Optional - NDJSON stream of all results
     }
     """
     if request.method != 'POST':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
     
     try:
-        filters = json.loads(request.body)
-        
-        # Validate filters
-        validated_filters = _validate_filters(filters)
-        
-        # Determine search type for logging/debugging
-        has_text = bool(validated_filters.get('text_search'))
-        has_parameters = bool(
-            validated_filters.get('statuses') or 
-            validated_filters.get('interests') or 
-            validated_filters.get('price_range') or 
-            validated_filters.get('percentage_range')
-        )
-        
-        if has_text and has_parameters:
-            search_type = "Combined Search"
-        elif has_text and not has_parameters:
-            search_type = "Text-Only Search"
-        elif not has_text and has_parameters:
-            search_type = "Parameters-Only Search"
-        else:
-            search_type = "Show All"
-        
-        logger.info(f"Executing {search_type} with filters: {validated_filters}")
+        page, validated_filters, search_type = _prepare_filtered_search(request.body)
         
-        # Get filtered coupons using the new logic
-        discounts = Coupon.get_filtered_coupons(validated_filters)
+        query, ids = await Coupon.abuild_filtered_search(validated_filters)
         
-        # Convert ObjectId to string for JSON serialization
-        for discount in discounts:
-            if '_id' in discount:
-                discount['_id'] = str(discount['_id'])
-        
-        return JsonResponse({
-            'discounts': discounts,
-            'total_count': len(discounts),
+        return await _adiscounts_response(query, page, {
             'applied_filters': validated_filters,
             'search_type': search_type
-        })
+        }, favorites=await _asession_favorites(request), ids=ids)
         
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except Exception as e:
         logger.error(f"Error in filtered_discounts: {str(e)}")
         return JsonResponse({'error': 'Internal server error'}, status=500)
 
+def _prepare_filtered_search(body):
+    """
+    Parse and validate a filtered_discounts request body
+    
+    Returns:
+        tuple: (page, validated_filters, search_type)
+        
+    Raises:
+        json.JSONDecodeError, ValueError: On malformed input
+    """
+    filters = json.loads(body)
+    page = _parse_page_params(filters)
+    
+    # Validate filters
+    validated_filters = _validate_filters(filters)
+    
+    # Determine search type for logging/debugging
+    has_text = bool(validated_filters.get('text_search'))
+    has_parameters = bool(
+        validated_filters.get('statuses') or 
+        validated_filters.get('interests') or 
+        validated_filters.get('price_range') or 
+        validated_filters.get('percentage_range')
+    )
+    
+    if has_text and has_parameters:
+        search_type = "Combined Search"
+    elif has_text and not has_parameters:
+        search_type = "Text-Only Search"
+    elif not has_text and has_parameters:
+        search_type = "Parameters-Only Search"
+    else:
+        search_type = "Show All"
+    
+    logger.info(f"Executing {search_type} with filters: {validated_filters}")
+    return page, validated_filters, search_type
+
 def _validate_filters(filters):
     """
     Validate and sanitize filter parameters
@@ -776,13 +814,16 @@ def _validate_filters(filters):
 
 # Add new view for text-only search (optional)
 @csrf_exempt
-def search_discounts_by_text(request):
+async def search_discounts_by_text(request):
     """
     Search discounts by text only (for future use)
     
     Expected JSON payload:
     {
-        "search_text": "electronics discount"
+        "search_text": "electronics discount",
+        "limit": 50,                # Optional - page size
+        "after": "<next_cursor>",   # Optional - resume after this page
+        "stream": false             # Optional - NDJSON stream of all results
     }
     """
     if request.method != 'POST':
@@ -795,26 +836,36 @@ def search_discounts_by_text(request):
         if not search_text:
             return JsonResponse({'error': 'Search text is required'}, status=400)
         
-        # Use the new search method
-        discounts = Coupon.search_coupons_by_text(search_text)
-        
-        # Convert ObjectId to string for JSON serialization
-        for discount in discounts:
-            if '_id' in discount:
-                discount['_id'] = str(discount['_id'])
+        page = _parse_page_params(data)
+        query, ids = await Coupon.abuild_filtered_search({'text_search': search_text})
         
-        return JsonResponse({
-            'discounts': discounts,
-            'total_count': len(discounts),
+        return await _adiscounts_response(query, page, {
             'search_text': search_text
-        })
+        }, favorites=await _asession_favorites(request), ids=ids)
         
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except Exception as e:
         logger.error(f"Error in search_discounts_by_text: {str(e)}")
         return JsonResponse({'error': 'Internal server error'}, status=500)
 
+def discount_detail_view(request, discount_id):
+    """
+    Return the full (detail) card of one discount, e.g. for "show more" on a
+    summary card whose texts were truncated
+    """
+    try:
+        discount = Coupon.find_one({'discount_id': discount_id}, coupon_cards.DETAIL.projection)
+    except Exception as e:
+        logger.error(f"Error in discount_detail_view: {str(e)}")
+        return JsonResponse({'error': 'Internal server error'}, status=500)
+    
+    if not discount:
+        return JsonResponse({'error': 'Discount not found'}, status=404)
+    return FastJsonResponse({'discount': coupon_cards.DETAIL.serialize(discount, _session_favorites(request))})
+
 @csrf_exempt
 def add_favorite_view(request):
     """Add a discount to user's favorites"""
@@ -906,15 +957,15 @@ def remove_favorite_view(request):
         return JsonResponse({'error': 'Internal server error'}, status=500)
 
 @csrf_exempt
-def check_favorite_view(request, discount_id):
+async def check_favorite_view(request, discount_id):
     """Check if a discount is in user's favorites"""
     try:
         # Check if user is logged in
-        user_id = request.session.get('user_id')
+        user_id = await request.session.aget('user_id')
         if not user_id:
             return JsonResponse({'is_favorite': False})
         
-        is_favorite = User.is_favorite(user_id, discount_id)
+        is_favorite = await User.ais_favorite(user_id, discount_id)
         return JsonResponse({'is_favorite': is_favorite})
         
     except Exception as e:
@@ -922,7 +973,45 @@ def check_favorite_view(request, discount_id):
         return JsonResponse({'is_favorite': False})
 
 @csrf_exempt
-def ai_filter_helper(request):
+def check_favorites_view(request):
+    """
+    Check many discounts against the user's favorites in one request
+    
+    Expected JSON payload:
+    {
+        "discount_ids": ["123", "456"]
+    }
+    
+    Returns:
+    {
+        "favorites": {"123": true, "456": false}
+    }
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    
+    try:
+        data = json.loads(request.body)
+        discount_ids = data.get('discount_ids', [])
+        if not isinstance(discount_ids, list):
+            return JsonResponse({'error': 'discount_ids must be a list'}, status=400)
+        discount_ids = [str(discount_id) for discount_id in discount_ids if discount_id]
+        
+        # Anonymous visitors keep favorites in localStorage only
+        user_id = request.session.get('user_id')
+        if not user_id:
+            return JsonResponse({'error': 'User not authenticated', 'status': 'auth_required'}, status=401)
+        
+        return JsonResponse({'favorites': User.get_favorite_statuses(user_id, discount_ids)})
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+    except Exception as e:
+        logger.error(f"Error in check_favorites_view: {str(e)}")
+        return JsonResponse({'error': 'Internal server error'}, status=500)
+
+@csrf_exempt
+async def ai_filter_helper(request):
     """
     AI Filter Helper endpoint that uses Groq API to extract filter parameters from user text.
     
@@ -952,12 +1041,12 @@ def ai_filter_helper(request):
             return JsonResponse({'error': 'User text is required'}, status=400)
         
         # Import the AI filter helper utility
-        from intellishop.utils.groq_helper import extract_filters_from_text
+        from intellishop.utils.groq_helper import aextract_filters_from_text
         
         logger.info(f"AI Filter Helper request received for text: {user_text[:100]}...")
         
-        # Extract filters using Groq API
-        extracted_filters = extract_filters_from_text(user_text)
+        # Extract filters using Groq API (AsyncGroq - the worker keeps serving meanwhile)
+        extracted_filters = await aextract_filters_from_text(user_text)
         
         logger.info(f"AI Filter Helper extracted filters: {extracted_filters}")
         
@@ -1006,3 +1095,32 @@ def debug_favorites_page(request):
     """Debug page for testing favorites functionality"""
     return render(request, 'intellishop/debug_favorites.html')
 
+
+def db_profile_view(request):
+    """
+    Admin-only MongoDB query profile: load per route, per query shape and the
+    most recent commands (see intellishop/utils/db_profiler.py)
+    
+    Query parameters:
+        ?recent=100   Number of recent commands to include
+    POST clears the collected profile.
+    """
+    user_id = request.session.get('user_id')
+    if not user_id or not request.session.get('mfa_verified', False):
+        return JsonResponse({'error': 'Admin access required'}, status=403)
+    user = request.intellishop_user
+    if not user or not (user.get('is_admin', False) or user.get('username') == 'admin'):
+        return JsonResponse({'error': 'Admin access required'}, status=403)
+    
+    if request.method == 'POST':
+        query_profiler.reset()
+        return JsonResponse({'status': 'success', 'message': 'Query profile cleared'})
+    
+    try:
+        recent = max(0, int(request.GET.get('recent', 100)))
+    except ValueError:
+        return JsonResponse({'error': 'recent must be an integer'}, status=400)
+    
+    data = query_profiler.snapshot(recent=recent)
+    data['config'] = QUERY_PROFILING_CONFIG
+    return JsonResponse(data)
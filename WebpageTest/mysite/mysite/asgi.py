@@ -8,9 +8,25 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
+import logging
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
 
 application = get_asgi_application()
+
+# The server's event loop lives as long as the worker: give the async data
+# layer its own AsyncMongoClient instead of threads over the sync client
+from intellishop.utils.mongodb_utils import enable_async_client
+enable_async_client()
+
+# Initialize database in production environment (e.g. uvicorn mysite.asgi:application),
+# as wsgi.py does - the async JSON views run here without a thread per request
+logger = logging.getLogger(__name__)
+try:
+    from intellishop.utils.initialize_db import initialize_database
+    logger.info("Initializing database on ASGI startup...")
+    initialize_database()
+except Exception as e:
+    logger.error(f"Error initializing database in production: {str(e)}")
@@ -159,7 +159,7 @@ DATABASES = {
 }
 
 # Session configuration
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Store sessions in the database
+SESSION_ENGINE = 'intellishop.session_backend'  # MongoDB sessions with an in-process LRU (no SQLite write per request)
 SESSION_COOKIE_AGE = 86400  # 1 day in seconds
 SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
 
@@ -175,11 +175,13 @@ DATABASES = {
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',  # This must be near the top
+    'intellishop.middleware.UserMiddleware',  # request.intellishop_user (cached user document)
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'intellishop.middleware.QueryProfilingMiddleware',  # Tags MongoDB commands with the view (db_profiler)
 ]
 
 # Make sure sessions app is installed
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+Tests for the Groq response cache (intellishop/utils/llm_cache.py) and its use
+by the AI filter helper. Runs offline: GROQ_FAKE=1 selects the fake Groq client.
+"""
+import os
+import sys
+
+import pytest
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from intellishop.models.constants import LLM_CACHE_CONFIG
+from intellishop.utils import fake_groq, groq_helper, llm_cache
+from intellishop.utils.fake_groq import FakeGroq
+from intellishop.utils.llm_cache import LLMResponseCache, make_key, normalize_input
+
+
+class Clock:
+    """Stand-in for time.time() in llm_cache, so LRU order and TTL are deterministic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, 'time', clock)
+    return clock
+
+
+def make_cache(tmp_path, **overrides):
+    return LLMResponseCache(path=str(tmp_path / 'llm_cache.sqlite3'), config={**LLM_CACHE_CONFIG, **overrides})
+
+
+@pytest.fixture
+def filter_cache(tmp_path, monkeypatch):
+    """Fresh cache for the filter helper; every Groq client it creates is kept in clients"""
+    monkeypatch.setenv('GROQ_FAKE', '1')
+    cache = make_cache(tmp_path)
+    monkeypatch.setattr(groq_helper, 'get_llm_cache', lambda: cache)
+    clients = []
+
+    def create_groq_client():
+        client = fake_groq.create_groq_client()
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(groq_helper, 'create_groq_client', create_groq_client)
+    cache.clients = clients
+    return cache
+
+
+def api_calls(cache):
+    return sum(len(client.calls) for client in cache.clients)
+
+
+def test_repeated_filter_query_is_a_cache_hit(filter_cache):
+    first = groq_helper.extract_filters_from_text('Student discounts on electronics')
+    assert isinstance(filter_cache.clients[0], FakeGroq)
+    assert api_calls(filter_cache) == 1
+    assert filter_cache.stats()['misses'] == 1
+
+    # Case and whitespace do not change the key
+    second = groq_helper.extract_filters_from_text('  student   DISCOUNTS on electronics ')
+    assert second == first
+    assert api_calls(filter_cache) == 1
+    assert filter_cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'entries': 1}
+
+
+def test_response_failing_validation_is_not_cached(filter_cache, monkeypatch):
+    # A JSON number parses but is rejected by _finalize_filters
+    monkeypatch.setattr(groq_helper, 'create_groq_client', lambda: FakeGroq(responder=lambda model, messages: '5'))
+    assert groq_helper.extract_filters_from_text('cheap sushi', max_retries=0) == {}
+    assert filter_cache.stats()['entries'] == 0
+
+
+def test_normalize_input():
+    assert normalize_input('  Cheap\tSUSHI \n deals ') == 'cheap sushi deals'
+    assert normalize_input({'b': 1, 'a': 'x'}) == normalize_input({'a': 'x', 'b': 1})
+    assert make_key('prompt', 'model', 'Cheap  Sushi') == make_key('prompt', 'model', 'cheap sushi')
+    assert make_key('prompt', 'model', 'cheap sushi') != make_key('prompt', 'other-model', 'cheap sushi')
+    assert make_key('prompt', 'model', 'cheap sushi') != make_key('other prompt', 'model', 'cheap sushi')
+
+
+def test_hit_and_miss_counters(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    assert cache.get('key') is None
+    cache.set('key', '{"a": 1}')
+    assert cache.get('key') == '{"a": 1}'
+    assert cache.get('key') == '{"a": 1}'
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'hit_rate': 0.667, 'entries': 1}
+
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'entries': 0}
+
+
+def test_evict_keeps_most_recently_used(tmp_path, clock):
+    cache = make_cache(tmp_path, MAX_ENTRIES=2, EVICT_EVERY=1)
+    cache.set('a', 'A')
+    cache.set('b', 'B')
+    assert cache.get('a') == 'A'  # b is now the least recently used
+    cache.set('c', 'C')
+
+    assert cache.stats()['entries'] == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+    assert cache.get('c') == 'C'
+
+
+def test_evict_drops_expired_entries(tmp_path, clock):
+    cache = make_cache(tmp_path, TTL_SECONDS=10, EVICT_EVERY=1)
+    cache.set('old', 'OLD')
+    clock.now += 20
+    cache.set('new', 'NEW')
+
+    assert cache.stats()['entries'] == 1
+    assert cache.get('new') == 'NEW'
+
+
+def test_expired_entry_is_a_miss(tmp_path, clock):
+    cache = make_cache(tmp_path, TTL_SECONDS=10)
+    cache.set('key', 'VALUE')
+    clock.now += 20
+
+    assert cache.get('key') is None
+    assert cache.stats() == {'hits': 0, 'misses': 1, 'hit_rate': 0.0, 'entries': 0}
@@ -320,9 +320,6 @@ def import_csv_file(file_path):
 def verify_database_content():
     """Verify that the database was updated successfully"""
     try:
-        # Count documents in collections
-        current_date = datetime.now().isoformat()
-        
         logger.info("Verifying database content...")
         
         # Check coupon collection
@@ -331,20 +328,9 @@ def verify_database_content():
         
         coupons_collection = get_collection_handle('coupons')
         if coupons_collection is not None:
-            # Count active coupons
-            active_coupons = coupons_collection.count_documents({
-                '$or': [
-                    {'valid_until': {'$exists': False}},
-                    {'valid_until': None},
-                    {'valid_until': ''},
-                    {'valid_until': {'$gt': current_date}}
-                ]
-            })
-            
-            # Count expired coupons
-            expired_coupons = coupons_collection.count_documents({
-                'valid_until': {'$exists': True, '$ne': None, '$ne': '', '$lte': current_date}
-            })
+            # Count active / expired coupons by the parsed expires_at
+            active_coupons = coupons_collection.count_documents(Coupon.unexpired_query())
+            expired_coupons = coupons_collection.count_documents(Coupon.expired_query())
         else:
             logger.error("Could not get coupons collection handle")
             return False
@@ -25,3 +25,46 @@ CATEGORIES_HOT = [
     {"name": "Insurance", "url": f"{BASE_URL_HOT}/קטגוריה/818/ביטוח"},
     {"name": "Finance and Banking", "url": f"{BASE_URL_HOT}/קטגוריה/777/פיננסים_ובנקאות"},
 ]
+
+# Parallel scraping (main.py): one Chrome driver per worker thread (started
+# lazily in http fetch mode, only for pages that need JavaScript)
+WORKERS = 4
+# Max concurrent page loads per site, so workers never hammer a single host
+SITE_CONCURRENCY = {
+    "hot": 2,
+    "adif": 2,
+}
+
+# Page fetching: "http" reads the server-rendered HTML with a pooled HTTP client
+# and only starts Chrome for pages that need JavaScript (e.g. HOT's provider
+# link button); "browser" loads every page in Chrome as before
+FETCH_MODE = "http"
+HTTP_TIMEOUT = 15  # seconds per request
+HTTP_RETRIES = 2  # retries on connection errors and 429/5xx
+HTTP_POOL_SIZE = 4  # hosts kept alive per worker thread (site, CDN, provider redirects)
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+# Incremental re-crawl (utils/crawl_state.py): only new or changed discounts are
+# written to the output file; discount_id stays fixed per detail URL
+INCREMENTAL_CRAWL = True  # False re-emits every discount (ids stay stable)
+CRAWL_STATE_FILE = "output/crawl_state.json"  # relative to the scraper directory
+RECRAWL_AFTER = 60 * 60  # seconds before a discount page is requested again
+CRAWL_STATE_RETENTION = 30 * 24 * 60 * 60  # forget URLs not listed for this long
+# Prefix of the stable ids, so they never collide with the running ids
+# (DISCOUNT_ID_COUNTER) of earlier, non-incremental output files
+CRAWL_ID_PREFIX = "c"
+
+# Pacing (utils/pacing.py, utils/waits.py): requests to a site start
+# POLITE_LOAD_FACTOR x its average load time apart, within these bounds
+POLITE_MIN_DELAY = 0.5  # seconds
+POLITE_MAX_DELAY = 10  # seconds
+POLITE_LOAD_FACTOR = 1.0
+POLITE_JITTER = 0.2  # +-20% random spread on each delay
+BACKOFF_BASE = 2  # extra seconds after a failed request, doubled per consecutive failure
+BACKOFF_MAX = 60  # cap on the extra backoff delay
+READY_TIMEOUT = 10  # max seconds to wait for a page to become ready
+NETWORK_IDLE = 0.5  # seconds without finished requests that count as network idle
+NEW_WINDOW_TIMEOUT = 5  # max seconds to wait for the tab a provider button opens
@@ -1,37 +1,154 @@
 # main.py
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 
-from utils.browser import setup_driver
-from scrapers.hot_scraper import scrape_hot
-from scrapers.adif_scraper import scrape_adif
-from config import SCRAPE_TARGET
+import config
+from utils.browser import DriverPool
+from utils.http_fetch import HttpFetcher
+from utils.crawl_state import CrawlState, UNCHANGED
+from utils.pacing import politeness, wait_stats
+from utils.helpers import get_club_name_from_url
+from scrapers import hot_scraper, adif_scraper
+from config import (
+    SCRAPE_TARGET, WORKERS, FETCH_MODE, SITE_CONCURRENCY, CATEGORIES_HOT, CATEGORIES_ADIF,
+    INCREMENTAL_CRAWL, CRAWL_STATE_FILE
+)
 
-def main():
-    print(f"[*] Scraping from {SCRAPE_TARGET}")
-    driver = setup_driver()
-    #results = scrape_hot(driver)
+# Scrape sources: categories to walk and the module that scrapes them
+SITES = {
+    "hot": (CATEGORIES_HOT, hot_scraper),
+    "adif": (CATEGORIES_ADIF, adif_scraper),
+}
 
-    all_discounts = []
 
-    # Mapping scrape sources to functions
-    SCRAPE_FUNCTIONS = {
-        "hot": scrape_hot,
-        "adif": scrape_adif
-    }
+def scrape_sites(sources, workers=WORKERS, fetch_mode=FETCH_MODE, crawl_state=None,
+                 incremental=INCREMENTAL_CRAWL):
+    """Scrape all categories of the given sources with a pool of workers.
+
+    Category pages and discount detail pages share one work queue per site:
+    every finished category enqueues a detail task per discount link. Tasks
+    are handed to the worker threads (one browser each) only while their site
+    is below its SITE_CONCURRENCY limit, so no worker sits blocked on a busy
+    site while another site has work.
+
+    In "http" fetch mode workers read pages with a pooled HTTP client and
+    only start their browser when a page needs it (see the scrapers'
+    fetch_* functions); in "browser" mode every page is loaded in Chrome.
+
+    With a crawl_state (utils/crawl_state.py) discount_id is the id kept for
+    the discount's URL (new URLs get the next ids, in scrape order). If
+    incremental, discounts whose page was crawled within RECRAWL_AFTER, came
+    back 304 or has unchanged content are left out.
+
+    Returns the (new or changed) discounts in source -> category -> link order.
+    """
+    http_mode = fetch_mode == "http"
+    queues = {source: deque() for source in sources}
+    in_flight = {source: 0 for source in sources}
+    results = {}  # (source index, category index, link index) -> discount
+    skipped = 0  # fresh or unchanged discount pages
+    state = crawl_state if incremental else None
+
+    for s_idx, source in enumerate(sources):
+        categories, scraper = SITES[source]
+        for c_idx, category in enumerate(categories):
+            task = scraper.fetch_discount_links if http_mode else scraper.get_discount_links
+            queues[source].append((task, (category["url"], category["name"]),
+                                   ("category", s_idx, c_idx, category)))
+
+    with DriverPool() as pool, HttpFetcher() as fetcher, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scraper") as executor:
+        pending = {}
+
+        def run(task, args):
+            # The browser is created lazily, so http-mode workers only start one when needed
+            if http_mode:
+                return task(fetcher, pool.get, *args)
+            return task(pool.get(), *args)
+
+        def dispatch():
+            # Round-robin over sites until every worker is busy or no site may take more
+            progress = True
+            while progress and len(pending) < workers:
+                progress = False
+                for source in sources:
+                    if len(pending) >= workers:
+                        break
+                    if queues[source] and in_flight[source] < SITE_CONCURRENCY.get(source, 1):
+                        task, args, meta = queues[source].popleft()
+                        future = executor.submit(run, task, args)
+                        pending[future] = (source, meta)
+                        in_flight[source] += 1
+                        progress = True
+
+        dispatch()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                source, (kind, s_idx, c_idx, payload) = pending.pop(future)
+                in_flight[source] -= 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"[!] {source.upper()} {kind} task failed: {e}")
+                    continue
+
+                if kind == "category":
+                    category = payload
+                    club_name = get_club_name_from_url(category["url"])
+                    scraper = SITES[source][1]
+                    task = scraper.fetch_discount if http_mode else scraper.extract_discount
+                    for l_idx, link in enumerate(result):
+                        if state is not None and state.is_fresh(link):
+                            skipped += 1
+                            continue
+                        args = (link, category["name"], club_name)
+                        if http_mode:
+                            args += (state,)
+                        queues[source].append((task, args, ("detail", s_idx, c_idx, l_idx)))
+                elif result == UNCHANGED or (result and state is not None and state.unchanged(result["discount_link"], result)):
+                    skipped += 1
+                elif result:
+                    results[(s_idx, c_idx, payload)] = result
+            dispatch()
+
+    discounts = []
+    emitted_links = set()
+    for key in sorted(results):
+        discount = results[key]
+        if crawl_state is not None:
+            # One record per page, even if several categories list it
+            if discount["discount_link"] in emitted_links:
+                continue
+            emitted_links.add(discount["discount_link"])
+            discount["discount_id"] = crawl_state.record(discount["discount_link"], discount)
+        else:
+            discount["discount_id"] = str(config.DISCOUNT_ID_COUNTER)
+            config.DISCOUNT_ID_COUNTER += 1
+        discounts.append(discount)
+    if incremental and crawl_state is not None:
+        print(f"[*] {len(discounts)} new or changed discount(s), {skipped} unchanged")
+    return discounts
+
+
+def main():
+    print(f"[*] Scraping from {SCRAPE_TARGET} with {WORKERS} worker(s), fetch mode: {FETCH_MODE}")
 
     # Define which sources to scrape
     sources_to_scrape = (
         ["hot", "adif"] if SCRAPE_TARGET == "both" 
-        else [SCRAPE_TARGET] if SCRAPE_TARGET in SCRAPE_FUNCTIONS 
+        else [SCRAPE_TARGET] if SCRAPE_TARGET in SITES 
         else []
     )
 
-    for source in sources_to_scrape:
-        print(f"[*] Scraping {source.upper()}...")
-        all_discounts.extend(SCRAPE_FUNCTIONS[source](driver))
-
-    driver.quit()
+    crawl_state = CrawlState(Path(__file__).resolve().parent / CRAWL_STATE_FILE)
+    if INCREMENTAL_CRAWL and crawl_state.known_pages():
+        print(f"[*] Incremental crawl: {crawl_state.known_pages()} known discount page(s)")
+    all_discounts = scrape_sites(sources_to_scrape, crawl_state=crawl_state)
+    print(f"[*] Time across workers: {wait_stats.report()}")
+    print(politeness.report())
 
     # Determine the central data directory (../mysite/intellishop/data)
     webpage_root = Path(__file__).resolve().parent.parent  # .. / WebpageTest
@@ -50,6 +167,9 @@ def main():
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(all_discounts, f, ensure_ascii=False, indent=2)
 
+    # Only now are the emitted discounts delivered: remember them for the next run
+    crawl_state.save()
+
     print(f"\n[✔] Scraping complete. Results saved to {output_file}")
 
 
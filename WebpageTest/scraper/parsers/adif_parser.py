@@ -0,0 +1,101 @@
+# parsers/adif_parser.py
+from urllib.parse import urljoin
+
+from config import MAX_DISCOUNTS, AMOUNT, LOCATION
+from utils.helpers import (
+    classify_price_type, extract_coupon_code, extract_price_fallback, extract_valid_until
+)
+from utils.html_parse import parse_html, inner_text, text_of, first
+
+CARD_SELECTOR = "div.col-6.col-sm-4.col-md-3.mb-4"
+
+
+def parse_discount_links(html, category_url):
+    """Discount detail links on a category page (server-rendered HTML)"""
+    tree = parse_html(html)
+    discount_links = []
+    for card in tree.cssselect(CARD_SELECTOR)[:MAX_DISCOUNTS]:
+        a_tag = first(card, "a")
+        href = (a_tag.get("href") or "").strip() if a_tag is not None else ""
+        if href:
+            discount_links.append(urljoin(category_url, href))
+    return discount_links
+
+
+def _provider_link(tree, full_link):
+    """First link in the description paragraphs (.desc before .description), else the buy button"""
+    desc_block = first(tree, ".desc")
+    if desc_block is None:
+        desc_block = first(tree, ".description")
+    if desc_block is None:
+        return "N/A"
+
+    for p in desc_block.cssselect("p"):
+        a_tag = first(p, "a")
+        href = (a_tag.get("href") or "").strip() if a_tag is not None else ""
+        if href:
+            return urljoin(full_link, href)
+
+    a_tag = first(tree, ".buy-button a")
+    href = (a_tag.get("href") or "").strip() if a_tag is not None else ""
+    return urljoin(full_link, href) if href else "N/A"
+
+
+def parse_discount(html, full_link, category_name, club_name):
+    """Parse a discount detail page; None when it has no server-rendered title (use the browser)"""
+    tree = parse_html(html)
+
+    # Title (Adif: supports multiple layouts)
+    title_elem = first(tree, ".name-price-coupon .title")
+    if title_elem is None:
+        title_elem = first(tree, ".blockA .title")
+    if title_elem is None:
+        return None
+    title = text_of(title_elem) or "N/A"
+
+    # Image Link
+    img_tag = first(tree, ".watermarked-image img")
+    image_link = urljoin(full_link, img_tag.get("src").strip()) if img_tag is not None and img_tag.get("src") else "N/A"
+
+    # Description
+    desc_wrapper = first(tree, ".description")
+    if desc_wrapper is None:
+        desc_wrapper = first(tree, ".desc")
+    if desc_wrapper is not None:
+        description = "\n".join(text for text in (inner_text(p) for p in desc_wrapper.cssselect("p")) if text) or "N/A"
+    else:
+        description = "N/A"
+
+    # Terms and Conditions
+    terms_parts = [text for text in (inner_text(block) for block in tree.cssselect("div.accordion-tab-content")) if text]
+    terms = "\n\n".join(terms_parts) if terms_parts else "N/A"
+
+    # Price
+    price_elem = first(tree, ".price-num")
+    price = text_of(price_elem) if price_elem is not None else extract_price_fallback(description, terms)
+    price_type = classify_price_type(price)
+
+    combined_text = f"{description}\n{terms}"
+
+    return {
+        "club_name": club_name,
+        "category": category_name,
+        "discount_id": None,  # Assigned by the caller once the scrape order is known
+        "title": title,
+
+        "price": price,
+        "discount_type": price_type,
+
+        "description": description,
+        "terms_and_conditions": terms,
+
+        "discount_link": full_link,
+        "image_link": image_link,
+        "provider_link": _provider_link(tree, full_link),
+
+        "coupon_code": extract_coupon_code(combined_text),
+        "valid_until": extract_valid_until(combined_text),
+
+        "usage_limit": str(AMOUNT),
+        "location": LOCATION
+    }
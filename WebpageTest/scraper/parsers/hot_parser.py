@@ -0,0 +1,118 @@
+# parsers/hot_parser.py
+import re
+from urllib.parse import urljoin
+
+from config import MAX_DISCOUNTS, AMOUNT, LOCATION
+from utils.helpers import classify_price_type, extract_coupon_code, extract_valid_until
+from utils.html_parse import parse_html, inner_text, text_of, first, outer_html
+
+
+def parse_discount_links(html, category_url):
+    """Discount detail links on a category page (server-rendered HTML)"""
+    tree = parse_html(html)
+    container = first(tree, "div.benefits-grid.benefits-grid_promoted")
+    if container is None:
+        return []
+
+    discount_links = []
+    for elem in container.cssselect("a.benefit-wrapper")[:MAX_DISCOUNTS]:
+        href = (elem.get("href") or "").strip()
+        if href:
+            discount_links.append(urljoin(category_url, href))
+    return discount_links
+
+
+def is_phone_button(button_text, button_html, href):
+    """True when the send button dials a phone number instead of linking out"""
+    if "tel:" in button_html.lower():
+        return True
+    if re.search(r"\b0\d{1,2}[-\s]?\d{3}[-\s]?\d{4}\b", button_text):
+        return True
+    if re.search(r"\*?\d{2,6}\*?", button_text):
+        return True
+    if button_text.strip().startswith("*") or button_text.strip().endswith("*"):
+        digits = button_text.strip().replace("*", "")
+        if digits.isdigit():
+            return True
+    if "להזמנה" in button_text or "להזמנות" in button_text:
+        return True
+    return href.lower().startswith("tel:")
+
+
+def parse_discount(html, full_link, category_name, club_name):
+    """Parse a discount detail page.
+
+    Returns (discount, provider_href). discount is None when the page has no
+    server-rendered title (the caller falls back to the browser). When the
+    send button links out, discount["provider_link"] is None and
+    provider_href is the button's href / data-href ("" if it only has a
+    JavaScript handler): the caller resolves it.
+    """
+    tree = parse_html(html)
+
+    title_elem = first(tree, "h1.head-span")
+    if title_elem is None:
+        return None, None
+    title = text_of(title_elem) or "N/A"
+
+    # Image Link
+    img_tag = first(tree, ".gallery-wrapper .selected-image-wrapper img")
+    image_link = urljoin(full_link, img_tag.get("src")) if img_tag is not None and img_tag.get("src") else "N/A"
+
+    # External Link
+    provider_link, provider_href = "N/A", None
+    button = first(tree, ".send-btn")
+    if button is not None:
+        href = button.get("href") or button.get("data-href") or ""
+        button_html = outer_html(button)
+        if is_phone_button(text_of(button), button_html, href):
+            provider_link = "TEL"
+        else:
+            provider_link, provider_href = None, urljoin(full_link, href) if href else ""
+
+    # Price
+    price_elems = tree.xpath("//span[starts-with(@class, 'price-span')]")
+    price = text_of(price_elems[0]) if price_elems else "N/A"
+    price_type = classify_price_type(price)
+
+    # Description
+    description_parts = []
+    for wrapper in tree.cssselect(".extra-info .info-wrapper"):
+        des_title = first(wrapper, ".title")
+        des_body = first(wrapper, ".description")
+        description_parts.append(
+            f"{text_of(des_title) if des_title is not None else 'N/A'}: "
+            f"{inner_text(des_body) if des_body is not None else 'N/A'}"
+        )
+    description = "\n\n".join(description_parts)
+
+    # Terms & Conditions
+    terms_block = first(tree, ".details-wrapper .content")
+    if terms_block is not None:
+        terms = "\n".join(text for text in (inner_text(p) for p in terms_block.cssselect("p")) if text)
+    else:
+        terms = "N/A"
+
+    return {
+        "club_name": club_name,
+        "category": category_name,
+
+        "discount_id": None,  # Assigned by the caller once the scrape order is known
+        "title": title,
+
+        "price": price,
+        "discount_type": price_type,
+
+        "description": description,
+        "terms_and_conditions": terms,
+
+        "discount_link": full_link,
+        "image_link": image_link,
+        "provider_link": provider_link,
+
+        "coupon_code": extract_coupon_code(description + " " + terms),
+        "valid_until": extract_valid_until(description + " " + terms),
+
+        "usage_limit": AMOUNT,
+        "location": LOCATION
+    }, provider_href
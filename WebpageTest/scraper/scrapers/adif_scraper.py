@@ -1,13 +1,12 @@
 # scrapers/adif_scraper.py
-import time
-import random
 import config
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from config import CATEGORIES_ADIF, BASE_URL_ADIF, AMOUNT, LOCATION, MAX_DISCOUNTS
 from utils.helpers import *
+from utils.waits import load_page
+from parsers import adif_parser
+from utils.crawl_state import UNCHANGED
 
 def scrape_adif(driver):
     all_discounts = []
@@ -16,318 +15,364 @@ def scrape_adif(driver):
     for category in CATEGORIES_ADIF:
         discounts = extract_discounts_for_category(driver, category["url"], category["name"])
         all_discounts.extend(discounts)
-        print("[⏳] Waiting before next category...")
-        time.sleep(random.uniform(3, 6))
+        # The next category page waits for Adif's politeness slot (utils/pacing.py)
 
     return all_discounts
 
 def extract_discounts_for_category(driver, category_url, category_name):
-    print(f"----------------------------------")
-    print(f"\n[*] Opening '{category_name}' page...")
     club_name = get_club_name_from_url(category_url)
-    
-    #print(f"[DEBUG] Category URL: {category_url}")
-    #print("[DEBUG] Navigating to category URL")
-    driver.get(category_url)
-
-    #print("[DEBUG] Waiting for discount elements to load...")
-    WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, "div.col-6.col-sm-4.col-md-3.mb-4"))
-    )
-    #print("[DEBUG] Discount elements loaded")
-
-
-
-    # Search for Set of Discounts for chosen category:    
-    try:
-        discount_elements = driver.find_elements(By.CSS_SELECTOR, "div.col-6.col-sm-4.col-md-3.mb-4")[:MAX_DISCOUNTS]
-        print(f"[+] Found {len(discount_elements)} discount(s).")
-    except NoSuchElementException:
-        print("[-] No discount cards found.")
-        return []
-
-    # Saving set of discounts to go through each one:
-    discount_links = []
-    for elem in discount_elements:
-        try:
-            href = elem.find_element(By.TAG_NAME, "a").get_attribute("href")
-            if href and href.strip():
-                discount_links.append(href)
-        except NoSuchElementException:
-            print("[!] Card without link – skipping")
+    discount_links = get_discount_links(driver, category_url, category_name)
 
     # Loop over them and extract info per discount:
     discounts = []
     for i, link in enumerate(discount_links):
         print(f"-------------------")
         print(f"[*] For Discount #{i+1}:")
+        discount = extract_discount(driver, link, category_name, club_name)
+        if discount:
+            discount["discount_id"] = str(config.DISCOUNT_ID_COUNTER)
+            config.DISCOUNT_ID_COUNTER += 1
+            discounts.append(discount)
+    
+    # return total discounts:
+    return discounts
+
+def extract_discount(driver, link, category_name, club_name):
+    """Scrape one discount detail page; returns the discount dict or None"""
+    try:
+
+        # --- Discount Link ---
+        full_link = link if link.startswith("http") else BASE_URL_ADIF + link
+        #print(f"[🔗] Trying to open link: {full_link}")
+
+        try:
+            # Either title layout; the page may also settle without one (handled below)
+            load_page(driver, full_link, ".name-price-coupon .title, .blockA .title")
+            #print("[✓] Page loaded successfully")
+        except Exception as e:
+            print(f"[!] Error loading discount page: {type(e).__name__}: {e}")
+            return None  # Skip this discount
         
-        # try to scrape a discount:
+        # --- Title (Adif: supports multiple layouts) ---
         try:
+            try:
+                title_element = driver.find_element(By.CSS_SELECTOR, ".name-price-coupon .title")
+                #print("[DEBUG] Title found in .name-price-coupon .title")
+            except NoSuchElementException:
+                title_element = driver.find_element(By.CSS_SELECTOR, ".blockA .title")
+                #print("[DEBUG] Title found in .blockA .title")
 
-            # --- Discount Link ---
-            full_link = link if link.startswith("http") else BASE_URL_ADIF + link
-            #print(f"[🔗] Trying to open link: {full_link}")
+            title = title_element.text.strip()
+            print("[+] Title Found")
+        except NoSuchElementException:
+            title = "N/A"
+            print("[-] No Title Element Found in any known structure")
+        except Exception as e:
+            title = "N/A"
+            print(f"[!] Error while extracting title: {type(e).__name__}: {e}")
 
-            try:
-                driver.get(full_link)
-                time.sleep(2.5)  # Allow page and possible popup to load
-                #print("[✓] Page loaded successfully")
-            except Exception as e:
-                print(f"[!] Error loading discount page: {type(e).__name__}: {e}")
-                continue  # Skip this discount
-            
-            # --- Title (Adif: supports multiple layouts) ---
-            try:
-                try:
-                    title_element = driver.find_element(By.CSS_SELECTOR, ".name-price-coupon .title")
-                    #print("[DEBUG] Title found in .name-price-coupon .title")
-                except NoSuchElementException:
-                    title_element = driver.find_element(By.CSS_SELECTOR, ".blockA .title")
-                    #print("[DEBUG] Title found in .blockA .title")
 
-                title = title_element.text.strip()
-                print("[+] Title Found")
-            except NoSuchElementException:
-                title = "N/A"
-                print("[-] No Title Element Found in any known structure")
-            except Exception as e:
-                title = "N/A"
-                print(f"[!] Error while extracting title: {type(e).__name__}: {e}")
+        # Image Link
+        try:
+            img_tag = driver.find_element(By.CSS_SELECTOR, ".watermarked-image img")
+            image_link = img_tag.get_attribute("src").strip()
+            print(f"[+] Image Link Found")
+        except NoSuchElementException:
+            image_link = "N/A"
+            print("[-] No Image Link Found")
+        except Exception as e:
+            image_link = "N/A"
+            print(f"[!] Error while extracting image link: {type(e).__name__}: {e}")
 
+        # Description
+        try:
+            description_parts = []
 
-            # Image Link
+            # ננסה קודם את description ואם לא נמצא ננסה את desc
             try:
-                img_tag = driver.find_element(By.CSS_SELECTOR, ".watermarked-image img")
-                image_link = img_tag.get_attribute("src").strip()
-                print(f"[+] Image Link Found")
+                desc_wrapper = driver.find_element(By.CLASS_NAME, "description")
+                #print("[DEBUG] Found .description block")
             except NoSuchElementException:
-                image_link = "N/A"
-                print("[-] No Image Link Found")
-            except Exception as e:
-                image_link = "N/A"
-                print(f"[!] Error while extracting image link: {type(e).__name__}: {e}")
+                desc_wrapper = driver.find_element(By.CLASS_NAME, "desc")
+                #print("[DEBUG] Found .desc block instead")
 
-            # Description
-            try:
-                description_parts = []
+            paragraphs = desc_wrapper.find_elements(By.TAG_NAME, "p")
+            for p in paragraphs:
+                text = p.text.strip()
+                if text:
+                    description_parts.append(text)
 
-                # ננסה קודם את description ואם לא נמצא ננסה את desc
-                try:
-                    desc_wrapper = driver.find_element(By.CLASS_NAME, "description")
-                    #print("[DEBUG] Found .description block")
-                except NoSuchElementException:
-                    desc_wrapper = driver.find_element(By.CLASS_NAME, "desc")
-                    #print("[DEBUG] Found .desc block instead")
-
-                paragraphs = desc_wrapper.find_elements(By.TAG_NAME, "p")
-                for p in paragraphs:
-                    text = p.text.strip()
-                    if text:
-                        description_parts.append(text)
-
-                description = "\n".join(description_parts)
-
-                if description:
-                    print("[+] Description Found:")
-                else:
-                    description = "N/A"
-                    print("[-] Description block found but empty")
-            except NoSuchElementException:
-                description = "N/A"
-                print("[-] No Description Block Found (.description or .desc)")
-            except Exception as e:
+            description = "\n".join(description_parts)
+
+            if description:
+                print("[+] Description Found:")
+            else:
                 description = "N/A"
-                print(f"[!] Error while extracting description: {type(e).__name__}: {e}")
+                print("[-] Description block found but empty")
+        except NoSuchElementException:
+            description = "N/A"
+            print("[-] No Description Block Found (.description or .desc)")
+        except Exception as e:
+            description = "N/A"
+            print(f"[!] Error while extracting description: {type(e).__name__}: {e}")
 
-            # Terms and Conditions
-            try:
-                accordion_blocks = driver.find_elements(By.CSS_SELECTOR, "div.accordion-tab-content")
-                #print(f"[DEBUG] Found {len(accordion_blocks)} accordion block(s)")
-
-                terms_parts = []
-                for block in accordion_blocks:
-                    # Get all text from inside the block including nested spans etc.
-                    raw_html = block.get_attribute("innerText").strip()
-                    if raw_html:
-                        terms_parts.append(raw_html)
-
-                if terms_parts:
-                    terms = "\n\n".join(terms_parts)
-                    print(f"[+] Terms And Conditions Found")
-                else:
-                    terms = "N/A"
-                    print("[-] Accordion blocks found but no terms text inside")
-            except Exception as e:
+        # Terms and Conditions
+        try:
+            accordion_blocks = driver.find_elements(By.CSS_SELECTOR, "div.accordion-tab-content")
+            #print(f"[DEBUG] Found {len(accordion_blocks)} accordion block(s)")
+
+            terms_parts = []
+            for block in accordion_blocks:
+                # Get all text from inside the block including nested spans etc.
+                raw_html = block.get_attribute("innerText").strip()
+                if raw_html:
+                    terms_parts.append(raw_html)
+
+            if terms_parts:
+                terms = "\n\n".join(terms_parts)
+                print(f"[+] Terms And Conditions Found")
+            else:
                 terms = "N/A"
-                print(f"[!] Error extracting terms: {type(e).__name__}: {e}")
+                print("[-] Accordion blocks found but no terms text inside")
+        except Exception as e:
+            terms = "N/A"
+            print(f"[!] Error extracting terms: {type(e).__name__}: {e}")
 
-            # Price:
-            price = "N/A"
-            try:
-                price_element = driver.find_element(By.CLASS_NAME, "price-num")
-                price = price_element.text.strip()
+        # Price:
+        price = "N/A"
+        try:
+            price_element = driver.find_element(By.CLASS_NAME, "price-num")
+            price = price_element.text.strip()
+            print(f"[+] Price Found")
+        except NoSuchElementException:
+            #print("[-] Price element not found — checking fallback")
+            price = extract_price_fallback(description, terms)
+            if price != "N/A":
                 print(f"[+] Price Found")
-            except NoSuchElementException:
-                #print("[-] Price element not found — checking fallback")
-                price = extract_price_fallback(description, terms)
-                if price != "N/A":
-                    print(f"[+] Price Found")
-                else:
-                    print("[-] No price found - even in fallback")
+            else:
+                print("[-] No price found - even in fallback")
 
 
-            # Price Type
-            price_type = classify_price_type(price)
+        # Price Type
+        price_type = classify_price_type(price)
 
 
-            # Extract from combined description and terms
-            combined_text = f"{description}\n{terms}"
+        # Extract from combined description and terms
+        combined_text = f"{description}\n{terms}"
 
-            # Due Date
-            valid_until = extract_valid_until(combined_text)
-            
-            # Discount Code
-            coupon_code = extract_coupon_code(combined_text)
-            
-            # Provider's link:
-            provider_link = "N/A"
+        # Due Date
+        valid_until = extract_valid_until(combined_text)
+        
+        # Discount Code
+        coupon_code = extract_coupon_code(combined_text)
+        
+        # Provider's link:
+        provider_link = "N/A"
+        try:
+            # קודם בדוק ב-description או desc
             try:
-                # קודם בדוק ב-description או desc
+                desc_block = driver.find_element(By.CLASS_NAME, "desc")
+            except NoSuchElementException:
+                desc_block = driver.find_element(By.CLASS_NAME, "description")
+
+            p_tags = desc_block.find_elements(By.TAG_NAME, "p")
+
+            for p in p_tags:
                 try:
-                    desc_block = driver.find_element(By.CLASS_NAME, "desc")
+                    a_tag = p.find_element(By.TAG_NAME, "a")
+                    href = a_tag.get_attribute("href")
+                    if href and href.strip():
+                        provider_link = href
+                        print(f"[+] Provider Link Found (from description): {provider_link}")
+                        break
                 except NoSuchElementException:
-                    desc_block = driver.find_element(By.CLASS_NAME, "description")
-
-                p_tags = desc_block.find_elements(By.TAG_NAME, "p")
-
-                for p in p_tags:
-                    try:
-                        a_tag = p.find_element(By.TAG_NAME, "a")
-                        href = a_tag.get_attribute("href")
-                        if href and href.strip():
-                            provider_link = href
-                            print(f"[+] Provider Link Found (from description): {provider_link}")
-                            break
-                    except NoSuchElementException:
-                        continue
-
-                # אם לא נמצא — ננסה את buy-button
-                if provider_link == "N/A":
-                    try:
-                        buy_btn = driver.find_element(By.CLASS_NAME, "buy-button")
-                        a_tag = buy_btn.find_element(By.TAG_NAME, "a")
-                        href = a_tag.get_attribute("href")
-                        if href and href.strip():
-                            provider_link = href
-                            print(f"[+] Provider Link Found (from buy-button): {provider_link}")
-                    except NoSuchElementException:
-                        print("[-] No buy-button link found")
-
-                if provider_link == "N/A":
-                    print("[-] No provider link found in description or button")
+                    continue
 
-            except NoSuchElementException:
-                print("[-] No description block found for provider link search")
-
-
-            # provider_link = "N/A"
-            # try:
-            #     # קודם בדוק ב-description או desc
-            #     try:
-            #         desc_block = driver.find_element(By.CLASS_NAME, "desc")
-            #     except NoSuchElementException:
-            #         desc_block = driver.find_element(By.CLASS_NAME, "description")
-
-            #     p_tags = desc_block.find_elements(By.TAG_NAME, "p")
-
-            #     for p in p_tags:
-            #         try:
-            #             a_tag = p.find_element(By.TAG_NAME, "a")
-            #             href = a_tag.get_attribute("href")
-            #             if href and href.strip():
-            #                 provider_link = href
-            #                 print(f"[+] Provider Link Found (from description): {provider_link}")
-            #                 break
-            #         except NoSuchElementException:
-            #             continue
-
-            #     # אם לא נמצא — ננסה את buy-button
-            #     if provider_link == "N/A":
-            #         try:
-            #             buy_btn = driver.find_element(By.CLASS_NAME, "buy-button")
-            #             a_tag = buy_btn.find_element(By.TAG_NAME, "a")
-            #             href = a_tag.get_attribute("href")
-            #             if href and href.strip():
-            #                 provider_link = href
-            #                 print(f"[+] Provider Link Found (from buy-button): {provider_link}")
-            #         except NoSuchElementException:
-            #             print("[-] No buy-button link found")
-
-            #     # אם עדיין לא נמצא — ננסה ב-blockD לפי הדוגמא שלך
-            #     if provider_link == "N/A":
-            #         try:
-            #             blockD = driver.find_element(By.CLASS_NAME, "blockD")
-            #             block_text = blockD.text.strip()
-
-            #             # חפש כתובת URL מלאה
-            #             url_match = re.search(r'(https?://[^\s]+)', block_text)
-            #             if url_match:
-            #                 provider_link = url_match.group(1)
-            #                 print(f"[+] Provider Link Found in blockD (URL): {provider_link}")
-
-            #             # או חפש דומיין ממייל
-            #             elif "@" in block_text:
-            #                 email_match = re.search(r'[\w\.-]+@([\w\.-]+\.[a-z]{2,})', block_text)
-            #                 if email_match:
-            #                     domain = email_match.group(1)
-            #                     provider_link = f"http://{domain}"
-            #                     print(f"[+] Provider Link Generated from Email in blockD: {provider_link}")
-
-            #             else:
-            #                 print("[-] No URL or Email found in blockD")
-
-            #         except NoSuchElementException:
-            #             print("[-] No blockD found for fallback provider link search")
-
-            #     if provider_link == "N/A":
-            #         print("[-] No provider link found in description, buy-button or blockD")
-
-            # except NoSuchElementException:
-            #     print("[-] No description block found for provider link search")
-            
+            # אם לא נמצא — ננסה את buy-button
+            if provider_link == "N/A":
+                try:
+                    buy_btn = driver.find_element(By.CLASS_NAME, "buy-button")
+                    a_tag = buy_btn.find_element(By.TAG_NAME, "a")
+                    href = a_tag.get_attribute("href")
+                    if href and href.strip():
+                        provider_link = href
+                        print(f"[+] Provider Link Found (from buy-button): {provider_link}")
+                except NoSuchElementException:
+                    print("[-] No buy-button link found")
+
+            if provider_link == "N/A":
+                print("[-] No provider link found in description or button")
+
+        except NoSuchElementException:
+            print("[-] No description block found for provider link search")
+
+
+        # provider_link = "N/A"
+        # try:
+        #     # קודם בדוק ב-description או desc
+        #     try:
+        #         desc_block = driver.find_element(By.CLASS_NAME, "desc")
+        #     except NoSuchElementException:
+        #         desc_block = driver.find_element(By.CLASS_NAME, "description")
+
+        #     p_tags = desc_block.find_elements(By.TAG_NAME, "p")
+
+        #     for p in p_tags:
+        #         try:
+        #             a_tag = p.find_element(By.TAG_NAME, "a")
+        #             href = a_tag.get_attribute("href")
+        #             if href and href.strip():
+        #                 provider_link = href
+        #                 print(f"[+] Provider Link Found (from description): {provider_link}")
+        #                 break
+        #         except NoSuchElementException:
+        #             continue
+
+        #     # אם לא נמצא — ננסה את buy-button
+        #     if provider_link == "N/A":
+        #         try:
+        #             buy_btn = driver.find_element(By.CLASS_NAME, "buy-button")
+        #             a_tag = buy_btn.find_element(By.TAG_NAME, "a")
+        #             href = a_tag.get_attribute("href")
+        #             if href and href.strip():
+        #                 provider_link = href
+        #                 print(f"[+] Provider Link Found (from buy-button): {provider_link}")
+        #         except NoSuchElementException:
+        #             print("[-] No buy-button link found")
+
+        #     # אם עדיין לא נמצא — ננסה ב-blockD לפי הדוגמא שלך
+        #     if provider_link == "N/A":
+        #         try:
+        #             blockD = driver.find_element(By.CLASS_NAME, "blockD")
+        #             block_text = blockD.text.strip()
+
+        #             # חפש כתובת URL מלאה
+        #             url_match = re.search(r'(https?://[^\s]+)', block_text)
+        #             if url_match:
+        #                 provider_link = url_match.group(1)
+        #                 print(f"[+] Provider Link Found in blockD (URL): {provider_link}")
+
+        #             # או חפש דומיין ממייל
+        #             elif "@" in block_text:
+        #                 email_match = re.search(r'[\w\.-]+@([\w\.-]+\.[a-z]{2,})', block_text)
+        #                 if email_match:
+        #                     domain = email_match.group(1)
+        #                     provider_link = f"http://{domain}"
+        #                     print(f"[+] Provider Link Generated from Email in blockD: {provider_link}")
+
+        #             else:
+        #                 print("[-] No URL or Email found in blockD")
+
+        #         except NoSuchElementException:
+        #             print("[-] No blockD found for fallback provider link search")
+
+        #     if provider_link == "N/A":
+        #         print("[-] No provider link found in description, buy-button or blockD")
+
+        # except NoSuchElementException:
+        #     print("[-] No description block found for provider link search")
         
+    
 
-            # Placeholder for rest
-            discounts.append({
-                "club_name": club_name,
-                "category": category_name,
-                "discount_id": str(config.DISCOUNT_ID_COUNTER),  #str(extract_discounts_for_category.counter),
-                "title": title,
-
-                "price": price,
-                "discount_type": price_type,
-
-                "description": description,
-                "terms_and_conditions": terms,
-
-                "discount_link": full_link,
-                "image_link": image_link,
-                "provider_link": provider_link,
-                
-                "coupon_code": coupon_code,
-                "valid_until": valid_until,
-
-                "usage_limit": str(AMOUNT),
-                "location": LOCATION
-            })
-            #extract_discounts_for_category.counter += 1
-            config.DISCOUNT_ID_COUNTER += 1
+        # Placeholder for rest
+        return {
+            "club_name": club_name,
+            "category": category_name,
+            "discount_id": None,  # Assigned by the caller once the scrape order is known
+            "title": title,
 
+            "price": price,
+            "discount_type": price_type,
 
-        # If got here - wasn't able to scrape the discount:
-        except Exception as e:
-            print(f"[!] Error scraping discount #{i+1}: {e}")
+            "description": description,
+            "terms_and_conditions": terms,
 
-    # return total discounts:
-    return discounts
+            "discount_link": full_link,
+            "image_link": image_link,
+            "provider_link": provider_link,
+            
+            "coupon_code": coupon_code,
+            "valid_until": valid_until,
+
+            "usage_limit": str(AMOUNT),
+            "location": LOCATION
+        }
+
+    # If got here - wasn't able to scrape the discount:
+    except Exception as e:
+        print(f"[!] Error scraping discount {link}: {e}")
+        return None
+
+def get_discount_links(driver, category_url, category_name):
+    """Open a category page and return the discount detail links on it"""
+    print(f"----------------------------------")
+    print(f"\n[*] Opening '{category_name}' page...")
+    
+    #print(f"[DEBUG] Category URL: {category_url}")
+    #print("[DEBUG] Navigating to category URL")
+    #print("[DEBUG] Waiting for discount elements to load...")
+    load_page(driver, category_url, adif_parser.CARD_SELECTOR)
+
+
+
+    # Search for Set of Discounts for chosen category:    
+    try:
+        discount_elements = driver.find_elements(By.CSS_SELECTOR, "div.col-6.col-sm-4.col-md-3.mb-4")[:MAX_DISCOUNTS]
+        print(f"[+] Found {len(discount_elements)} discount(s).")
+    except NoSuchElementException:
+        print("[-] No discount cards found.")
+        return []
+
+    # Saving set of discounts to go through each one:
+    discount_links = []
+    for elem in discount_elements:
+        try:
+            href = elem.find_element(By.TAG_NAME, "a").get_attribute("href")
+            if href and href.strip():
+                discount_links.append(href)
+        except NoSuchElementException:
+            print("[!] Card without link – skipping")
+
+    return discount_links
+
+# --- HTTP fetch mode (config.FETCH_MODE == "http") ---
+# Adif pages are read from the server-rendered HTML (parsers/adif_parser.py);
+# the browser is only used when a page comes back without the expected markup.
+
+def fetch_discount_links(fetcher, get_driver, category_url, category_name):
+    """HTTP-mode get_discount_links; get_driver() returns this worker's browser"""
+    print(f"\n[*] Fetching '{category_name}' page...")
+    html = fetcher.get(category_url)
+    discount_links = adif_parser.parse_discount_links(html, category_url) if html else []
+    if discount_links:
+        print(f"[+] Found {len(discount_links)} discount(s).")
+        return discount_links
+    print("[~] No discount cards in the server HTML, using the browser")
+    return get_discount_links(get_driver(), category_url, category_name)
+
+def fetch_discount(fetcher, get_driver, link, category_name, club_name, crawl_state=None):
+    """HTTP-mode extract_discount; get_driver() returns this worker's browser
+
+    With a crawl_state (utils/crawl_state.py) the page is requested
+    conditionally, and UNCHANGED is returned for a 304 or a page whose
+    content matches the last recorded version.
+    """
+    try:
+        full_link = link if link.startswith("http") else BASE_URL_ADIF + link
+        page = fetcher.fetch(full_link, *crawl_state.validators(full_link)) if crawl_state is not None else fetcher.fetch(full_link)
+        if page and page.not_modified:
+            crawl_state.not_modified(full_link)
+            return UNCHANGED
+        if page and crawl_state is not None:
+            crawl_state.fetched(full_link, page.etag, page.last_modified)
+        html = page.html if page else None
+        discount = adif_parser.parse_discount(html, full_link, category_name, club_name) if html else None
+        if discount is None:
+            print("[~] Discount page not server-rendered, using the browser")
+            return extract_discount(get_driver(), link, category_name, club_name)
+        if crawl_state is not None and crawl_state.unchanged(full_link, discount):
+            return UNCHANGED
+        return discount
+    except Exception as e:
+        print(f"[!] Error fetching discount {link}: {e}")
+        return None
@@ -1,13 +1,13 @@
 # scrapers/hot_scraper.py
-import time
-import random
 import config
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from config import CATEGORIES_HOT, BASE_URL_HOT, MAX_DISCOUNTS, AMOUNT, LOCATION
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from config import CATEGORIES_HOT, BASE_URL_HOT, MAX_DISCOUNTS, AMOUNT, LOCATION, NEW_WINDOW_TIMEOUT
 from utils.helpers import *
+from utils.waits import load_page, wait_for_new_window, wait_for_url
+from parsers import hot_parser
+from utils.crawl_state import UNCHANGED
+from parsers.hot_parser import is_phone_button
 
 def scrape_hot(driver):
     all_discounts = []
@@ -16,17 +16,218 @@ def scrape_hot(driver):
     for category in CATEGORIES_HOT:
         discounts = extract_discounts_for_category(driver, category["url"], category["name"])
         all_discounts.extend(discounts)
-        print("[⏳] Waiting before next category...")
-        time.sleep(random.uniform(4, 7))
+        # The next category page waits for HOT's politeness slot (utils/pacing.py)
 
     return all_discounts
 
 def extract_discounts_for_category(driver, category_url, category_name):
+    club_name = get_club_name_from_url(category_url)
+    discount_links = get_discount_links(driver, category_url, category_name)
+
+    # Loop over them and extract info per discount:
+    discounts = []
+    for i, link in enumerate(discount_links):
+        print(f"-------------------")
+        print(f"[*] For Discount #{i+1}:")
+        discount = extract_discount(driver, link, category_name, club_name)
+        if discount:
+            discount["discount_id"] = str(config.DISCOUNT_ID_COUNTER)
+            config.DISCOUNT_ID_COUNTER += 1
+            discounts.append(discount)
+    
+    # return total discounts:
+    return discounts
+
+def extract_discount(driver, link, category_name, club_name):
+    """Scrape one discount detail page; returns the discount dict or None"""
+    try:
+        
+        # Discount Link
+        full_link = link if link.startswith("http") else BASE_URL_HOT + link
+        try:
+            if not load_page(driver, full_link, "h1.head-span", timeout=6):
+                raise TimeoutException("page loaded without a discount title")
+            print(f"[+] Discount Link Found")
+        except Exception as e:
+            print(f"[!] Error loading page: {e}")
+            return None  # skip this discount
+        except NoSuchElementException:
+            full_link = "N/A"
+            print(f"[-] No Discount Link Found")
+        
+        # Image Link
+        try:
+            img_tag = driver.find_element(By.CSS_SELECTOR, ".gallery-wrapper .selected-image-wrapper img")
+            image_link = img_tag.get_attribute("src")
+            print(f"[+] Image Link Found")
+        except NoSuchElementException:
+            image_link = "N/A"
+            print(f"[-] No Image Link Found")
+        
+
+        # External Link
+        external_link = "N/A"
+        try:
+            buttons = driver.find_elements(By.CLASS_NAME, "send-btn")
+
+            if buttons:
+                button = buttons[0]
+                button_text = button.text.strip()
+                button_html = button.get_attribute("outerHTML") or ""
+                href = button.get_attribute("href") or button.get_attribute("data-href") or ""
+
+                # Phone detection logic
+                print(f"[DEBUG] Button text: '{button_text}'")
+                print(f"[DEBUG] Button href: '{href}'")
+
+                if is_phone_button(button_text, button_html, href):
+                    external_link = "TEL"
+                    print(f"[✓] No external link — this discount uses a phone number button ({button_text})")
+                else:
+                    external_link = click_provider_link(driver, button)
+
+            else:
+                print("[✓] No send button exists on this discount")
+        except Exception as e:
+            print(f"[!] External link extraction failed: {type(e).__name__}: {e}")
+
+        # Title
+        try:
+            title = driver.find_element(By.CSS_SELECTOR, "h1.head-span").text.strip()
+            print(f"[+] Title Found")
+        except NoSuchElementException:
+            title = "N/A"
+            print(f"[-] No Title Found")
+
+        # Price
+        try:
+            price_elem = driver.find_element(By.XPATH, "//span[starts-with(@class, 'price-span')]")
+            price = price_elem.text.strip()
+            print(f"[+] Price Found")
+        except NoSuchElementException:
+            price = "N/A"
+            print(f"[-] No Price Found")
+        
+        # Price Type
+        price_type = classify_price_type(price)
+
+        # Description
+        try:
+            description_parts = []
+            info_wrappers = driver.find_elements(By.CSS_SELECTOR, ".extra-info .info-wrapper")
+            for wrapper in info_wrappers:
+                try:
+                    des_title = wrapper.find_element(By.CLASS_NAME, "title").text.strip()
+                except NoSuchElementException:
+                    des_title = "N/A"
+                    print(f"[-] No Desc Title Found")
+                try:
+                    des_body = wrapper.find_element(By.CLASS_NAME, "description").text.strip()
+                except NoSuchElementException:
+                    des_body = "N/A"
+                    print(f"[-] No Desc Body Found")
+                
+                description_parts.append(f"{des_title}: {des_body}")
+            description = "\n\n".join(description_parts)
+            print(f"[+] Description Found")
+        except NoSuchElementException:
+            print(f"[-] No Description Found")
+ 
+        # Terms & Conditions
+        try:
+            terms_block = driver.find_element(By.CSS_SELECTOR, ".details-wrapper .content")
+            paragraphs = terms_block.find_elements(By.TAG_NAME, "p")
+            terms = "\n".join(p.text.strip() for p in paragraphs if p.text.strip())
+            print(f"[+] Terms And Conditions Found")
+        except NoSuchElementException:
+            terms = "N/A"
+            print(f"[-] No Terms And Conditions Found")
+
+        # Discount Code
+        discount_code = extract_coupon_code(description + " " + terms)
+
+        # Due Date
+        due_date = extract_valid_until(description + " " + terms)
+
+        # all extracted info for this discount:
+        return {
+            "club_name": club_name,
+            "category": category_name,
+
+            "discount_id": None,  # Assigned by the caller once the scrape order is known
+            "title": title,
+
+            "price": price,
+            "discount_type": price_type,
+
+            "description": description,
+            "terms_and_conditions": terms,
+
+            "discount_link": full_link,
+            "image_link": image_link,
+            "provider_link": external_link,
+            
+            "coupon_code": discount_code,
+            "valid_until": due_date,
+
+            "usage_limit": AMOUNT,
+            "location": LOCATION
+        }
+
+    # If got here - wasn't able to scrape the discount:
+    except Exception as e:
+        print(f"[!] Error scraping discount {link}: {e}")
+        return None
+
+def leaves_hot(url):
+    """True once a provider tab has left about:blank and HOT's own redirect pages"""
+    return bool(url) and "hot.co.il" not in url and not url.startswith(("about:", "data:"))
+
+def click_provider_link(driver, button):
+    """Click the send button and read the provider URL from the tab it opens.
+
+    Returns the external URL, "FORM" when no tab opens, or "N/A" when the
+    redirect stayed on HOT.
+    """
+    external_link = "N/A"
+    original_tabs = driver.window_handles.copy()
+    driver.execute_script("arguments[0].click();", button)
+    #print("[*] Clicked send button, waiting...")
+
+    # Returns as soon as a tab opens, or once the page settles without one (a form)
+    new_tab = wait_for_new_window(driver, original_tabs)
+    if new_tab:
+        driver.switch_to.window(new_tab)
+        #print("[*] Switched to new tab")
+        # The tab starts on about:blank / a HOT redirect before it lands on the provider
+        wait_for_url(driver, leaves_hot, timeout=NEW_WINDOW_TIMEOUT)
+
+        try:
+            current = driver.execute_script("return window.location.href;")
+            #print(f"[*] JS returned current URL: {current}")
+        except Exception:
+            current = "N/A"
+            print("[!] JS failed to read URL")
+
+        if current and "hot.co.il" not in current and not current.startswith("data:"):
+            external_link = current
+            print(f"[+] Provider Link Found: {external_link}")
+        else:
+            print("[!] Redirect stayed on HOT or was invalid")
+
+        driver.close()
+        driver.switch_to.window(original_tabs[0])
+        print("[*] Closed tab and returned")
+    else:
+        external_link = "FORM"
+        print("[✓] No external link — this discount uses a form")
+    return external_link
+
+def get_discount_links(driver, category_url, category_name):
+    """Open a category page and return the discount detail links on it"""
     print(f"----------------------------------")
     print(f"\n[*] Opening '{category_name}' page...")
-    club_name = get_club_name_from_url(category_url)
-    driver.get(category_url)
-    time.sleep(2)
+    load_page(driver, category_url, "div.benefits-grid.benefits-grid_promoted a.benefit-wrapper")
 
     # Search for Set of Discounts for chosen category:
     try:
@@ -46,200 +247,67 @@ def extract_discounts_for_category(driver, category_url, category_name):
                 discount_links.append(href)
         except NoSuchElementException:
             print("[!] Card without link – skipping")
-    
-    # Loop over them and extract info per discount:
-    discounts = []
-    for i, link in enumerate(discount_links):
-        print(f"-------------------")
-        print(f"[*] For Discount #{i+1}:")
-        
-        # try to scrape a discount:
-        try:
-            
-            # Discount Link
-            full_link = link if link.startswith("http") else BASE_URL_HOT + link
-            try:
-                driver.get(full_link)
-                WebDriverWait(driver, 6).until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.head-span")))
-                print(f"[+] Discount Link Found")
-            except Exception as e:
-                print(f"[!] Error loading page: {e}")
-                continue  # skip this discount
-            except NoSuchElementException:
-                full_link = "N/A"
-                print(f"[-] No Discount Link Found")
-            
-            # Image Link
-            try:
-                img_tag = driver.find_element(By.CSS_SELECTOR, ".gallery-wrapper .selected-image-wrapper img")
-                image_link = img_tag.get_attribute("src")
-                print(f"[+] Image Link Found")
-            except NoSuchElementException:
-                image_link = "N/A"
-                print(f"[-] No Image Link Found")
-            
 
-            # External Link
-            external_link = "N/A"
-            try:
-                buttons = driver.find_elements(By.CLASS_NAME, "send-btn")
-
-                if buttons:
-                    button = buttons[0]
-                    button_text = button.text.strip()
-                    button_html = button.get_attribute("outerHTML") or ""
-                    href = button.get_attribute("href") or button.get_attribute("data-href") or ""
-
-                    # Phone detection logic
-                    print(f"[DEBUG] Button text: '{button_text}'")
-                    print(f"[DEBUG] Button href: '{href}'")
-
-                    is_tel = False
-                    if "tel:" in button_html.lower():
-                        is_tel = True
-                    elif re.search(r"\b0\d{1,2}[-\s]?\d{3}[-\s]?\d{4}\b", button_text):
-                        is_tel = True
-                    elif re.search(r"\*?\d{2,6}\*?", button_text):
-                        is_tel = True
-                    elif button_text.strip().startswith("*") or button_text.strip().endswith("*"):
-                        digits = button_text.strip().replace("*", "")
-                        if digits.isdigit():
-                            is_tel = True
-                    elif "להזמנה" in button_text or "להזמנות" in button_text:
-                        is_tel = True
-                    elif href.lower().startswith("tel:"):
-                        is_tel = True
-
-                    if is_tel:
-                        external_link = "TEL"
-                        print(f"[✓] No external link — this discount uses a phone number button ({button_text})")
-
-                    else:
-                        original_tabs = driver.window_handles.copy()
-                        driver.execute_script("arguments[0].click();", button)
-                        #print("[*] Clicked send button, waiting...")
-
-                        time.sleep(2.5)  # allow time for tab or form to react
-
-                        new_tabs = driver.window_handles
-                        if len(new_tabs) > len(original_tabs):
-                            new_tab = [tab for tab in new_tabs if tab not in original_tabs][0]
-                            driver.switch_to.window(new_tab)
-                            #print("[*] Switched to new tab")
-
-                            try:
-                                current = driver.execute_script("return window.location.href;")
-                                #print(f"[*] JS returned current URL: {current}")
-                            except Exception:
-                                current = "N/A"
-                                print("[!] JS failed to read URL")
-
-                            if current and "hot.co.il" not in current and not current.startswith("data:"):
-                                external_link = current
-                                print(f"[+] Provider Link Found: {external_link}")
-                            else:
-                                print("[!] Redirect stayed on HOT or was invalid")
-
-                            driver.close()
-                            driver.switch_to.window(original_tabs[0])
-                            print("[*] Closed tab and returned")
-                        else:
-                            external_link = "FORM"
-                            print("[✓] No external link — this discount uses a form")
+    return discount_links
 
-                else:
-                    print("[✓] No send button exists on this discount")
-            except Exception as e:
-                print(f"[!] External link extraction failed: {type(e).__name__}: {e}")
-
-            # Title
-            try:
-                title = driver.find_element(By.CSS_SELECTOR, "h1.head-span").text.strip()
-                print(f"[+] Title Found")
-            except NoSuchElementException:
-                title = "N/A"
-                print(f"[-] No Title Found")
-
-            # Price
-            try:
-                price_elem = driver.find_element(By.XPATH, "//span[starts-with(@class, 'price-span')]")
-                price = price_elem.text.strip()
-                print(f"[+] Price Found")
-            except NoSuchElementException:
-                price = "N/A"
-                print(f"[-] No Price Found")
-            
-            # Price Type
-            price_type = classify_price_type(price)
-
-            # Description
-            try:
-                description_parts = []
-                info_wrappers = driver.find_elements(By.CSS_SELECTOR, ".extra-info .info-wrapper")
-                for wrapper in info_wrappers:
-                    try:
-                        des_title = wrapper.find_element(By.CLASS_NAME, "title").text.strip()
-                    except NoSuchElementException:
-                        des_title = "N/A"
-                        print(f"[-] No Desc Title Found")
-                    try:
-                        des_body = wrapper.find_element(By.CLASS_NAME, "description").text.strip()
-                    except NoSuchElementException:
-                        des_body = "N/A"
-                        print(f"[-] No Desc Body Found")
-                    
-                    description_parts.append(f"{des_title}: {des_body}")
-                description = "\n\n".join(description_parts)
-                print(f"[+] Description Found")
-            except NoSuchElementException:
-                print(f"[-] No Description Found")
- 
-            # Terms & Conditions
-            try:
-                terms_block = driver.find_element(By.CSS_SELECTOR, ".details-wrapper .content")
-                paragraphs = terms_block.find_elements(By.TAG_NAME, "p")
-                terms = "\n".join(p.text.strip() for p in paragraphs if p.text.strip())
-                print(f"[+] Terms And Conditions Found")
-            except NoSuchElementException:
-                terms = "N/A"
-                print(f"[-] No Terms And Conditions Found")
-
-            # Discount Code
-            discount_code = extract_coupon_code(description + " " + terms)
-
-            # Due Date
-            due_date = extract_valid_until(description + " " + terms)
-
-            # adding all extracted info per discount into List:
-            discounts.append({
-                "club_name": club_name,
-                "category": category_name,
-
-                "discount_id": str(config.DISCOUNT_ID_COUNTER), #str(extract_discounts_for_category.counter),
-                "title": title,
-
-                "price": price,
-                "discount_type": price_type,
-
-                "description": description,
-                "terms_and_conditions": terms,
-
-                "discount_link": full_link,
-                "image_link": image_link,
-                "provider_link": external_link,
-                
-                "coupon_code": discount_code,
-                "valid_until": due_date,
+# --- HTTP fetch mode (config.FETCH_MODE == "http") ---
+# Pages are read from the server-rendered HTML (parsers/hot_parser.py); the
+# browser is only started for the send button's JavaScript redirect and for
+# pages that come back without the expected markup.
 
-                "usage_limit": AMOUNT,
-                "location": LOCATION
-            })
-            #extract_discounts_for_category.counter += 1
-            config.DISCOUNT_ID_COUNTER += 1
-        
-        # If got here - wasn't able to scrape the discount:    
-        except Exception as e:
-            print(f"[!] Error scraping discount #{i+1}: {e}")
-    
-    # return total discounts:
-    return discounts
+def fetch_discount_links(fetcher, get_driver, category_url, category_name):
+    """HTTP-mode get_discount_links; get_driver() returns this worker's browser"""
+    print(f"\n[*] Fetching '{category_name}' page...")
+    html = fetcher.get(category_url)
+    discount_links = hot_parser.parse_discount_links(html, category_url) if html else []
+    if discount_links:
+        print(f"[+] Found {len(discount_links)} discount(s).")
+        return discount_links
+    print("[~] No discounts in the server HTML, using the browser")
+    return get_discount_links(get_driver(), category_url, category_name)
+
+def fetch_discount(fetcher, get_driver, link, category_name, club_name, crawl_state=None):
+    """HTTP-mode extract_discount; get_driver() returns this worker's browser
+
+    With a crawl_state (utils/crawl_state.py) the page is requested
+    conditionally, and UNCHANGED is returned for a 304 or a page whose
+    content matches the last recorded version.
+    """
+    try:
+        full_link = link if link.startswith("http") else BASE_URL_HOT + link
+        page = fetcher.fetch(full_link, *crawl_state.validators(full_link)) if crawl_state is not None else fetcher.fetch(full_link)
+        if page and page.not_modified:
+            crawl_state.not_modified(full_link)
+            return UNCHANGED
+        if page and crawl_state is not None:
+            crawl_state.fetched(full_link, page.etag, page.last_modified)
+        html = page.html if page else None
+        discount, provider_href = hot_parser.parse_discount(html, full_link, category_name, club_name) if html else (None, None)
+        if discount is None:
+            print("[~] Discount page not server-rendered, using the browser")
+            return extract_discount(get_driver(), link, category_name, club_name)
+        if crawl_state is not None and crawl_state.unchanged(full_link, discount):
+            return UNCHANGED  # Skips resolving the provider link as well
+
+        if discount["provider_link"] is None:
+            discount["provider_link"] = resolve_provider_link(fetcher, get_driver, full_link, provider_href)
+        return discount
+    except Exception as e:
+        print(f"[!] Error fetching discount {link}: {e}")
+        return None
+
+def resolve_provider_link(fetcher, get_driver, full_link, provider_href):
+    """Provider URL behind the send button: follow a plain link over HTTP, click it in the browser otherwise"""
+    if provider_href and provider_href.startswith("http"):
+        current = fetcher.final_url(provider_href)
+        if current and "hot.co.il" not in current:
+            print(f"[+] Provider Link Found: {current}")
+            return current
+
+    # JavaScript-only button (or a redirect that stays on HOT): click it
+    driver = get_driver()
+    load_page(driver, full_link, ".send-btn", timeout=6)
+    buttons = driver.find_elements(By.CLASS_NAME, "send-btn")
+    if not buttons:
+        return "N/A"
+    return click_provider_link(driver, buttons[0])
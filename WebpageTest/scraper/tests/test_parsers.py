@@ -0,0 +1,142 @@
+# tests/test_parsers.py
+# HTTP fetch mode: the lxml parsers must read the same fields the Selenium scrapers did.
+# Run from the scraper directory: python -m pytest tests
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("cssselect")
+
+SCRAPER_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRAPER_DIR))
+
+from parsers import adif_parser, hot_parser  # noqa: E402
+
+FIXTURES = SCRAPER_DIR / "tests" / "fixtures"
+
+HOT_CATEGORY_URL = "https://www.hot.co.il/category/consumerism"
+HOT_DISCOUNT_URL = "https://www.hot.co.il/%D7%94%D7%98%D7%91%D7%94/56477/2-%D7%9E%D7%9B%D7%A0%D7%A1%D7%99"
+ADIF_CATEGORY_URL = "https://adif.org.il/category/consumerism"
+ADIF_DISCOUNT_URL = "https://adif.org.il/benefit/1789"
+
+
+def load(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+# HOT
+
+def test_hot_discount_links_only_promoted_grid():
+    links = hot_parser.parse_discount_links(load("hot_category.html"), HOT_CATEGORY_URL)
+    assert links == [
+        HOT_DISCOUNT_URL,
+        "https://www.hot.co.il/%D7%94%D7%98%D7%91%D7%94/56480/sushi",
+    ]
+
+
+def test_hot_discount_links_missing_grid():
+    assert hot_parser.parse_discount_links("<html><body></body></html>", HOT_CATEGORY_URL) == []
+
+
+def test_hot_discount_fields():
+    discount, provider_href = hot_parser.parse_discount(
+        load("hot_discount.html"), HOT_DISCOUNT_URL, "צרכנות", "hot"
+    )
+    assert discount["title"] == "2 מכנסי ג'ינס ליוויס גברים/ נשים"
+    assert discount["price"] == "499 ₪"
+    assert discount["discount_type"] == "price"
+    assert discount["image_link"] == "https://cdn.hot.co.il/media/c8f6b486-b61c-4b43-9615-422c1fc99bc6.png"
+    assert discount["description"] == (
+        "פרטי ההטבה: הטבה מיוחדת לעמיתי המועדון באתר ברנדיז-\n"
+        "2 מכנסי LEVIS ב-499 ₪ + 6% הנחה בחיוב\n"
+        "מגוון דגמים ומידות לגברים ונשים\n\n"
+        "מימוש ההטבה: מוסיפים 2 מכנסיים שבמבצע מהלינק הייעודי באתר ברנדיז, קוד קופון: LEVIS499"
+    )
+    assert discount["terms_and_conditions"] == (
+        "2 מכנסיים שבמבצע 499 ₪ + 6% הנחה בחיוב.\n"
+        "מימוש ההטבה בלינק הייעודי באתר ברנדיז. תקף בין התאריכים: 19-31.5.25 או עד גמר המלאי – המוקדם מביניהם.\n"
+        "- כולל כפל מבצעים"
+    )
+    assert discount["coupon_code"] == "LEVIS499"
+    assert discount["valid_until"] == "31.5.25"
+    assert discount["club_name"] == "hot"
+    assert discount["category"] == "צרכנות"
+    assert discount["discount_link"] == HOT_DISCOUNT_URL
+    assert discount["discount_id"] is None
+
+    # The send button links out: the scraper resolves the final URL
+    assert discount["provider_link"] is None
+    assert provider_href == "https://brandiz.co.il/product-category/levis/"
+
+
+def test_hot_phone_button():
+    discount, provider_href = hot_parser.parse_discount(
+        load("hot_discount_phone.html"), HOT_DISCOUNT_URL, "נופש", "hot"
+    )
+    assert discount["provider_link"] == "TEL"
+    assert provider_href is None
+    assert discount["price"] == "15% הנחה"
+    assert discount["discount_type"] == "percentage"
+    assert discount["terms_and_conditions"] == "N/A"
+
+
+@pytest.mark.parametrize("text, html, href, expected", [
+    ("*3456", "<a>*3456</a>", "", True),
+    ("03-644-3020", "<a>03-644-3020</a>", "", True),
+    ("התקשרו", '<a href="tel:036443020">התקשרו</a>', "tel:036443020", True),
+    ("להזמנות", "<a>להזמנות</a>", "", True),
+    ("למימוש ההטבה", '<a data-href="https://example.com">למימוש ההטבה</a>', "https://example.com", False),
+])
+def test_is_phone_button(text, html, href, expected):
+    assert hot_parser.is_phone_button(text, html, href) is expected
+
+
+def test_hot_page_without_markup_needs_browser():
+    assert hot_parser.parse_discount(load("adif_discount_no_title.html"), HOT_DISCOUNT_URL, "x", "hot") == (None, None)
+
+
+# ADIF
+
+def test_adif_discount_links():
+    links = adif_parser.parse_discount_links(load("adif_category.html"), ADIF_CATEGORY_URL)
+    assert links == [ADIF_DISCOUNT_URL, "https://adif.org.il/benefit/1790"]
+
+
+def test_adif_discount_fields():
+    discount = adif_parser.parse_discount(load("adif_discount.html"), ADIF_DISCOUNT_URL, "מסעדות", "adif")
+    assert discount["title"] == "נגיסה סושי"
+    assert discount["image_link"] == (
+        "https://uniq-club-shop.s3.eu-west-1.amazonaws.com/images/0c08035db8de2e6ea7c2784dd1daee97.jpg"
+    )
+    assert discount["description"] == (
+        "נגיסה – רשת סושי בר ומטבח אסייאתי בפריסה ארצית, שמתמחה בטעמים אסייתיים עם טוויסט ישראלי מנצח.\n"
+        "10% הנחה על כל התפריט.\n"
+        "להזמנות באתר: medamas.co.il"
+    )
+    # Hidden accordion tabs are in the HTML even though Selenium did not render them
+    assert discount["terms_and_conditions"] == (
+        "לתשומת לבך:\n"
+        "*השירותים והמוצרים באחריות בית העסק בלבד *תוקף עד תאריך 31.12.2026\n\n"
+        "הדר יוסף 14, תל אביב-יפו\n"
+        "טלפון: 03-644-3020"
+    )
+    # No .price-num: falls back to the description text
+    assert discount["price"] == "10% הנחה"
+    assert discount["discount_type"] == "percentage"
+    assert discount["provider_link"] == "https://medamas.co.il/"
+    assert discount["valid_until"] == "31.12.2026"
+    assert discount["coupon_code"] == "N/A"
+    assert discount["usage_limit"] == "1"
+    assert discount["discount_link"] == ADIF_DISCOUNT_URL
+
+
+def test_adif_provider_link_falls_back_to_buy_button():
+    html = load("adif_discount.html").replace('<a href="https://medamas.co.il/">medamas.co.il</a>', "medamas.co.il")
+    discount = adif_parser.parse_discount(html, ADIF_DISCOUNT_URL, "מסעדות", "adif")
+    assert discount["provider_link"] == "https://adif.org.il/buy/1789"
+
+
+def test_adif_page_without_markup_needs_browser():
+    assert adif_parser.parse_discount(load("adif_discount_no_title.html"), ADIF_DISCOUNT_URL, "x", "adif") is None
@@ -1,5 +1,6 @@
 # utils/browser.py
 import tempfile
+import threading
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
@@ -32,3 +33,41 @@ def setup_driver():
     driver_path = ChromeDriverManager().install()
     service = Service(driver_path)
     return webdriver.Chrome(service=service, options=options)
+
+
+class DriverPool:
+    """Lazily creates one WebDriver per worker thread and quits them all on close.
+
+    Every driver comes from setup_driver(), so each worker gets its own
+    isolated Chrome profile.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the calling thread's driver, starting it on first use"""
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            driver = setup_driver()
+            self._local.driver = driver
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"[!] Failed to quit driver: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
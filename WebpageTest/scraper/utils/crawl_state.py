@@ -0,0 +1,168 @@
+# utils/crawl_state.py
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from config import (
+    CRAWL_ID_PREFIX, CRAWL_STATE_FILE, CRAWL_STATE_RETENTION, DISCOUNT_ID_COUNTER, RECRAWL_AFTER
+)
+
+# Page content that identifies a version of a discount. provider_link is left
+# out: it is resolved through redirects / a JavaScript click (so it is only
+# known after the expensive part) and often carries per-visit tracking
+# parameters. category is left out because one page can be listed in several
+# categories. discount_id, coupon_code, valid_until and discount_type are
+# derived (valid_until even falls back to a random date).
+FINGERPRINT_FIELDS = (
+    "club_name", "title", "price", "description", "terms_and_conditions", "image_link",
+)
+
+# Returned by the scrapers' fetch_discount for a page that did not change
+UNCHANGED = "unchanged"
+
+
+def fingerprint(discount):
+    """Stable hash of a discount's page content (see FINGERPRINT_FIELDS)"""
+    content = {field: discount.get(field) for field in FINGERPRINT_FIELDS}
+    encoded = json.dumps(content, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class CrawlState:
+    """Persistent per-URL crawl state, so a re-crawl only emits what changed.
+
+    One entry per discount detail URL:
+
+        {"discount_id": "c17", "fingerprint": "<hash>", "etag": ..., "last_modified": ...,
+         "last_crawled": <epoch>, "last_seen": <epoch>}
+
+    - discount_id is assigned the first time a URL is emitted and kept for
+      good, so downstream upserts (Groq, import_coupons) hit the same record.
+      It carries CRAWL_ID_PREFIX, so it never names a discount from an
+      older output file that used running ids.
+    - etag / last_modified are sent back as If-None-Match / If-Modified-Since;
+      a 304 costs no download or parsing.
+    - fingerprint is compared after parsing, for servers that do not honour
+      conditional requests.
+    - URLs crawled less than RECRAWL_AFTER seconds ago are not requested at all.
+
+    Updates are kept in memory (thread-safe) and only written by save(), which
+    main.py calls after the output file is written, so a crashed run never
+    marks discounts as delivered. Entries not seen for CRAWL_STATE_RETENTION
+    seconds are dropped on save; their ids are not reused.
+    """
+
+    def __init__(self, path=CRAWL_STATE_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = {}  # url -> (etag, last_modified) of this run's 200 response
+        self._next_id = DISCOUNT_ID_COUNTER
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[!] Could not read crawl state {self.path}, starting a full crawl: {e}")
+            return
+        self._entries = data.get("entries", {})
+        self._next_id = max(data.get("next_id", DISCOUNT_ID_COUNTER), DISCOUNT_ID_COUNTER)
+
+    def save(self):
+        """Write the state atomically, dropping entries not seen for CRAWL_STATE_RETENTION"""
+        cutoff = time.time() - CRAWL_STATE_RETENTION
+        with self._lock:
+            self._entries = {
+                url: entry for url, entry in self._entries.items()
+                if entry.get("last_seen", 0) >= cutoff
+            }
+            data = {
+                "next_id": self._next_id,
+                "saved_at": datetime.now().isoformat(),
+                "entries": self._entries,
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def known_pages(self):
+        return len(self._entries)
+
+    # Before fetching
+
+    def is_fresh(self, url):
+        """True if url was crawled within RECRAWL_AFTER seconds (skip it; it still counts as seen)"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry.get("fingerprint") is None:
+                return False
+            now = time.time()
+            if now - entry.get("last_crawled", 0) >= RECRAWL_AFTER:
+                return False
+            entry["last_seen"] = now
+            return True
+
+    def validators(self, url):
+        """(etag, last_modified) from the last crawl of url, for a conditional GET"""
+        with self._lock:
+            entry = self._entries.get(url) or {}
+            if entry.get("fingerprint") is None:
+                return None, None
+            return entry.get("etag"), entry.get("last_modified")
+
+    # After fetching
+
+    def not_modified(self, url):
+        """The server answered 304 for url"""
+        self._touch(url)
+
+    def fetched(self, url, etag, last_modified):
+        """Remember the validators of a 200 response; stored once the discount is unchanged or recorded"""
+        with self._lock:
+            self._pending[url] = (etag, last_modified)
+
+    def unchanged(self, url, discount):
+        """True (and the entry is refreshed) if discount matches the last recorded version of url"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry.get("fingerprint") != fingerprint(discount):
+                return False
+        self._touch(url)
+        return True
+
+    def record(self, url, discount):
+        """Store the new version of url; returns its discount_id"""
+        with self._lock:
+            entry = self._entries.setdefault(url, {})
+            entry["fingerprint"] = fingerprint(discount)
+            self._assign_id(entry)
+            self._update(url, entry)
+            return entry["discount_id"]
+
+    def _touch(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._update(url, entry)
+
+    def _update(self, url, entry):
+        now = time.time()
+        if url in self._pending:
+            entry["etag"], entry["last_modified"] = self._pending.pop(url)
+        entry["last_crawled"] = now
+        entry["last_seen"] = now
+
+    def _assign_id(self, entry):
+        if not entry.get("discount_id"):
+            entry["discount_id"] = f"{CRAWL_ID_PREFIX}{self._next_id}"
+            self._next_id += 1
@@ -1,9 +1,15 @@
 # utils/helpers.py
 import re
 import random
+import sys
 from datetime import datetime, timedelta
+from pathlib import Path
 from urllib.parse import urlparse
 
+# The Hebrew normalizer is shared with the web app (it has no Django dependencies)
+sys.path.append(str(Path(__file__).resolve().parents[2] / "mysite"))
+from intellishop.utils.hebrew_text import strip_niqqud
+
 def extract_valid_until(text):
     """
     Extracts the valid-until date from a block of text.
@@ -11,6 +17,7 @@ def extract_valid_until(text):
     - עד תאריך 31.12.2026
     - תוקף ההטבה בין התאריכים: 01.01.2024-31.12.2024
     """
+    text = strip_niqqud(text)
     patterns = [
         r'בין התאריכים:\s*\d{1,2}-([0-9]{1,2}\.[0-9]{1,2}\.[0-9]{2,4})',
         r'תוקף ההטבה בין התאריכים:\s*\d{1,2}-([0-9]{1,2}\.[0-9]{1,2}\.[0-9]{2,4})',
@@ -33,7 +40,7 @@ def classify_price_type(price_text):
     if not price_text or price_text.strip() == "":
         return "N/A"
 
-    price_text = price_text.strip()
+    price_text = strip_niqqud(price_text).strip()
 
     # Percentage match: 10%, 15 אחוז
     if re.search(r'\d{1,3}\s*[%אחוז]', price_text):
@@ -51,7 +58,7 @@ def extract_coupon_code(text):
     Returns 'N/A' if not found or if the match is a known false positive.
     """
     pattern = r'(?:קוד קופון|קוד הטבה|קוד המבצע|קוד)\s*:?\s*([A-Za-z0-9]{4,})'
-    match = re.search(pattern, text)
+    match = re.search(pattern, strip_niqqud(text))
     if match:
         code = match.group(1)
         false_positives = {"באתר", "למוכרן", "בטרם", "קופה", "טרם", "בהצגה", "אפליקציית", "מועדון"}
@@ -67,7 +74,7 @@ def extract_price_fallback(description, terms):
     Tries to extract a price or percentage from the description and terms text.
     Covers Hebrew formats like '10%', '10 אחוז', '10% הנחה', 'ב-199 ש"ח', etc.
     """
-    combined_text = f"{description}\n{terms}"
+    combined_text = strip_niqqud(f"{description}\n{terms}")
 
     patterns = [
         r"\d{1,3}%\s*הנחה",                  # 10% הנחה
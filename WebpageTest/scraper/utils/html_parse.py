@@ -0,0 +1,60 @@
+# utils/html_parse.py
+import re
+
+import lxml.html
+
+# Elements that start a new line in rendered text (what Selenium's .text shows)
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4",
+    "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "table", "tr", "ul",
+}
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+
+
+def parse_html(html):
+    """Parse a page with lxml (libxml2), the fast replacement for a rendered DOM"""
+    return lxml.html.document_fromstring(html)
+
+
+def _collect_text(element, parts):
+    tag = element.tag if isinstance(element.tag, str) else None  # Comments have a callable tag
+    if tag in SKIP_TAGS:
+        return
+    block = tag in BLOCK_TAGS
+    if block:
+        parts.append("\n")
+    if tag and element.text:
+        parts.append(element.text)
+    for child in element:
+        _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+    if block:
+        parts.append("\n")
+
+
+def inner_text(element):
+    """Rendered-like text of element: one line per block, whitespace collapsed, blank lines dropped"""
+    if element is None:
+        return ""
+    parts = []
+    _collect_text(element, parts)
+    lines = (re.sub(r"\s+", " ", line).strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def text_of(element):
+    """Single-line text of element (titles, prices, labels)"""
+    return " ".join(inner_text(element).split())
+
+
+def first(root, selector):
+    """First element matching the CSS selector (like find_element), or None"""
+    found = root.cssselect(selector)
+    return found[0] if found else None
+
+
+def outer_html(element):
+    return lxml.html.tostring(element, encoding="unicode")
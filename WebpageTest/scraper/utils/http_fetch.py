@@ -0,0 +1,118 @@
+# utils/http_fetch.py
+import threading
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import HTTP_TIMEOUT, HTTP_RETRIES, HTTP_POOL_SIZE, USER_AGENT
+from utils.pacing import politeness
+
+# html is None when not_modified (304)
+Page = namedtuple("Page", ["html", "etag", "last_modified", "not_modified"])
+
+
+def create_session():
+    """Return a requests Session with keep-alive pooling, retries and browser-like headers"""
+    session = requests.Session()
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "he-IL,he;q=0.9,en;q=0.8",
+    })
+    return session
+
+
+def is_overload(error):
+    """True for failures that mean the site is struggling (no response, 429, 5xx), not e.g. a 404"""
+    response = getattr(error, "response", None)
+    return response is None or response.status_code == 429 or response.status_code >= 500
+
+
+class HttpFetcher:
+    """Fetches pages over HTTP with one pooled Session per worker thread.
+
+    The counterpart of DriverPool for the "http" fetch mode: connections to
+    each site are kept alive and reused across category and detail pages.
+    Every request waits for its site's slot in the shared politeness
+    controller (utils/pacing.py), which backs a site off after failures.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def session(self):
+        """Return the calling thread's Session, creating it on first use"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = create_session()
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def get(self, url):
+        """Return the page's HTML as text, or None if it could not be fetched"""
+        page = self.fetch(url)
+        return page.html if page else None
+
+    def fetch(self, url, etag=None, last_modified=None):
+        """Conditional GET: returns a Page (not_modified on 304), or None if it could not be fetched"""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        with politeness.request(url) as request:
+            try:
+                response = self.session().get(url, headers=headers, timeout=HTTP_TIMEOUT)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                if is_overload(e):
+                    request.failed()
+                print(f"[!] HTTP fetch failed for {url}: {e}")
+                return None
+        validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        if response.status_code == 304:
+            return Page(None, etag, last_modified, True)
+        # Pages without a charset in Content-Type are UTF-8 (requests would assume Latin-1)
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = "utf-8"
+        return Page(response.text, *validators, False)
+
+    def final_url(self, url):
+        """Follow redirects from url and return where they end, or None on error"""
+        with politeness.request(url) as request:
+            try:
+                response = self.session().get(url, timeout=HTTP_TIMEOUT, allow_redirects=True, stream=True)
+                response.close()
+            except requests.RequestException as e:
+                if is_overload(e):
+                    request.failed()
+                print(f"[!] Could not follow {url}: {e}")
+                return None
+        return response.url
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
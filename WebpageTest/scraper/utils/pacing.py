@@ -0,0 +1,158 @@
+# utils/pacing.py
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from config import (
+    POLITE_MIN_DELAY, POLITE_MAX_DELAY, POLITE_LOAD_FACTOR, POLITE_JITTER,
+    BACKOFF_BASE, BACKOFF_MAX
+)
+
+# Weight of the newest load time in a site's moving average
+LOAD_TIME_SMOOTHING = 0.3
+
+
+class WaitStats:
+    """Thread-safe totals of time spent waiting vs working, in worker-seconds.
+
+    Kinds: "politeness" and "backoff" (delays before a request), "readiness"
+    (waiting on page conditions, utils/waits.py) and "work" (time in requests
+    minus the readiness waits inside them), so the kinds do not overlap.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seconds = defaultdict(float)
+        self._counts = defaultdict(int)
+        self._local = threading.local()  # this thread's readiness seconds
+
+    def add(self, kind, seconds):
+        with self._lock:
+            self._seconds[kind] += seconds
+            self._counts[kind] += 1
+        if kind == "readiness":
+            self._local.readiness = self.thread_readiness() + seconds
+
+    def thread_readiness(self):
+        """Readiness seconds recorded by the calling thread so far"""
+        return getattr(self._local, "readiness", 0.0)
+
+    def report(self):
+        with self._lock:
+            s, n = dict(self._seconds), dict(self._counts)
+        waiting = s.get("politeness", 0) + s.get("backoff", 0) + s.get("readiness", 0)
+        return (
+            f"waiting {waiting:.1f}s (politeness {s.get('politeness', 0):.1f}s, "
+            f"error backoff {s.get('backoff', 0):.1f}s, page readiness {s.get('readiness', 0):.1f}s), "
+            f"working {s.get('work', 0):.1f}s over {n.get('work', 0)} request(s)"
+        )
+
+
+class _DomainPace:
+    def __init__(self):
+        self.load_time = None  # moving average of request seconds
+        self.next_slot = 0.0  # monotonic time the next request may start
+        self.errors = 0  # consecutive failures
+
+
+class PolitenessController:
+    """Spaces requests to each site by its observed load time, and backs off on errors.
+
+    Before every request (page load or HTTP GET) the caller reserves the
+    site's next slot: consecutive requests to a site start at least
+    POLITE_LOAD_FACTOR x its average load time apart (clamped to
+    POLITE_MIN_DELAY..POLITE_MAX_DELAY, with +-POLITE_JITTER), so a fast
+    site is crawled quickly and a slow or struggling one is given room.
+    After N consecutive failures the delay grows by BACKOFF_BASE * 2**(N-1)
+    seconds (up to BACKOFF_MAX); a success resets it. Slots are shared by
+    all worker threads.
+    """
+
+    def __init__(self, stats=None):
+        self._lock = threading.Lock()
+        self._domains = defaultdict(_DomainPace)
+        self.stats = stats or WaitStats()
+
+    def delay(self, domain):
+        """Current spacing between requests to domain, in seconds (without jitter)"""
+        with self._lock:
+            return self._delay(self._domains[domain])
+
+    def _delay(self, pace):
+        delay = POLITE_MIN_DELAY
+        if pace.load_time is not None:
+            delay = min(POLITE_MAX_DELAY, max(POLITE_MIN_DELAY, POLITE_LOAD_FACTOR * pace.load_time))
+        if pace.errors:
+            delay += min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (pace.errors - 1))
+        return delay
+
+    def wait_turn(self, url):
+        """Block until the url's site may be requested again"""
+        domain = urlparse(url).netloc
+        with self._lock:
+            pace = self._domains[domain]
+            now = time.monotonic()
+            start = max(now, pace.next_slot)
+            pace.next_slot = start + self._delay(pace) * random.uniform(1 - POLITE_JITTER, 1 + POLITE_JITTER)
+            kind = "backoff" if pace.errors else "politeness"
+        if start > now:
+            time.sleep(start - now)
+            self.stats.add(kind, start - now)
+
+    def record(self, url, seconds, ok=True):
+        """Feed back how a request to url went"""
+        with self._lock:
+            pace = self._domains[urlparse(url).netloc]
+            if ok:
+                pace.errors = 0
+                if pace.load_time is None:
+                    pace.load_time = seconds
+                else:
+                    pace.load_time += LOAD_TIME_SMOOTHING * (seconds - pace.load_time)
+            else:
+                pace.errors += 1
+                # Slots already handed out were spaced without this backoff
+                pace.next_slot = max(pace.next_slot, time.monotonic() + self._delay(pace))
+
+    @contextmanager
+    def request(self, url):
+        """Wait for url's slot, then time the block as work; an exception or
+        request.failed() inside it counts as an error for the site"""
+        self.wait_turn(url)
+        outcome = _Outcome()
+        started, readiness = time.monotonic(), self.stats.thread_readiness()
+        try:
+            yield outcome
+        except Exception:
+            outcome.failed()
+            raise
+        finally:
+            # The site's load time includes waiting for the page to be ready
+            elapsed = time.monotonic() - started
+            self.stats.add("work", elapsed - (self.stats.thread_readiness() - readiness))
+            self.record(url, elapsed, ok=outcome.ok)
+
+    def report(self):
+        """One line per site: average load time and current spacing"""
+        with self._lock:
+            domains = {domain: (pace.load_time, self._delay(pace)) for domain, pace in self._domains.items()}
+        return "\n".join(
+            f"    {domain}: avg load {load_time or 0:.2f}s, delay {delay:.2f}s"
+            for domain, (load_time, delay) in sorted(domains.items())
+        )
+
+
+class _Outcome:
+    def __init__(self):
+        self.ok = True
+
+    def failed(self):
+        self.ok = False
+
+
+# Shared by every scraper and fetcher in the process
+wait_stats = WaitStats()
+politeness = PolitenessController(wait_stats)
@@ -0,0 +1,108 @@
+# utils/waits.py
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from config import READY_TIMEOUT, NETWORK_IDLE, NEW_WINDOW_TIMEOUT
+from utils.pacing import politeness, wait_stats
+
+POLL_FREQUENCY = 0.1  # seconds between readiness checks
+
+# Document state and the number of finished network requests (resource timing entries)
+NETWORK_STATE_SCRIPT = "return [document.readyState, performance.getEntriesByType('resource').length];"
+
+
+class _NetworkIdle:
+    """Condition: the document is loaded and no request finished for NETWORK_IDLE seconds"""
+
+    def __init__(self, idle=NETWORK_IDLE):
+        self.idle = idle
+        self.last_count = None
+        self.quiet_since = None
+
+    def __call__(self, driver):
+        try:
+            ready_state, count = driver.execute_script(NETWORK_STATE_SCRIPT)
+        except Exception:
+            return False  # Navigating; try again
+        now = time.monotonic()
+        if ready_state != "complete" or count != self.last_count:
+            self.last_count, self.quiet_since = count, now
+            return False
+        return now - self.quiet_since >= self.idle
+
+
+def _until(driver, condition, timeout):
+    """WebDriverWait.until with the time spent recorded as readiness waiting"""
+    started = time.monotonic()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+    finally:
+        wait_stats.add("readiness", time.monotonic() - started)
+
+
+def wait_for_network_idle(driver, timeout=READY_TIMEOUT, idle=NETWORK_IDLE):
+    """Wait until the page stops loading resources; False on timeout"""
+    try:
+        return _until(driver, _NetworkIdle(idle), timeout)
+    except TimeoutException:
+        return False
+
+
+def wait_for_page(driver, selector, timeout=READY_TIMEOUT):
+    """Wait until selector (CSS) is present, or the page went network-idle without it.
+
+    Returns True when the element is present and False when the page finished
+    loading without it; raises TimeoutException when neither happens within
+    timeout.
+    """
+    network_idle = _NetworkIdle()
+
+    def ready(driver):
+        if driver.find_elements(By.CSS_SELECTOR, selector):
+            return "present"
+        return "idle" if network_idle(driver) else False
+
+    return _until(driver, ready, timeout) == "present"
+
+
+def wait_for_new_window(driver, original_handles, timeout=NEW_WINDOW_TIMEOUT):
+    """Handle of a window opened after original_handles were taken, or None.
+
+    Gives up early once the current page has gone network-idle without
+    opening one (e.g. the click submitted a form in place).
+    """
+    network_idle = _NetworkIdle()
+
+    def opened(driver):
+        # Wrapped in a list: until() only stops on a truthy value
+        new_handles = [handle for handle in driver.window_handles if handle not in original_handles]
+        if new_handles:
+            return new_handles[:1]
+        return [None] if network_idle(driver) else False
+
+    try:
+        return _until(driver, opened, timeout)[0]
+    except TimeoutException:
+        return None
+
+
+def wait_for_url(driver, predicate, timeout=READY_TIMEOUT):
+    """Wait until predicate(current URL) holds; returns the last URL seen either way"""
+    try:
+        return _until(driver, lambda d: d.current_url if predicate(d.current_url) else False, timeout)
+    except TimeoutException:
+        return driver.current_url
+
+
+def load_page(driver, url, selector, timeout=READY_TIMEOUT):
+    """driver.get(url) in the site's politeness slot, then wait_for_page(selector).
+
+    The load and the wait are timed together as the site's load time; an
+    error or a timeout counts against the site (it is backed off).
+    """
+    with politeness.request(url):
+        driver.get(url)
+        return wait_for_page(driver, selector, timeout)